@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import sys
+from benchmarks.suite import (
+    CASES,
+    DEFAULT_GROUP_SIZES,
+    SIZE_PRESETS,
+    Measurement,
+    compare,
+    load_results,
+    results_document,
+    run_suite
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _int_list(text: str):
+    """Parse "2,5,10" or a range such as "2-10"."""
+    if "-" in text:
+        low, high = text.split("-", 1)
+        return list(range(int(low), int(high) + 1))
+    return [int(value.replace("_", "")) for value in text.split(",") if value]
+
+
+def _format_bytes(count: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GiB"
+
+
+def _print_measurement(measurement: Measurement) -> None:
+    group = f" g={measurement.group_size}" if measurement.group_size is not None else ""
+    details = "".join(f"  {name}={value:g}" for name, value in (measurement.details or {}).items())
+    print(
+        f"{measurement.case:<38}{measurement.size:>11,}{group:<6}"
+        f"{measurement.seconds * 1000:>12.3f} ms{_format_bytes(measurement.peak_bytes):>14}{details}",
+        flush=True
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark grouping, roster operations and admin table preparation."
+    )
+    parser.add_argument("--preset", choices=sorted(SIZE_PRESETS), default="default",
+                        help="Roster sizes to run (full includes 10M students)")
+    parser.add_argument("--sizes", type=_int_list, help="Roster sizes, e.g. 10,1000,100000")
+    parser.add_argument("--group-sizes", type=_int_list, default=list(DEFAULT_GROUP_SIZES),
+                        help="Group sizes, e.g. 2,5,10 or 2-10")
+    parser.add_argument("--case", action="append", choices=[case.name for case in CASES],
+                        help="Only run this case (repeatable)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Allowed relative memory growth")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or SIZE_PRESETS[args.preset]
+    results = run_suite(sizes, args.group_sizes, args.case, args.repeats, progress=_print_measurement)
+    document = results_document(results)
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {path}")
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = load_results(json.load(f))
+    comparisons = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    regressions = [c for c in comparisons if c.regressed]
+    print(f"\nCompared {len(comparisons)} measurements with {args.baseline}")
+    for comparison in regressions:
+        m = comparison.current
+        print(
+            f"REGRESSION {m.case} size={m.size} group_size={m.group_size}: "
+            f"time x{comparison.time_ratio:.2f}, memory x{comparison.memory_ratio:.2f}"
+        )
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
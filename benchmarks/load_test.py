@@ -0,0 +1,473 @@
+import argparse
+import gc
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+from unittest.mock import MagicMock
+from urllib import parse
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+from benchmarks.__main__ import _format_bytes, _int_list
+from services.roster_store import SQLiteRosterStore
+from utils.constants import SkillLevel, DEFAULT_STUDENT_PAGE
+
+APP_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "app.py"))
+DEFAULT_LEVELS = (1, 2, 4, 8, 16, 32)
+DEFAULT_LATENCY_BUDGET = 1.0
+DEFAULT_MIN_GAIN = 0.10
+ADMIN_PASSWORD = "load-test"
+RESULTS_FORMAT = 1
+
+_SKILL_LEVELS = list(SkillLevel)
+
+
+@dataclass(frozen=True)
+class LevelResult:
+    """
+    Outcome of one concurrency level: N students submitting at once while an admin watches.
+
+    Attributes:
+        sessions (int): Concurrent student sessions
+        submitted (int): Submissions the app acknowledged
+        stored (int): Responses found in the cohort's store afterwards
+        misattributed (int): Stored responses with another student's skill level
+        errors (int): Sessions that failed (timeout, exception, error message, lost selection)
+        seconds (float): Wall time of the concurrent phase
+        submit_p50 (float): Median seconds from clicking a skill level to the page settling
+        submit_p95 (float): 95th percentile of the same
+        submit_p99 (float): 99th percentile of the same
+        rerun_p50 (float): Median seconds of a student page rerun under load
+        rerun_p95 (float): 95th percentile of the same
+        admin_rerun_p50 (float): Median seconds of an admin page rerun under load
+        memory_per_session (int): Python memory held per open session, in bytes
+    """
+    sessions: int
+    submitted: int
+    stored: int
+    misattributed: int
+    errors: int
+    seconds: float
+    submit_p50: float
+    submit_p95: float
+    submit_p99: float
+    rerun_p50: float
+    rerun_p95: float
+    admin_rerun_p50: float
+    memory_per_session: int
+
+    @property
+    def lost(self) -> int:
+        """Acknowledged submissions that never reached the store."""
+        return max(0, self.submitted - self.stored)
+
+    @property
+    def throughput(self) -> float:
+        """Acknowledged submissions per second."""
+        return self.submitted / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class _StudentTrace:
+    """What one simulated student saw."""
+    reruns: List[float] = field(default_factory=list)
+    submit: Optional[float] = None
+    error: Optional[str] = None
+
+
+class _SessionScriptRunner(LocalScriptRunner):
+    """
+    Test script runner that behaves like the server's in the two ways a load test needs.
+
+    Button triggers are reset when a script stops for ``st.rerun()``, so a
+    click is handled once (the test runner keeps them set for inspection),
+    and all sessions share one script cache, so the app is compiled once.
+    """
+
+    def __init__(self, *args, script_cache: ScriptCache, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._script_cache = script_cache
+
+    def _on_script_finished(self, ctx, event: ScriptRunnerEvent, premature_stop: bool) -> None:
+        if event == ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN and not premature_stop:
+            self._session_state.on_script_finished(ctx.widget_ids_this_run)
+        super()._on_script_finished(ctx, event, premature_stop)
+
+
+class _AppSession(AppTest):
+    """
+    One browser session of the app, safe to run next to others in threads.
+
+    ``AppTest`` installs a mock runtime around every run and removes it
+    afterwards, which breaks concurrent sessions; these rely on the one
+    installed by ``_app_runtime`` for the whole load test instead.
+    """
+
+    def __init__(self, script_cache: ScriptCache, cohort: str, timeout: float):
+        super().__init__(APP_PATH, default_timeout=timeout)
+        self._script_cache = script_cache
+        self.query_params = {"cohort": cohort}
+
+    def _run(self, widget_state=None, timeout: Optional[float] = None) -> "_AppSession":
+        runner = _SessionScriptRunner(
+            self._script_path, self.session_state, args=self.args, kwargs=self.kwargs,
+            script_cache=self._script_cache
+        )
+        self._tree = runner.run(widget_state, self.query_params, timeout or self.default_timeout)
+        self._tree._runner = self
+        self.query_params = parse.parse_qs(runner.event_data[-1]["client_state"].query_string)
+        return self
+
+
+@contextmanager
+def _app_runtime(data_dir: str) -> Iterator[None]:
+    """Install a mock Streamlit runtime and point the app at ``data_dir``."""
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    saved_runtime, Runtime._instance = Runtime._instance, runtime
+    saved_dir = os.environ.get("COHORT_DATA_DIR")
+    os.environ["COHORT_DATA_DIR"] = data_dir
+    # The app keeps one cohort manager per process; build a new one on this directory
+    st.cache_resource.clear()
+    try:
+        yield
+    finally:
+        st.cache_resource.clear()
+        Runtime._instance = saved_runtime
+        if saved_dir is None:
+            os.environ.pop("COHORT_DATA_DIR", None)
+        else:
+            os.environ["COHORT_DATA_DIR"] = saved_dir
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile; 0 without values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def _timed_run(session: _AppSession, times: List[float]) -> None:
+    """Rerun a session, recording how long it took."""
+    start = time.perf_counter()
+    session.run()
+    times.append(time.perf_counter() - start)
+
+
+def _failure(session: _AppSession) -> Optional[str]:
+    """Why the last run of a session failed, if it did."""
+    if session.exception:
+        return session.exception[0].message
+    if session.error:
+        return session.error[0].value
+    return None
+
+
+def _setup_cohort(admin: _AppSession, names: Sequence[str]) -> None:
+    """Create the cohort and add the students through the admin page."""
+    admin.run()
+    admin.text_input[0].input(ADMIN_PASSWORD)
+    admin.text_input[1].input(ADMIN_PASSWORD)
+    next(button for button in admin.button if button.label == "Create Cohort").click()
+    admin.run()
+    admin.text_area[0].input("\n".join(names))
+    next(button for button in admin.button if button.label == "Add Students").click()
+    admin.run()
+    failure = _failure(admin)
+    if failure:
+        raise RuntimeError(f"Could not set up the load-test cohort: {failure}")
+
+
+def _student(session: _AppSession, name: str, level: SkillLevel, start: threading.Barrier) -> _StudentTrace:
+    """Rerun the student page, pick a name and submit a skill level, like a student would."""
+    trace = _StudentTrace()
+    try:
+        start.wait()
+        _timed_run(session, trace.reruns)
+        session.selectbox(key="student_name").set_value(name)
+        _timed_run(session, trace.reruns)
+        if session.selectbox(key="student_name").value != name:
+            trace.error = "Selection lost while other students submitted"
+            return trace
+        session.button(key=f"skill_{level.name}").click()
+        begin = time.perf_counter()
+        session.run()
+        trace.submit = time.perf_counter() - begin
+        trace.error = _failure(session)
+    except (KeyError, RuntimeError, threading.BrokenBarrierError) as e:
+        trace.error = repr(e)
+    return trace
+
+
+def _admin(session: _AppSession, done: threading.Event) -> List[float]:
+    """Keep rerunning the admin page until the students are done (or a rerun hangs)."""
+    times: List[float] = []
+    try:
+        while not done.is_set():
+            _timed_run(session, times)
+    except RuntimeError:
+        pass
+    return times
+
+
+def _check_store(
+    path: str,
+    expected: Sequence[Tuple[str, SkillLevel]],
+    submitted: int,
+    timeout: float
+) -> Tuple[int, int]:
+    """
+    Wait for the queued responses to be written, then count them.
+
+    Returns:
+        Tuple[int, int]: Stored responses, and how many have the wrong skill level
+    """
+    store = SQLiteRosterStore(path)
+    try:
+        deadline = time.monotonic() + timeout
+        while store.response_status()[0] < submitted and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stored = misattributed = 0
+        for name, level in expected:
+            student = store.get(name)
+            if student is not None and student.has_responded:
+                stored += 1
+                misattributed += student.skill_level != level
+        return stored, misattributed
+    finally:
+        store.close()
+
+
+def run_level(
+    sessions: int,
+    data_dir: str,
+    cohort: str,
+    script_cache: ScriptCache,
+    timeout: float = 60.0
+) -> LevelResult:
+    """
+    Simulate one class: an admin adds ``sessions`` students, then every
+    student submits at the same moment while the admin keeps rerunning.
+
+    Expects ``_app_runtime`` to be installed.
+
+    Args:
+        sessions (int): Concurrent student sessions
+        data_dir (str): The app's data directory
+        cohort (str): ID of a cohort to create for this level
+        script_cache (ScriptCache): Compiled app shared by the sessions
+        timeout (float): Seconds before a single script run counts as hung
+
+    Returns:
+        LevelResult: Latency, rerun, memory and correctness figures
+    """
+    names = [f"Load Student {idx}" for idx in range(sessions)]
+    expected = [(name, _SKILL_LEVELS[idx % len(_SKILL_LEVELS)]) for idx, name in enumerate(names)]
+    admin = _AppSession(script_cache, cohort, timeout)
+    _setup_cohort(admin, names)
+
+    # Open every session on the student page before the rush; tracing slows
+    # the app down, so it never overlaps the timed phase
+    gc.collect()
+    tracemalloc.start()
+    try:
+        students = []
+        for _ in names:
+            session = _AppSession(script_cache, cohort, timeout)
+            session.run()
+            session.sidebar.radio[0].set_value(DEFAULT_STUDENT_PAGE)
+            session.run()
+            students.append(session)
+        gc.collect()
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    start = threading.Barrier(sessions + 1)
+    done = threading.Event()
+    with ThreadPoolExecutor(max_workers=sessions + 1) as executor:
+        admin_times = executor.submit(_admin, admin, done)
+        futures = [
+            executor.submit(_student, session, name, level, start)
+            for session, (name, level) in zip(students, expected)
+        ]
+        start.wait()
+        began = time.perf_counter()
+        traces = [future.result() for future in futures]
+        seconds = time.perf_counter() - began
+        done.set()
+        admin_reruns = admin_times.result()
+
+    submits = [trace.submit for trace in traces if trace.submit is not None and trace.error is None]
+    reruns = [rerun for trace in traces for rerun in trace.reruns]
+    stored, misattributed = _check_store(
+        os.path.join(data_dir, f"{cohort}.db"), expected, len(submits), timeout
+    )
+    return LevelResult(
+        sessions=sessions,
+        submitted=len(submits),
+        stored=stored,
+        misattributed=misattributed,
+        errors=sum(trace.error is not None for trace in traces),
+        seconds=seconds,
+        submit_p50=_percentile(submits, 0.50),
+        submit_p95=_percentile(submits, 0.95),
+        submit_p99=_percentile(submits, 0.99),
+        rerun_p50=_percentile(reruns, 0.50),
+        rerun_p95=_percentile(reruns, 0.95),
+        admin_rerun_p50=_percentile(admin_reruns, 0.50),
+        memory_per_session=memory // sessions
+    )
+
+
+def run_load_test(
+    levels: Sequence[int] = DEFAULT_LEVELS,
+    data_dir: Optional[str] = None,
+    timeout: float = 60.0,
+    progress: Optional[Callable[[LevelResult], None]] = None
+) -> List[LevelResult]:
+    """
+    Drive ``src/app.py`` headlessly at increasing concurrency.
+
+    Every session is a real run of the app script through Streamlit's
+    testing runner, in its own thread, as the server runs them; all state
+    lives in this process and ``data_dir``, so nothing touches the network.
+    Each level gets its own cohort.
+
+    Args:
+        levels (Sequence[int]): Concurrent student sessions per level
+        data_dir (Optional[str]): Where the app saves cohorts; a temporary directory if omitted
+        timeout (float): Seconds before a single script run counts as hung
+        progress (Optional[Callable[[LevelResult], None]]): Called after each level
+
+    Returns:
+        List[LevelResult]: One result per level
+
+    Raises:
+        ValueError: If a level is below 1
+    """
+    if any(sessions < 1 for sessions in levels):
+        raise ValueError("Every level needs at least one session")
+    with tempfile.TemporaryDirectory(prefix="load-test-") as scratch:
+        data_dir = data_dir or scratch
+        script_cache = ScriptCache()
+        results = []
+        with _app_runtime(data_dir):
+            for idx, sessions in enumerate(levels):
+                result = run_level(sessions, data_dir, f"load-{os.getpid()}-{idx}", script_cache, timeout)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+        return results
+
+
+def find_saturation(
+    results: Sequence[LevelResult],
+    latency_budget: float = DEFAULT_LATENCY_BUDGET,
+    min_gain: float = DEFAULT_MIN_GAIN
+) -> Optional[int]:
+    """
+    The concurrency at which the app saturates.
+
+    That is the first level whose 95th percentile submission latency is over
+    budget, or whose throughput is less than ``min_gain`` above the best of
+    the lower levels (more sessions only queue up).
+
+    Args:
+        results (Sequence[LevelResult]): Results in increasing concurrency
+        latency_budget (float): Acceptable p95 submission latency in seconds
+        min_gain (float): Relative throughput gain a level must add (0.10 = 10%)
+
+    Returns:
+        Optional[int]: Sessions at the saturation point; None if not reached
+    """
+    best = 0.0
+    for result in results:
+        if result.submit_p95 > latency_budget or (best and result.throughput < best * (1 + min_gain)):
+            return result.sessions
+        best = max(best, result.throughput)
+    return None
+
+
+_COLUMNS = (
+    ("sessions", 8), ("submits/s", 11), ("submit p50", 12), ("p95", 7), ("p99", 7),
+    ("rerun p50", 11), ("p95", 7), ("admin p50", 11), ("memory/session", 16),
+    ("lost", 6), ("wrong", 7), ("errors", 8),
+)
+
+
+def _print_level(result: LevelResult) -> None:
+    values = (
+        result.sessions,
+        f"{result.throughput:.1f}",
+        *(f"{seconds * 1000:.0f}" for seconds in (
+            result.submit_p50, result.submit_p95, result.submit_p99,
+            result.rerun_p50, result.rerun_p95, result.admin_rerun_p50
+        )),
+        _format_bytes(result.memory_per_session),
+        result.lost,
+        result.misattributed,
+        result.errors,
+    )
+    print("".join(f"{value:>{width}}" for value, (_, width) in zip(values, _COLUMNS)), flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load_test",
+        description="Load-test the Streamlit app with concurrent simulated students and one admin."
+    )
+    parser.add_argument("--levels", type=_int_list, default=list(DEFAULT_LEVELS),
+                        help="Concurrent student sessions per level, e.g. 1,2,4,8")
+    parser.add_argument("--latency-budget", type=float, default=DEFAULT_LATENCY_BUDGET,
+                        help="Acceptable p95 submission latency in seconds")
+    parser.add_argument("--min-gain", type=float, default=DEFAULT_MIN_GAIN,
+                        help="Throughput gain below which a level counts as saturated")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a script run counts as hung")
+    parser.add_argument("--data-dir", help="Directory the app saves cohorts in (default: a temporary one)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    print("Latencies and rerun times in milliseconds")
+    print("".join(f"{name:>{width}}" for name, width in _COLUMNS))
+    results = run_load_test(args.levels, args.data_dir, args.timeout, progress=_print_level)
+    saturation = find_saturation(results, args.latency_budget, args.min_gain)
+    if saturation is None:
+        print(f"\nNo saturation up to {max(args.levels)} concurrent sessions")
+    else:
+        print(f"\nSaturated at {saturation} concurrent sessions (p95 budget {args.latency_budget:g} s)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": RESULTS_FORMAT,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "cpus": os.cpu_count(),
+                "latency_budget": args.latency_budget,
+                "saturation": saturation,
+                "results": [asdict(result) for result in results],
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+    # Lost or misattributed submissions are bugs, whatever the load
+    return 1 if any(result.lost or result.misattributed for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
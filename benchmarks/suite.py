@@ -0,0 +1,295 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import gc
+import platform
+import time
+import tracemalloc
+from models.roster import Roster
+from models.student import Student
+from services.frame_cache import roster_frame
+from services.group_service import GroupService
+from services.group_table import GroupsTable
+from services.grouping_plan import GroupingPlan
+from utils.constants import SkillLevel
+
+# Roster sizes per preset; "full" includes the 10M case, which needs several GB of RAM
+SIZE_PRESETS = {
+    "quick": (10, 1_000, 10_000),
+    "default": (10, 1_000, 10_000, 100_000, 1_000_000),
+    "full": (10, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+}
+DEFAULT_GROUP_SIZES = (2, 5, 10)
+RESULTS_FORMAT = 1
+
+_LEVELS = list(SkillLevel)
+
+
+def make_students(size: int, responded: bool = True) -> List[Student]:
+    """Deterministic students with an even spread of skill levels."""
+    return [
+        Student(
+            name=f"Student {idx}",
+            skill_level=_LEVELS[idx % len(_LEVELS)] if responded else None,
+            has_responded=responded
+        )
+        for idx in range(size)
+    ]
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    One benchmark: untimed setup, then the timed operation.
+
+    Attributes:
+        name (str): Case name, unique within the suite
+        setup (Callable[[int, int], Any]): Builds the input from (roster size, group size)
+        run (Callable[[Any], Any]): The measured operation
+        per_group_size (bool): Whether the case is run for every group size
+        details (Optional[Callable[[Any], Dict[str, float]]]): Extra figures
+            taken from the operation's result, such as convergence statistics
+    """
+    name: str
+    setup: Callable[[int, int], Any]
+    run: Callable[[Any], Any]
+    per_group_size: bool = False
+    details: Optional[Callable[[Any], Dict[str, float]]] = None
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """
+    Result of one case at one roster size and group size.
+
+    Attributes:
+        case (str): Case name
+        size (int): Roster size
+        group_size (Optional[int]): Group size, for cases that depend on it
+        seconds (float): Best wall time over the repeats
+        peak_bytes (int): Peak traced allocation during one extra run
+        details (Optional[Dict[str, float]]): The case's extra figures, if any
+    """
+    case: str
+    size: int
+    group_size: Optional[int]
+    seconds: float
+    peak_bytes: int
+    details: Optional[Dict[str, float]] = None
+
+    @property
+    def key(self) -> Tuple[str, int, Optional[int]]:
+        """Identity used to match a result with its baseline."""
+        return self.case, self.size, self.group_size
+
+
+def _names_with_duplicates(size: int, group_size: int) -> List[str]:
+    """Names for a bulk add where one in ten is a repeat."""
+    return [f"Student {idx - idx % 10 if idx % 10 == 9 else idx}" for idx in range(size)]
+
+
+def _groups(size: int, group_size: int):
+    """A formed grouping, for the rendering cases."""
+    return GroupService.create_stratified_groups(make_students(size), group_size, seed=0)
+
+
+def _refinement_input(size: int, group_size: int):
+    """Random skill levels as grouped by the round-robin engine, the refinement stage's usual input."""
+    # numpy is only needed here, so keep it off the default import path
+    import numpy as np
+    from services.array_engine import stratified_assignment
+
+    levels = np.random.default_rng(0).integers(1, len(_LEVELS) + 1, size=size).astype(np.uint8)
+    assignment = stratified_assignment(levels, group_size, seed=0)
+    return levels, assignment.group_indices, assignment.num_groups
+
+
+def _refine(args) -> Any:
+    """Refine a round-robin assignment (see ``_refinement_input``)."""
+    from services.refinement import refine_assignment
+
+    return refine_assignment(*args)
+
+
+def _refinement_details(result) -> Dict[str, float]:
+    """Convergence of a refinement run."""
+    return {
+        "passes": result.passes,
+        "swaps": result.swaps,
+        "variance_before": result.initial_score.average_variance,
+        "variance_after": result.final_score.average_variance,
+        "converged": float(result.converged),
+    }
+
+
+CASES: Tuple[Case, ...] = (
+    Case("roster_bulk_add", _names_with_duplicates, lambda names: Roster().add_names(names)),
+    Case("response_status_roster", lambda size, _: Roster(make_students(size)),
+         lambda roster: (GroupService.get_response_status(roster), GroupService.validate_responses(roster))),
+    Case("response_status_list", lambda size, _: make_students(size),
+         lambda students: (GroupService.get_response_status(students), GroupService.validate_responses(students))),
+    Case("create_stratified_groups", lambda size, group_size: (Roster(make_students(size)), group_size),
+         lambda args: GroupService.create_stratified_groups(*args), per_group_size=True),
+    Case("grouping_plan_reshuffle",
+         lambda size, group_size: GroupingPlan(Roster(make_students(size)), group_size),
+         lambda plan: plan.reshuffle(0), per_group_size=True),
+    Case("create_stratified_groups_vectorized", lambda size, group_size: (make_students(size), group_size),
+         lambda args: GroupService.create_stratified_groups_vectorized(*args, seed=0), per_group_size=True),
+    Case("roster_frame", lambda size, _: Roster(make_students(size)), roster_frame),
+    Case("groups_table", _groups, GroupsTable.from_groups, per_group_size=True),
+    Case("refine_groups", _refinement_input, _refine, per_group_size=True, details=_refinement_details),
+)
+
+
+def _measure(case: Case, size: int, group_size: int, repeats: int) -> Measurement:
+    """Time a case (best of ``repeats``), then trace one more run for peak memory."""
+    state = case.setup(size, group_size)
+    best = float("inf")
+    for _ in range(repeats):
+        # Like timeit, keep collector pauses out of the timings
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = case.run(state)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    # Tracing slows allocation-heavy code down, so it never overlaps the timed runs
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(
+        case=case.name,
+        size=size,
+        group_size=group_size if case.per_group_size else None,
+        seconds=best,
+        peak_bytes=peak,
+        details=case.details(result) if case.details is not None else None
+    )
+
+
+def run_suite(
+    sizes: Iterable[int],
+    group_sizes: Sequence[int] = DEFAULT_GROUP_SIZES,
+    cases: Optional[Iterable[str]] = None,
+    repeats: int = 3,
+    progress: Optional[Callable[[Measurement], None]] = None
+) -> List[Measurement]:
+    """
+    Run the benchmark cases for every roster size (and group size, where relevant).
+
+    Args:
+        sizes (Iterable[int]): Roster sizes
+        group_sizes (Sequence[int]): Group sizes for cases that depend on them
+        cases (Optional[Iterable[str]]): Names of the cases to run; all if omitted
+        repeats (int): Timed runs per measurement; the fastest is kept
+        progress (Optional[Callable[[Measurement], None]]): Called after each measurement
+
+    Returns:
+        List[Measurement]: One measurement per case, size and group size
+    """
+    selected = [case for case in CASES if cases is None or case.name in set(cases)]
+    results = []
+    for size in sizes:
+        for case in selected:
+            for group_size in (group_sizes if case.per_group_size else group_sizes[:1]):
+                measurement = _measure(case, size, group_size, repeats)
+                results.append(measurement)
+                if progress is not None:
+                    progress(measurement)
+    return results
+
+
+def results_document(results: Iterable[Measurement]) -> Dict[str, Any]:
+    """Machine-readable results, with enough context to judge comparability."""
+    import numpy
+    import pandas
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "numpy": numpy.__version__,
+            "pandas": pandas.__version__,
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def load_results(document: Dict[str, Any]) -> List[Measurement]:
+    """Measurements from a results document."""
+    if document.get("format") != RESULTS_FORMAT:
+        raise ValueError(f"Unsupported results format: {document.get('format')}")
+    return [Measurement(**result) for result in document["results"]]
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """
+    A measurement next to its baseline.
+
+    Attributes:
+        current (Measurement): The new measurement
+        baseline (Measurement): The stored baseline
+        time_ratio (float): Current over baseline wall time
+        memory_ratio (float): Current over baseline peak memory
+        regressed (bool): Whether either ratio is beyond its tolerance
+    """
+    current: Measurement
+    baseline: Measurement
+    time_ratio: float
+    memory_ratio: float
+    regressed: bool
+
+
+def compare(
+    current: Iterable[Measurement],
+    baseline: Iterable[Measurement],
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.10,
+    min_seconds: float = 0.001,
+    min_bytes: int = 64 * 1024
+) -> List[Comparison]:
+    """
+    Compare measurements with a baseline; only matching cases are compared.
+
+    Wall times below ``min_seconds`` and peaks below ``min_bytes`` are too
+    noisy to flag.
+
+    Args:
+        current (Iterable[Measurement]): New measurements
+        baseline (Iterable[Measurement]): Stored baseline
+        time_tolerance (float): Allowed relative slowdown (0.25 = 25%)
+        memory_tolerance (float): Allowed relative growth of peak memory
+        min_seconds (float): Noise floor for wall-time regressions
+        min_bytes (int): Noise floor for memory regressions
+
+    Returns:
+        List[Comparison]: One comparison per measurement that has a baseline
+    """
+    by_key = {measurement.key: measurement for measurement in baseline}
+    comparisons = []
+    for measurement in current:
+        base = by_key.get(measurement.key)
+        if base is None:
+            continue
+        time_ratio = measurement.seconds / base.seconds if base.seconds else float("inf")
+        memory_ratio = measurement.peak_bytes / base.peak_bytes if base.peak_bytes else 1.0
+        slower = time_ratio > 1 + time_tolerance and measurement.seconds >= min_seconds
+        bigger = memory_ratio > 1 + memory_tolerance and measurement.peak_bytes >= min_bytes
+        comparisons.append(Comparison(
+            current=measurement,
+            baseline=base,
+            time_ratio=time_ratio,
+            memory_ratio=memory_ratio,
+            regressed=slower or bigger
+        ))
+    return comparisons
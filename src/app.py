@@ -1,50 +1,130 @@
 import streamlit as st
+import json
 import os
+import pandas as pd
 from dotenv import load_dotenv
 from typing import List, Optional
-import pandas as pd
 
-from models.student import Student
 from models.group import Group
 from services.group_service import GroupService
+from services.roster_import import ImportProgress, import_roster
+from services.group_table import page_count, page_of, page_slice
+from services.frame_cache import FrameCache
+from services.export import (
+    EXPORT_CSV,
+    EXPORT_EXTENSIONS,
+    EXPORT_JSONL,
+    EXPORT_MIME_TYPES,
+    EXPORT_ZOOM,
+    export_bytes,
+    room_name
+)
+from services.cohorts import Cohort, CohortManager
+from services.constraints import GroupingConstraints, parse_pairs
+from services.snapshot import Snapshot, SnapshotError
+from utils.metrics import METRICS
 from utils.constants import (
     SkillLevel,
-    DEFAULT_GROUP_SIZE,
     DEFAULT_ADMIN_PAGE,
-    DEFAULT_STUDENT_PAGE
+    DEFAULT_STUDENT_PAGE,
+    DEFAULT_COHORT_ID,
+    ROOMS_PER_PAGE
 )
 
 # Load environment variables
 load_dotenv()
-ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin")  # Default for development
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin")  # Default cohort's password in development
+COHORT_DATA_DIR = os.getenv("COHORT_DATA_DIR")  # Where cohorts are saved; in memory if unset
+METRICS.enabled = METRICS.enabled or os.getenv("METRICS_ENABLED") == "1"
+
+EXPORT_LABELS = {
+    EXPORT_CSV: "CSV",
+    EXPORT_JSONL: "JSON Lines",
+    EXPORT_ZOOM: "Zoom pre-assignment CSV",
+}
+EXPORT_FORMATS_BY_LABEL = {label: fmt for fmt, label in EXPORT_LABELS.items()}
+
+@st.cache_resource
+def get_cohort_manager() -> CohortManager:
+    """Return the cohort registry shared by all sessions."""
+    return CohortManager(COHORT_DATA_DIR)
+
+def cohort_id() -> str:
+    """ID of the cohort addressed by the URL (``?cohort=<id>``)."""
+    return st.query_params.get("cohort", DEFAULT_COHORT_ID)
+
+def current_cohort() -> Optional[Cohort]:
+    """Load the cohort addressed by the URL; None if it does not exist yet."""
+    manager = get_cohort_manager()
+    manager.maybe_evict_idle()
+    if cohort_id() == DEFAULT_COHORT_ID:
+        return manager.get_or_create(DEFAULT_COHORT_ID, ADMIN_PASSWORD)
+    return manager.get(cohort_id())
 
 def init_session_state():
     """Initialize session state variables."""
-    if "roster" not in st.session_state:
-        st.session_state.roster: List[Student] = []
-    if "group_size" not in st.session_state:
-        st.session_state.group_size = DEFAULT_GROUP_SIZE
-    if "groups" not in st.session_state:
-        st.session_state.groups: List[Group] = []
-
-def admin_page():
+    if "admin_cohorts" not in st.session_state:
+        st.session_state.admin_cohorts = set()
+    if "frame_cache" not in st.session_state:
+        st.session_state.frame_cache = FrameCache()
+
+def create_cohort_form():
+    """Offer to create the cohort named in the URL."""
+    st.info(f"Cohort **{cohort_id()}** does not exist yet. Set an admin password to create it.")
+    password = st.text_input("Admin password for the new cohort:", type="password")
+    confirm = st.text_input("Confirm password:", type="password")
+    if st.button("Create Cohort"):
+        if password != confirm:
+            st.error("Passwords do not match")
+            return
+        try:
+            get_cohort_manager().create(cohort_id(), password)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.session_state.admin_cohorts.add(cohort_id())
+        st.rerun()
+
+@METRICS.timed("admin.page")
+def admin_page(cohort: Optional[Cohort]):
     """Render the admin page."""
     st.title("Stratified Shuffle - Admin")
-    
-    # Password protection
-    if "admin_authenticated" not in st.session_state:
-        st.session_state.admin_authenticated = False
+    st.caption(f"Cohort: {cohort_id()}")
+
+    if cohort is None:
+        create_cohort_form()
+        return
 
-    if not st.session_state.admin_authenticated:
+    # Password protection, per cohort
+    if cohort.cohort_id not in st.session_state.admin_cohorts:
         password = st.text_input("Enter admin password:", type="password")
         if st.button("Login"):
-            if password == ADMIN_PASSWORD:
-                st.session_state.admin_authenticated = True
+            if cohort.check_password(password):
+                st.session_state.admin_cohorts.add(cohort.cohort_id)
                 st.rerun()
             else:
                 st.error("Invalid password")
         return
 
+    # Hidden diagnostics panel, opened with ?diagnostics=1
+    if st.query_params.get("diagnostics"):
+        diagnostics_panel()
+
+    roster_input_section(cohort)
+    import_section(cohort)
+    snapshot_section(cohort)
+    roster_table_section(cohort)
+    group_formation_section(cohort)
+
+    # Display groups
+    if cohort.groups:
+        group_changes_section(cohort)
+        round_history_section(cohort)
+        render_groups(cohort)
+
+@METRICS.timed("admin.roster_input")
+def roster_input_section(cohort: Cohort):
+    """Render the bulk name entry."""
     # Roster management
     st.header("Roster Management")
     
@@ -62,121 +142,378 @@ def admin_page():
             # Split names by newline and filter out empty lines
             names = [name.strip() for name in bulk_names.split("\n") if name.strip()]
             
-            # Add new students to roster
-            for name in names:
-                if not any(s.name == name for s in st.session_state.roster):
-                    st.session_state.roster.append(Student(name=name))
+            # Add new students to roster, skipping names already on it
+            added = cohort.add_names(names)
             
-            st.success(f"Added {len(names)} students to roster")
+            st.success(f"Added {added} students to roster")
             st.rerun()
 
+@METRICS.timed("admin.import")
+def import_section(cohort: Cohort):
+    """Render the roster file import."""
+    # File import (CSV/TSV with optional email and skill level columns, or plain text)
+    roster_file = st.file_uploader(
+        "Or import a roster file",
+        type=["csv", "tsv", "txt"],
+        help="CSV/TSV columns: name, email (optional), skill level (optional)"
+    )
+
+    if roster_file is not None and st.button("Import File"):
+        progress_bar = st.progress(0.0, text="Importing roster...")
+
+        def show_progress(status: ImportProgress) -> None:
+            progress_bar.progress(
+                status.fraction or 0.0,
+                text=f"Imported {status.rows_read} rows ({status.added} new)"
+            )
+
+        try:
+            status = import_roster(cohort, roster_file, progress=show_progress)
+            st.success(
+                f"Added {status.added} students to roster "
+                f"({status.duplicates} already on it)"
+            )
+        except ValueError as e:
+            st.error(str(e))
+
+@METRICS.timed("admin.snapshot")
+def snapshot_section(cohort: Cohort):
+    """Save the roster and grouping to a snapshot file, or restore them from one."""
+    with st.expander("Snapshot"):
+        # Encoded only on request: every response would otherwise re-encode the whole roster
+        if st.button("Prepare snapshot", help="Names, emails, skill levels, responses and the current groups"):
+            st.session_state.prepared_snapshot = (cohort.cohort_id, cohort.snapshot_bytes())
+        prepared = st.session_state.get("prepared_snapshot")
+        if prepared is not None and prepared[0] == cohort.cohort_id:
+            st.download_button(
+                "Download snapshot",
+                prepared[1],
+                file_name=f"roster-{cohort_id()}.snapshot",
+                mime="application/octet-stream",
+                help="As of when it was prepared"
+            )
+        snapshot_file = st.file_uploader("Restore from a snapshot", type=["snapshot"])
+        if snapshot_file is not None and st.button("Restore Snapshot"):
+            try:
+                with Snapshot.from_bytes(snapshot_file.getvalue()) as snapshot:
+                    cohort.restore_snapshot(snapshot)
+                st.success(f"Restored {len(cohort.roster)} students and {len(cohort.groups)} groups")
+            except SnapshotError as e:
+                st.error(str(e))
+
+@METRICS.timed("admin.roster_table")
+def roster_table_section(cohort: Cohort):
+    """Render the response status and roster table."""
     # Display current roster
-    if st.session_state.roster:
+    roster = cohort.roster
+    if roster:
         st.subheader("Current Roster")
-        responses, total = GroupService.get_response_status(st.session_state.roster)
+        with cohort.lock:
+            responses, total = GroupService.get_response_status(roster)
+            roster_df = st.session_state.frame_cache.roster_frame(roster)
         st.progress(responses / total, text=f"Responses: {responses}/{total}")
-        
-        roster_df = pd.DataFrame([
-            {
-                "Name": s.name,
-                "Status": "✅" if s.has_responded else "⏳",
-                "Skill Level": f"{s.skill_level.emoji} ({s.skill_level.value}) - {s.skill_level.description}" if s.skill_level else ""
-            }
-            for s in st.session_state.roster
-        ])
         st.dataframe(roster_df, hide_index=True, use_container_width=True)
 
         if st.button("Clear Roster"):
-            st.session_state.roster = []
-            st.session_state.groups = []
+            cohort.clear()
             st.rerun()
 
-    # Group formation
+@METRICS.timed("admin.group_formation")
+def group_formation_section(cohort: Cohort):
+    """Render the group formation controls."""
     st.header("Group Formation")
-    st.session_state.group_size = st.number_input(
+    group_size = st.number_input(
         "Group Size",
         min_value=2,
         max_value=10,
-        value=st.session_state.group_size
+        value=cohort.group_size
     )
+    cohort.set_group_size(group_size)
+
+    constraints_section(cohort)
+    constrained = bool(cohort.constraints)
+    avoid_repeats = st.checkbox(
+        "Avoid repeat teammates",
+        help="Keeps apart students who were teammates in the recorded rounds",
+        disabled=constrained
+    ) and not constrained
+    best_of_several = st.checkbox(
+        "Try several shuffles and keep the most balanced",
+        help="Runs candidate groupings in parallel for up to two seconds",
+        disabled=constrained or avoid_repeats
+    ) and not (constrained or avoid_repeats)
+    refine = st.checkbox(
+        "Refine by swapping members between groups",
+        help="Swaps members while it makes group averages more even",
+        disabled=constrained or avoid_repeats
+    ) and not (constrained or avoid_repeats)
+    # Roster columns such as timezone or track, collected once per roster change
+    attribute_names = st.session_state.frame_cache.get(
+        ("attribute_names", cohort.cohort_id),
+        cohort.roster.version,
+        lambda: GroupService.attribute_names(cohort.students())
+    )
+    balance_on = []
+    if attribute_names:
+        balance_on = st.multiselect(
+            "Also balance on",
+            attribute_names,
+            help="Spreads each chosen roster column evenly across groups, "
+                 "in the order chosen (not used when trying several shuffles)",
+            disabled=constrained or avoid_repeats
+        ) if not (constrained or avoid_repeats) else []
 
     if st.button(
         "Create Groups",
-        disabled=not GroupService.validate_responses(st.session_state.roster)
+        disabled=not GroupService.validate_responses(cohort.roster)
     ):
         try:
-            st.session_state.groups = GroupService.create_stratified_groups(
-                st.session_state.roster,
-                st.session_state.group_size
-            )
+            if constrained:
+                groups = GroupService.create_constrained_groups(
+                    cohort.students(),
+                    group_size,
+                    cohort.constraints
+                )
+            elif avoid_repeats:
+                groups = GroupService.create_round_groups(
+                    cohort.students(),
+                    group_size,
+                    cohort.history
+                )
+            elif best_of_several:
+                # Group a snapshot, so the cohort stays unlocked while groups are formed
+                groups = GroupService.create_balanced_groups(
+                    cohort.students(),
+                    group_size,
+                    time_budget=2.0
+                )
+            else:
+                # Repeated presses reuse the validated strata until the roster changes
+                groups = cohort.grouping_plan(group_size, balance_on).reshuffle()
+            if refine:
+                groups = GroupService.refine_groups(groups, time_budget=2.0)
+            cohort.set_groups(groups)
             st.success("Groups created successfully!")
         except ValueError as e:
             st.error(str(e))
 
-    # Display groups
-    if st.session_state.groups:
-        st.subheader("Groups")
-        
-        # Create columns to display groups side by side
-        cols = st.columns(min(3, len(st.session_state.groups)))
-        
-        for idx, group in enumerate(st.session_state.groups, 1):
-            # Calculate which column to use
-            col_idx = (idx - 1) % len(cols)
-            
-            with cols[col_idx]:
-                st.write(f"#### 🎥 Breakout Room {idx}")
-                st.write(f"**{group.name}** {group.skill_emoji} (Avg: {group.average_skill_level:.1f})")
-                
-                # Create group data
-                group_data = [{
-                    "Name": f"{member.name}",
-                    "Skill Level": f"{member.skill_level.emoji} ({member.skill_level.value}) - {member.skill_level.description}"
-                } for member in group.members]
-                
-                # Display group table
-                group_df = pd.DataFrame(group_data)
-                st.dataframe(
-                    group_df,
-                    hide_index=True,
-                    use_container_width=True,
-                    column_config={
-                        "Name": st.column_config.Column(
-                            width="medium"
-                        ),
-                        "Skill Level": st.column_config.Column(
-                            width="large"
-                        )
-                    }
-                )
-                st.write("---")
+@METRICS.timed("admin.constraints")
+def constraints_section(cohort: Cohort):
+    """Edit the pairs of students to keep together or apart."""
+    constraints = cohort.constraints
+    with st.expander("Keep together / keep apart"):
+        with st.form("constraints_form"):
+            together = st.text_area(
+                "Keep together (one pair per line: Alice, Bob)",
+                "\n".join(", ".join(pair) for pair in constraints.together)
+            )
+            apart = st.text_area(
+                "Keep apart (one pair per line: Alice, Bob)",
+                "\n".join(", ".join(pair) for pair in constraints.apart)
+            )
+            if st.form_submit_button("Save Constraints"):
+                try:
+                    cohort.set_constraints(GroupingConstraints(parse_pairs(together), parse_pairs(apart)))
+                    st.success("Constraints saved")
+                except ValueError as e:
+                    st.error(str(e))
+    if cohort.constraints:
+        st.caption(
+            f"{len(cohort.constraints.together)} keep-together and {len(cohort.constraints.apart)} "
+            "keep-apart pairs apply, so the options below are off"
+        )
+
+@METRICS.timed("admin.group_changes")
+def group_changes_section(cohort: Cohort):
+    """Add late arrivals to, and take no-shows out of, the current rooms."""
+    with st.expander("Late arrivals and no-shows"):
+        with cohort.lock:
+            version = (cohort.roster.version, cohort.grouping_version)
+        # Responded students in no room, listed once per roster or grouping change
+        unassigned = st.session_state.frame_cache.get(
+            ("unassigned", cohort.cohort_id),
+            version,
+            lambda: [
+                s.name for s in cohort.students()
+                if s.has_responded and cohort.group_of(s.name) is None
+            ]
+        )
+        arrival_col, dropout_col = st.columns(2)
+        with arrival_col:
+            late = st.selectbox("Late arrival", unassigned, disabled=not unassigned)
+            if st.button("Add to a room", disabled=not unassigned):
+                try:
+                    group = cohort.assign_late_arrival(late)
+                    st.success(f"{late} joined {group.name}")
+                    st.rerun()
+                except (KeyError, ValueError) as e:
+                    st.error(str(e))
+        with dropout_col:
+            no_show = st.text_input("No-show", placeholder="Student name")
+            if st.button("Remove from room", disabled=not no_show):
+                try:
+                    touched = cohort.remove_from_groups(no_show.strip())
+                    moved = " and one member moved to rebalance" if len(touched) > 1 else ""
+                    st.success(f"{no_show.strip()} left {touched[0].name}{moved}")
+                    st.rerun()
+                except KeyError:
+                    st.error(f"{no_show.strip()} is not in a room")
+
+@METRICS.timed("admin.round_history")
+def round_history_section(cohort: Cohort):
+    """Record the current grouping as a round, so later rounds can avoid repeat teammates."""
+    record_col, status_col = st.columns([1, 2])
+    with record_col:
+        if st.button("Record as a round"):
+            st.success(f"Recorded round {cohort.record_round()}")
+    with cohort.lock:
+        groups, grouping_version = cohort.groups, cohort.grouping_version
+        history = cohort.history
+    # Scored once per grouping and recorded round, not on every rerun
+    repeats = st.session_state.frame_cache.get(
+        ("repeat_pairs", cohort.cohort_id),
+        (grouping_version, history.rounds),
+        lambda: history.repeat_pairs(groups)
+    )
+    with status_col:
+        st.caption(
+            f"{history.rounds} rounds recorded; {repeats} pairs in these groups have been teammates before"
+        )
+
+@METRICS.timed("admin.export")
+def export_groups_section(cohort: Cohort, groups: List[Group], grouping_version: int):
+    """Offer the grouping as a download in the chosen export format."""
+    format_col, download_col = st.columns([1, 2])
+    with format_col:
+        label = st.selectbox(
+            "Export format",
+            list(EXPORT_LABELS.values()),
+            label_visibility="collapsed"
+        )
+    fmt = EXPORT_FORMATS_BY_LABEL[label]
+    # Encoded once per cohort, grouping and format, not on every rerun
+    data = st.session_state.frame_cache.get(
+        ("export", cohort.cohort_id, fmt),
+        grouping_version,
+        lambda: export_bytes(groups, fmt)
+    )
+    with download_col:
+        st.download_button(
+            f"Download {EXPORT_LABELS[fmt]}",
+            data,
+            file_name=f"groups-{cohort_id()}.{EXPORT_EXTENSIONS[fmt]}",
+            mime=EXPORT_MIME_TYPES[fmt]
+        )
+
+@METRICS.timed("admin.groups")
+def render_groups(cohort: Cohort):
+    """Render the cohort's grouping one page of breakout rooms at a time."""
+    st.subheader("Groups")
+
+    # The combined table is built once per grouping, not on every rerun
+    with cohort.lock:
+        groups, grouping_version = cohort.groups, cohort.grouping_version
+    table = st.session_state.frame_cache.groups_table(cohort.cohort_id, groups, grouping_version)
+
+    export_groups_section(cohort, groups, grouping_version)
+
+    search_col, jump_col, page_col, view_col = st.columns([3, 1, 1, 1])
+    with search_col:
+        query = st.text_input("Search rooms", placeholder="Student or team name")
+    rooms = table.matching_rooms(query)
+    with jump_col:
+        jump_to = st.number_input("Jump to room", min_value=0, max_value=table.room_count, value=0)
+    with page_col:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=page_count(len(rooms), ROOMS_PER_PAGE),
+            value=1
+        )
+    with view_col:
+        view = st.radio("View", ["Cards", "Table"], horizontal=True)
+
+    if jump_to:
+        page = page_of(rooms, jump_to, ROOMS_PER_PAGE) or page
+    visible = page_slice(rooms, page, ROOMS_PER_PAGE)
+
+    st.caption(
+        f"Showing {len(visible)} of {len(rooms)} matching rooms "
+        f"({table.room_count} total)"
+    )
+    if len(visible) == 0:
+        st.info("No rooms match your search.")
+        return
+
+    if view == "Table":
+        summary = table.rooms.iloc[visible - 1]
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+        st.dataframe(table.member_rows(visible), hide_index=True, use_container_width=True)
+        return
+
+    # Create columns to display groups side by side
+    cols = st.columns(min(3, len(visible)))
+
+    for position, room in enumerate(visible):
+        info = table.room(room)
+        with cols[position % len(cols)]:
+            st.write(f"#### 🎥 {room_name(room)}")
+            st.write(f"**{info['Team']}** {info['Emoji']} (Avg: {info['Avg']:.1f})")
 
-def student_page():
+            # Display group table
+            st.dataframe(
+                table.member_rows([room]).drop(columns="Room"),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Name": st.column_config.Column(
+                        width="medium"
+                    ),
+                    "Skill Level": st.column_config.Column(
+                        width="large"
+                    )
+                }
+            )
+            st.write("---")
+
+@METRICS.timed("student.page")
+def student_page(cohort: Optional[Cohort]):
     """Render the student page."""
     st.title("Stratified Shuffle - Student Survey")
 
-    if not st.session_state.roster:
+    if cohort is None:
+        st.error(f"Cohort {cohort_id()} does not exist. Please check the link from your instructor.")
+        return
+
+    if not cohort.roster:
         st.warning("No students in roster yet. Please wait for the admin to add students.")
         return
 
-    # Student selection
-    available_students = [
-        s.name for s in st.session_state.roster if not s.has_responded
-    ]
+    # Student selection (submissions still queued count as done)
+    with METRICS.timer("student.available_names"):
+        available_students = cohort.pending_names()
     
     if not available_students:
         st.success("All students have completed the survey!")
         return
 
+    # A selectbox with different options is a new widget reset to the first
+    # name, so the list is kept while classmates submit and only rebuilt when
+    # this student's pick is taken or new students are added
+    options = st.session_state.get("student_names")
+    if (
+        options is None
+        or st.session_state.get("student_name") not in available_students
+        or not set(available_students) <= set(options)
+    ):
+        options = st.session_state.student_names = available_students
     selected_name = st.selectbox(
         "Select your name:",
-        options=available_students
+        options=options,
+        key="student_name"
     )
 
-    selected_student = next(
-        (s for s in st.session_state.roster if s.name == selected_name),
-        None
-    )
+    selected_student = cohort.get(selected_name)
 
     if selected_student:
         st.write("### How would you rate your current skill level?")
@@ -187,10 +524,50 @@ def student_page():
                 key=f"skill_{level.name}",
                 use_container_width=True
             ):
-                selected_student.submit_response(level)
+                try:
+                    with METRICS.timer("student.submit"):
+                        cohort.queue.submit(selected_student.name, level)
+                except (KeyError, ValueError) as e:
+                    st.error(str(e))
+                    return
                 st.success("Thanks for your response! ✨")
                 st.rerun()
 
+def _apply_metrics_toggle():
+    """Turn recording on or off for the whole process when an admin flips the toggle."""
+    METRICS.enabled = st.session_state.record_metrics
+
+def diagnostics_panel():
+    """Render timings and counters of this server process, with a JSON export."""
+    with st.expander("Diagnostics", expanded=True):
+        # The flag is process-wide: every session shows its current value, and
+        # only a flip of the toggle (not a rerun of another session) changes it
+        st.session_state.record_metrics = METRICS.enabled
+        st.toggle("Record metrics", key="record_metrics", on_change=_apply_metrics_toggle)
+        snapshot = METRICS.snapshot()
+        st.caption(
+            f"Recorded over {snapshot['elapsed_seconds']:.0f} s; "
+            f"{snapshot['phases'].get('app.rerun', {}).get('per_minute', 0)} reruns per minute"
+        )
+        if snapshot["phases"]:
+            st.dataframe(
+                pd.DataFrame.from_dict(snapshot["phases"], orient="index"),
+                use_container_width=True
+            )
+        if snapshot["counters"]:
+            st.json(snapshot["counters"])
+        export_col, reset_col = st.columns(2)
+        with export_col:
+            st.download_button(
+                "Export metrics (JSON)",
+                json.dumps(snapshot, indent=2),
+                file_name="stratified-shuffle-metrics.json",
+                mime="application/json"
+            )
+        with reset_col:
+            if st.button("Reset metrics"):
+                METRICS.reset()
+
 def main():
     """Main application entry point."""
     st.set_page_config(
@@ -199,15 +576,26 @@ def main():
         layout="wide"
     )
 
+    with METRICS.timer("app.rerun"):
+        run_page()
+
+def run_page():
+    """Render the page selected in the sidebar for the cohort in the URL."""
     init_session_state()
 
+    try:
+        cohort = current_cohort()
+    except ValueError as e:
+        st.error(str(e))
+        return
+
     # Page navigation
     page = st.sidebar.radio("Select Page", [DEFAULT_ADMIN_PAGE, DEFAULT_STUDENT_PAGE])
     
     if page == DEFAULT_ADMIN_PAGE:
-        admin_page()
+        admin_page(cohort)
     else:
-        student_page()
+        student_page(cohort)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,130 @@
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+from services.batch import METHODS, METHOD_STRATIFIED, group_roster_file
+from services.constraints import read_constraints
+from services.export import EXPORT_CSV, EXPORT_FORMATS
+from utils.constants import DEFAULT_GROUP_SIZE
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line options of the headless grouping run."""
+    parser = argparse.ArgumentParser(
+        prog="stratified-shuffle",
+        description="Form balanced groups from a roster file without starting the web app."
+    )
+    parser.add_argument("roster", help="Roster file (CSV/TSV with a skill level column), or a directory "
+                                       "of roster files to group as separate cohorts")
+    parser.add_argument("-o", "--output", default="-", help="Groups file to write (default: standard output); "
+                                                            "for a roster directory, the directory to write "
+                                                            "one groups file per cohort to")
+    parser.add_argument("-f", "--export-format", choices=EXPORT_FORMATS, default=EXPORT_CSV,
+                        help="csv (one row per member), jsonl (one line per group) or zoom "
+                             "(breakout room pre-assignment CSV)")
+    parser.add_argument("-g", "--group-size", type=int, default=DEFAULT_GROUP_SIZE, help="Target group size")
+    parser.add_argument("-m", "--method", choices=METHODS, default=METHOD_STRATIFIED, help="Grouping method")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible groups")
+    parser.add_argument("--refine", action="store_true", help="Swap members to even out group averages")
+    parser.add_argument("--workers", type=int, help="Worker processes for the balanced method or a roster "
+                                                    "directory (1 runs inline)")
+    parser.add_argument("--balance-on", default="", metavar="COLUMNS",
+                        help="Comma-separated roster columns to balance as well as skill level, "
+                             "e.g. timezone,track (stratified method)")
+    parser.add_argument("--constraints", metavar="FILE",
+                        help="CSV of rule,first name,second name rows, where rule is together or apart "
+                             "(stratified method)")
+    parser.add_argument("--history", metavar="FILE",
+                        help="JSON file of past rounds: avoid repeating teammates from it, then record "
+                             "this round in it (created if missing; stratified method)")
+    parser.add_argument("--format", dest="fmt", choices=["csv", "tsv", "text"],
+                        help="Roster format (default: from the file extension)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a headless grouping.
+
+    Args:
+        argv (Optional[List[str]]): Arguments; ``sys.argv[1:]`` if omitted
+
+    Returns:
+        int: Exit status (0 on success, 2 if the roster cannot be grouped)
+    """
+    args = build_parser().parse_args(argv)
+    if os.path.isdir(args.roster):
+        return _group_directory(args)
+    try:
+        constraints = read_constraints(args.constraints) if args.constraints else None
+        result = group_roster_file(
+            args.roster,
+            args.output,
+            group_size=args.group_size,
+            method=args.method,
+            seed=args.seed,
+            refine=args.refine,
+            fmt=args.fmt,
+            export_format=args.export_format,
+            workers=args.workers,
+            balance_on=[column.strip() for column in args.balance_on.split(",") if column.strip()],
+            constraints=constraints,
+            history_path=args.history
+        )
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(
+        f"Grouped {result.students} students into {result.groups} groups "
+        f"in {result.elapsed:.2f}s",
+        file=sys.stderr
+    )
+    if result.exported.skipped:
+        print(f"Skipped {result.exported.skipped} students without an email address", file=sys.stderr)
+    return 0
+
+
+def _group_directory(args: argparse.Namespace) -> int:
+    """Group every roster file of a directory as its own cohort, across worker processes."""
+    # The process pool is only needed here, so keep it off the default import path
+    from services.cohort_batch import group_cohorts
+
+    if args.output == "-":
+        print("error: grouping a roster directory needs --output DIRECTORY", file=sys.stderr)
+        return 2
+    if args.method != METHOD_STRATIFIED or args.refine or args.balance_on or args.constraints or args.history:
+        print(f"error: a roster directory is grouped with the plain {METHOD_STRATIFIED} method", file=sys.stderr)
+        return 2
+    try:
+        os.makedirs(args.output, exist_ok=True)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    start = time.monotonic()
+    grouped = failed = students = 0
+    for result in group_cohorts(
+        args.roster,
+        group_size=args.group_size,
+        seed=args.seed,
+        workers=args.workers,
+        output_dir=args.output,
+        export_format=args.export_format
+    ):
+        if result.ok:
+            grouped += 1
+            students += result.students
+        else:
+            failed += 1
+            print(f"error: {result.cohort_id}: {result.error}", file=sys.stderr)
+    print(
+        f"Grouped {students} students in {grouped} cohorts in {time.monotonic() - start:.2f}s"
+        + (f"; {failed} cohorts failed" if failed else ""),
+        file=sys.stderr
+    )
+    return 2 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
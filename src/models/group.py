@@ -1,31 +1,70 @@
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import InitVar, dataclass, field
+from typing import Dict, List, Optional
 import random
-from utils.constants import ADJECTIVES, ANIMALS
+from utils.constants import ADJECTIVES, ANIMALS, SkillLevel
 from models.student import Student
 
 @dataclass
 class Group:
     """
     Represents a group of students.
+
+    The member count, skill sum and per-level histogram are maintained
+    incrementally by ``add_member``/``remove_member``, so every derived
+    property is O(1). Change membership only through those methods; a
+    member's skill level is counted as it was when they joined.
     
     Attributes:
-        name (str): The generated fun name for the group
+        name (str): The group's name; a generated fun name unless given
         members (List[Student]): List of students in the group
+        rng (Optional[random.Random]): Generator for the name (init only);
+            the module-level ``random`` if omitted
     """
     members: List[Student] = field(default_factory=list)
-    name: str = field(init=False)
+    name: str = ""
+    _skill_sum: int = field(default=0, init=False, repr=False, compare=False)
+    _unrated: int = field(default=0, init=False, repr=False, compare=False)
+    _level_counts: Dict[SkillLevel, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    rng: InitVar[Optional[random.Random]] = None
+
+    def __post_init__(self, rng: Optional[random.Random]):
+        """Generate a random fun name for the group unless it has one, and count initial members."""
+        if not self.name:
+            rng = rng or random
+            self.name = f"{rng.choice(ADJECTIVES)} {rng.choice(ANIMALS)}"
+        self._level_counts = {level: 0 for level in SkillLevel}
+        for member in self.members:
+            self._count(member, 1)
+
+    def _count(self, student: Student, delta: int) -> None:
+        """Add (or with a negative delta, remove) a member's contribution to the aggregates."""
+        if student.skill_level:
+            self._skill_sum += delta * student.skill_level.value
+            self._level_counts[student.skill_level] += delta
+        else:
+            self._unrated += delta
 
-    def __post_init__(self):
-        """Generate a random fun name for the group."""
-        self.name = f"{random.choice(ADJECTIVES)} {random.choice(ANIMALS)}"
+    @property
+    def size(self) -> int:
+        """Number of members in the group."""
+        return len(self.members)
+
+    @property
+    def skill_sum(self) -> int:
+        """Sum of the members' skill level values."""
+        return self._skill_sum
+
+    @property
+    def level_counts(self) -> Dict[SkillLevel, int]:
+        """Number of members at each skill level."""
+        return dict(self._level_counts)
 
     @property
     def average_skill_level(self) -> float:
         """Calculate the average skill level of the group."""
-        if not self.members or not all(m.skill_level for m in self.members):
+        if not self.members or self._unrated:
             return 0.0
-        return sum(m.skill_level.value for m in self.members) / len(self.members)
+        return self._skill_sum / len(self.members)
     
     @property
     def skill_emoji(self) -> str:
@@ -42,6 +81,20 @@ class Group:
     def add_member(self, student: Student) -> None:
         """Add a student to the group."""
         self.members.append(student)
+        self._count(student, 1)
+
+    def remove_member(self, student: Student) -> None:
+        """
+        Remove a student from the group.
+
+        Args:
+            student (Student): The member to remove
+
+        Raises:
+            ValueError: If the student is not a member of the group
+        """
+        self.members.remove(student)
+        self._count(student, -1)
 
     def __str__(self) -> str:
         """String representation of the group."""
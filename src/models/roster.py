@@ -0,0 +1,212 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from models.student import Student
+from utils.constants import SkillLevel, ROSTER_CHANGE_LOG_SIZE
+from utils.metrics import METRICS
+
+class Roster:
+    """
+    Insertion-ordered collection of students indexed by name.
+
+    Names are unique: adding a student whose name is already on the roster
+    is a no-op. Lookups, membership tests and deduplication are O(1).
+
+    The roster also keeps running response counts and a per-level histogram,
+    updated on add/remove and whenever a member calls
+    ``Student.submit_response``, so status checks never rescan the roster.
+    A student should belong to at most one roster at a time.
+
+    Every change bumps ``version``, and a bounded log of recently changed
+    names lets caches patch just those rows (see ``changes_since``).
+    """
+
+    def __init__(self, students: Iterable[Student] = ()):
+        self._students: Dict[str, Student] = {}
+        self._responded = 0
+        self._level_counts: Dict[SkillLevel, int] = {level: 0 for level in SkillLevel}
+        # One shared bound method instead of a new one per member
+        self._listener = self._record_response
+        self._version = 0
+        self._reset_version = 0
+        self._changes: Deque[Tuple[int, str]] = deque(maxlen=ROSTER_CHANGE_LOG_SIZE)
+        self.extend(students)
+
+    def add(self, student: Student) -> bool:
+        """
+        Add a student unless one with the same name is already on the roster.
+
+        Args:
+            student (Student): The student to add
+
+        Returns:
+            bool: True if the student was added, False if it was a duplicate
+        """
+        if student.name in self._students:
+            return False
+        self._students[student.name] = student
+        self._count(student, 1)
+        student._on_response = self._listener
+        self._log_change(student.name)
+        return True
+
+    @METRICS.timed("roster.extend")
+    def extend(self, students: Iterable[Student]) -> int:
+        """
+        Add many students, skipping duplicates.
+
+        Args:
+            students (Iterable[Student]): The students to add
+
+        Returns:
+            int: Number of students actually added
+        """
+        return sum(1 for student in students if self.add(student))
+
+    @METRICS.timed("roster.add_names")
+    def add_names(self, names: Iterable[str]) -> int:
+        """
+        Add a new, unanswered student for each name not already on the roster.
+
+        Args:
+            names (Iterable[str]): Student names
+
+        Returns:
+            int: Number of students actually added
+        """
+        return self.extend(Student(name=name) for name in names if name not in self._students)
+
+    def get(self, name: str) -> Optional[Student]:
+        """
+        Look up a student by name.
+
+        Args:
+            name (str): The student's name
+
+        Returns:
+            Optional[Student]: The student, or None if not on the roster
+        """
+        return self._students.get(name)
+
+    @METRICS.timed("roster.remove")
+    def remove(self, name: str) -> Student:
+        """
+        Remove a student by name.
+
+        Args:
+            name (str): The student's name
+
+        Returns:
+            Student: The removed student
+
+        Raises:
+            KeyError: If no student with that name is on the roster
+        """
+        student = self._students.pop(name)
+        self._count(student, -1)
+        student._on_response = None
+        self._reset()
+        return student
+
+    @METRICS.timed("roster.clear")
+    def clear(self) -> None:
+        """Remove every student from the roster."""
+        for student in self._students.values():
+            student._on_response = None
+        self._students.clear()
+        self._responded = 0
+        self._level_counts = {level: 0 for level in SkillLevel}
+        self._reset()
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every change to the roster or a member's response."""
+        return self._version
+
+    def changes_since(self, version: int) -> Optional[List[str]]:
+        """
+        Names of students added or updated after the given version.
+
+        Args:
+            version (int): A version previously read from ``version``
+
+        Returns:
+            Optional[List[str]]: Changed names, oldest change first, or None if
+            the changes can't be replayed (a student was removed, or the
+            bounded change log no longer reaches back that far)
+        """
+        if version >= self._version:
+            return []
+        if version < self._reset_version or not self._changes or self._changes[0][0] > version + 1:
+            return None
+        names: Dict[str, None] = {}
+        for change_version, name in reversed(self._changes):
+            if change_version <= version:
+                break
+            names[name] = None
+        return list(reversed(names))
+
+    @property
+    def responded_count(self) -> int:
+        """Number of students who have submitted a response."""
+        return self._responded
+
+    @property
+    def pending_count(self) -> int:
+        """Number of students still waiting to respond."""
+        return len(self._students) - self._responded
+
+    @property
+    def all_responded(self) -> bool:
+        """Whether every student on the roster has responded."""
+        return self._responded == len(self._students)
+
+    @property
+    def level_counts(self) -> Dict[SkillLevel, int]:
+        """Number of students at each skill level."""
+        return dict(self._level_counts)
+
+    def _count(self, student: Student, delta: int) -> None:
+        """Add (or with a negative delta, remove) a student's contribution to the counters."""
+        if student.has_responded:
+            self._responded += delta
+        if student.skill_level:
+            self._level_counts[student.skill_level] += delta
+
+    def _record_response(self, student: Student) -> None:
+        """Update the counters after a member submits a response."""
+        METRICS.increment("roster.responses")
+        self._responded += 1
+        self._level_counts[student.skill_level] += 1
+        self._log_change(student.name)
+
+    def _log_change(self, name: str) -> None:
+        """Bump the version and remember which student changed."""
+        self._version += 1
+        self._changes.append((self._version, name))
+
+    def _reset(self) -> None:
+        """Bump the version for a change that can't be replayed row by row."""
+        self._version += 1
+        self._reset_version = self._version
+        self._changes.clear()
+
+    @property
+    def names(self) -> List[str]:
+        """Names of all students, in insertion order."""
+        return list(self._students)
+
+    def __contains__(self, item: object) -> bool:
+        name = item.name if isinstance(item, Student) else item
+        return name in self._students
+
+    def __iter__(self) -> Iterator[Student]:
+        return iter(self._students.values())
+
+    def __len__(self) -> int:
+        return len(self._students)
+
+    def __bool__(self) -> bool:
+        return bool(self._students)
+
+    def __repr__(self) -> str:
+        return f"Roster({len(self)} students)"
@@ -1,8 +1,29 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
+import sys
 from utils.constants import SkillLevel
 
-@dataclass
+# Slotted instances have no per-student __dict__ (dataclass slots need Python 3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def attribute_key(name: str) -> str:
+    """Attribute name as students are keyed on it: stripped and lowercase."""
+    return name.strip().lower()
+
+
+def frozen_attributes(attributes: Mapping[str, str]) -> Mapping[str, str]:
+    """
+    Read-only copy of attributes keyed by ``attribute_key``.
+
+    Students with the same values can share the result: no student can
+    change it under the others.
+    """
+    return MappingProxyType({attribute_key(name): value for name, value in attributes.items()})
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Student:
     """
     Represents a student in the system.
@@ -12,11 +33,27 @@ class Student:
         email (Optional[str]): The student's email (optional)
         skill_level (Optional[SkillLevel]): The student's self-reported skill level
         has_responded (bool): Whether the student has submitted their skill level
+        attributes (Optional[Mapping[str, str]]): Categorical attributes to balance
+            groups on, such as timezone, track or role (None when there are none,
+            so plain students carry no per-instance dict). Stored read-only and
+            keyed by ``attribute_key``, so "Timezone" and "timezone" are one
+            attribute; replace the mapping to change them
     """
     name: str
     email: Optional[str] = None
     skill_level: Optional[SkillLevel] = None
     has_responded: bool = False
+    attributes: Optional[Mapping[str, str]] = None
+    # Set by the owning Roster so it can keep its response counters current
+    _on_response: Optional[Callable[["Student"], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Freeze the attributes, unless they come from ``frozen_attributes`` already (as shared ones do)."""
+        attributes = self.attributes
+        if attributes is not None and type(attributes) is not MappingProxyType:
+            self.attributes = frozen_attributes(attributes) if attributes else None
 
     def submit_response(self, skill_level: SkillLevel) -> None:
         """
@@ -30,6 +67,22 @@ class Student:
         
         self.skill_level = skill_level
         self.has_responded = True
+        if self._on_response is not None:
+            self._on_response(self)
+
+    def attribute(self, name: str) -> str:
+        """
+        Value of a categorical attribute.
+
+        Args:
+            name (str): Attribute name, in any case
+
+        Returns:
+            str: The value, or an empty string if the student doesn't have it
+        """
+        if self.attributes is None:
+            return ""
+        return self.attributes.get(attribute_key(name), "")
 
     def __str__(self) -> str:
         """String representation with emoji if skill level is set."""
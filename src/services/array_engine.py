@@ -0,0 +1,214 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+import random
+import numpy as np
+from models.student import Student
+from models.group import Group
+from utils.constants import DEFAULT_GROUP_SIZE
+
+SeedLike = Union[None, int, np.random.SeedSequence]
+
+
+def count_groups(num_students: int, group_size: int) -> int:
+    """
+    Number of groups needed so that no group exceeds the target size.
+
+    Args:
+        num_students (int): Number of students to place
+        group_size (int): Target size for each group
+
+    Returns:
+        int: Number of groups (always at least 1)
+    """
+    if group_size < 1:
+        raise ValueError("Group size must be at least 1")
+    return max(1, (num_students + group_size - 1) // group_size)
+
+
+def skill_level_array(students: Iterable[Student]) -> np.ndarray:
+    """
+    Encode the students' skill levels as a compact integer array.
+
+    Students without a skill level are encoded as 0.
+
+    Args:
+        students (Iterable[Student]): Students to encode
+
+    Returns:
+        np.ndarray: ``uint8`` array of ``SkillLevel`` values
+    """
+    return np.fromiter(
+        (s.skill_level.value if s.skill_level else 0 for s in students),
+        dtype=np.uint8
+    )
+
+
+@dataclass(frozen=True)
+class GroupAssignment:
+    """
+    Compact result of an array-based stratified grouping.
+
+    Attributes:
+        order (np.ndarray): Student indices in the order they were dealt round-robin
+        num_groups (int): Number of groups the students were dealt into
+        deal (Optional[np.ndarray]): Group receiving each dealt position; None
+            for plain round-robin, where position ``p`` goes to ``p % num_groups``
+    """
+    order: np.ndarray
+    num_groups: int
+    deal: Optional[np.ndarray] = None
+
+    @property
+    def group_indices(self) -> np.ndarray:
+        """Group index of every student, aligned with the input array."""
+        indices = np.empty(len(self.order), dtype=np.int32)
+        if self.deal is None:
+            indices[self.order] = np.arange(len(self.order), dtype=np.int32) % self.num_groups
+        else:
+            indices[self.order] = self.deal
+        return indices
+
+    @property
+    def group_sizes(self) -> np.ndarray:
+        """Number of members in each group."""
+        return np.bincount(self.group_indices, minlength=self.num_groups)
+
+    def member_indices(self, group_idx: int) -> np.ndarray:
+        """
+        Student indices of one group, in the order they were dealt.
+
+        Args:
+            group_idx (int): Index of the group
+
+        Returns:
+            np.ndarray: Indices into the original student sequence
+        """
+        if self.deal is None:
+            return self.order[group_idx::self.num_groups]
+        return self.order[self.deal == group_idx]
+
+    def iter_groups(
+        self,
+        students: Sequence[Student],
+        rng: Optional[random.Random] = None
+    ) -> Iterator[Group]:
+        """
+        Lazily build ``Group`` objects from the assignment.
+
+        Args:
+            students (Sequence[Student]): The students the assignment was made for
+            rng (Optional[random.Random]): Generator for the team names
+
+        Yields:
+            Group: One group at a time, in group index order
+        """
+        if len(students) != len(self.order):
+            raise ValueError("Assignment does not match the number of students")
+        if self.deal is None:
+            members = (self.member_indices(idx) for idx in range(self.num_groups))
+        else:
+            # One stable sort instead of a full scan per group
+            by_group = self.order[np.argsort(self.deal, kind="stable")]
+            bounds = np.cumsum(np.bincount(self.deal, minlength=self.num_groups))[:-1]
+            members = iter(np.split(by_group, bounds))
+        for member_indices in members:
+            group = Group(rng=rng)
+            for student_idx in member_indices:
+                group.add_member(students[student_idx])
+            yield group
+
+    def to_groups(self, students: Sequence[Student], rng: Optional[random.Random] = None) -> List[Group]:
+        """Build all ``Group`` objects from the assignment."""
+        return list(self.iter_groups(students, rng))
+
+
+def stratified_assignment(
+    levels: np.ndarray,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    seed: SeedLike = None,
+    shuffle_rounds: bool = False
+) -> GroupAssignment:
+    """
+    Stratified round-robin assignment using array operations.
+
+    Students are stably sorted by skill level (highest first) after a random
+    permutation, which shuffles them inside each stratum, and are then dealt
+    to groups with modular indices. This gives the same balance as
+    ``GroupService.create_stratified_groups``: group sizes differ by at most
+    one, and so do the per-level counts of any two groups.
+
+    Plain round-robin always serves group 0 first in every round, which
+    skews early groups upwards. With ``shuffle_rounds`` each round of
+    ``num_groups`` positions is dealt to a fresh random permutation of the
+    groups. Group sizes still differ by at most one (per-level counts by at
+    most two, where a stratum starts or ends mid-round), and different seeds
+    now give differently balanced skill averages, which is what multi-trial
+    search needs.
+
+    Args:
+        levels (np.ndarray): Integer ``SkillLevel`` values, one per student
+        group_size (int): Target size for each group
+        seed (SeedLike): Seed (or ``SeedSequence``) for the shuffles
+        shuffle_rounds (bool): Deal each round to a random group permutation
+
+    Returns:
+        GroupAssignment: The compact assignment
+    """
+    levels = np.asarray(levels)
+    if levels.ndim != 1 or not np.issubdtype(levels.dtype, np.integer):
+        raise ValueError("Skill levels must be a one-dimensional integer array")
+    if np.any(levels <= 0):
+        raise ValueError("All students must respond before groups can be formed")
+
+    num_groups = count_groups(len(levels), group_size)
+    rng = np.random.default_rng(seed)
+
+    shuffled = rng.permutation(len(levels))
+    keys = -levels.astype(np.int64)[shuffled]
+    order = shuffled[np.argsort(keys, kind="stable")]
+    if not shuffle_rounds:
+        return GroupAssignment(order=order, num_groups=num_groups)
+
+    num_rounds = -(-len(levels) // num_groups)
+    round_permutations = np.argsort(rng.random((num_rounds, num_groups)), axis=1)
+    deal = round_permutations.ravel()[:len(levels)].astype(np.int32)
+    return GroupAssignment(order=order, num_groups=num_groups, deal=deal)
+
+
+@dataclass(frozen=True)
+class BalanceScore:
+    """
+    How evenly a grouping spreads skill and headcount (lower is better).
+
+    Attributes:
+        average_variance (float): Variance of the groups' average skill levels
+        size_spread (int): Largest minus smallest group size
+    """
+    average_variance: float
+    size_spread: int
+
+    @property
+    def total(self) -> float:
+        """Single figure used to rank candidate groupings."""
+        return self.average_variance + self.size_spread
+
+
+def balance_score(levels: np.ndarray, group_indices: np.ndarray, num_groups: int) -> BalanceScore:
+    """
+    Score a grouping by the spread of group averages and group sizes.
+
+    Args:
+        levels (np.ndarray): Integer ``SkillLevel`` values, one per student
+        group_indices (np.ndarray): Group index of every student
+        num_groups (int): Number of groups
+
+    Returns:
+        BalanceScore: The grouping's score
+    """
+    counts = np.bincount(group_indices, minlength=num_groups)
+    sums = np.bincount(group_indices, weights=levels, minlength=num_groups)
+    averages = sums / np.maximum(counts, 1)
+    return BalanceScore(
+        average_variance=float(averages.var()),
+        size_spread=int(counts.max() - counts.min())
+    )
@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from typing import Collection, List, Optional, Sequence
+import sys
+import time
+from models.group import Group
+from models.roster import Roster
+from models.student import Student
+from services.constraints import GroupingConstraints
+from services.export import EXPORT_CSV, ExportStats, export_groups, export_to_file
+from services.group_service import GroupService
+from services.roster_import import ImportProgress, RosterSource, import_roster
+from services.round_history import RoundHistory
+from utils.constants import DEFAULT_GROUP_SIZE, DEFAULT_IMPORT_CHUNK_SIZE
+
+# Only the standard library and the models are imported at module level, so
+# headless runs start fast; numpy is imported by the methods that need it.
+
+METHOD_STRATIFIED = "stratified"
+METHOD_VECTORIZED = "vectorized"
+METHOD_BALANCED = "balanced"
+METHODS = (METHOD_STRATIFIED, METHOD_VECTORIZED, METHOD_BALANCED)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """
+    Summary of a headless grouping run.
+
+    Attributes:
+        students (int): Students grouped
+        groups (int): Groups formed
+        imported (ImportProgress): Totals of the roster import
+        exported (ExportStats): Totals of the groups export
+        elapsed (float): Wall-clock seconds for import, grouping and writing
+    """
+    students: int
+    groups: int
+    imported: ImportProgress
+    exported: ExportStats
+    elapsed: float
+
+
+def form_groups(
+    students: Collection[Student],
+    group_size: int = DEFAULT_GROUP_SIZE,
+    method: str = METHOD_STRATIFIED,
+    seed: Optional[int] = None,
+    refine: bool = False,
+    workers: Optional[int] = None,
+    balance_on: Sequence[str] = (),
+    constraints: Optional[GroupingConstraints] = None,
+    history: Optional[RoundHistory] = None
+) -> List[Group]:
+    """
+    Group students with one of the ``GroupService`` methods.
+
+    Args:
+        students (Collection[Student]): Students to group; all must have a skill level
+        group_size (int): Target size for each group
+        method (str): ``"stratified"``, ``"vectorized"`` or ``"balanced"``
+        seed (Optional[int]): Seed for reproducible groups
+        refine (bool): Run the swap refinement stage afterwards
+        workers (Optional[int]): Worker processes for the balanced search (1 runs inline)
+        balance_on (Sequence[str]): Student attributes to balance on as well
+            as skill level (stratified method only)
+        constraints (Optional[GroupingConstraints]): Keep-together and
+            keep-apart pairs (stratified method only, without refinement)
+        history (Optional[RoundHistory]): Past rounds whose teammates should
+            not meet again (stratified method only, without the other options)
+
+    Returns:
+        List[Group]: The formed groups
+
+    Raises:
+        ValueError: If the method is unknown, a student has no skill level,
+            options don't combine, or the constraints can't be met
+            (``ConstraintError``)
+    """
+    if balance_on and method != METHOD_STRATIFIED:
+        raise ValueError(f"Balancing on attributes needs the {METHOD_STRATIFIED} method")
+    if history is not None:
+        if method != METHOD_STRATIFIED or refine or balance_on or constraints:
+            raise ValueError(
+                f"Avoiding past teammates needs the {METHOD_STRATIFIED} method, "
+                "without refinement, attribute balancing or constraints"
+            )
+        return GroupService.create_round_groups(students, group_size, history, seed)
+    if constraints:
+        if method != METHOD_STRATIFIED or refine or balance_on:
+            raise ValueError(
+                f"Constraints need the {METHOD_STRATIFIED} method, without refinement or attribute balancing"
+            )
+        return GroupService.create_constrained_groups(students, group_size, constraints, seed)
+    if method == METHOD_STRATIFIED:
+        groups = GroupService.create_stratified_groups(students, group_size, seed, balance_on)
+    elif method == METHOD_VECTORIZED:
+        groups = GroupService.create_stratified_groups_vectorized(students, group_size, seed)
+    elif method == METHOD_BALANCED:
+        groups = GroupService.create_balanced_groups(students, group_size, seed=seed, workers=workers)
+    else:
+        raise ValueError(f"Unknown grouping method: {method}")
+    if refine:
+        groups = GroupService.refine_groups(groups)
+    return groups
+
+
+def group_roster_file(
+    source: RosterSource,
+    output: str = "-",
+    group_size: int = DEFAULT_GROUP_SIZE,
+    method: str = METHOD_STRATIFIED,
+    seed: Optional[int] = None,
+    refine: bool = False,
+    fmt: Optional[str] = None,
+    export_format: str = EXPORT_CSV,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+    balance_on: Sequence[str] = (),
+    constraints: Optional[GroupingConstraints] = None,
+    history_path: Optional[str] = None
+) -> BatchResult:
+    """
+    Read a roster file, form groups and write them out, without the web app.
+
+    The roster must carry a skill level for every student (see
+    ``services.roster_import`` for the accepted columns).
+
+    Args:
+        source (RosterSource): Roster file path or open file
+        output (str): Path of the groups file, or ``"-"`` for standard output
+        group_size (int): Target size for each group
+        method (str): Grouping method (see ``form_groups``)
+        seed (Optional[int]): Seed for reproducible groups
+        refine (bool): Run the swap refinement stage afterwards
+        fmt (Optional[str]): Roster format; detected from the file name if omitted
+        export_format (str): Output format (see ``services.export``)
+        workers (Optional[int]): Worker processes for the balanced search
+        chunk_size (int): Rows parsed per import chunk
+        balance_on (Sequence[str]): Roster columns to balance on as well as
+            skill level (see ``form_groups``)
+        constraints (Optional[GroupingConstraints]): Keep-together and
+            keep-apart pairs (see ``form_groups``)
+        history_path (Optional[str]): JSON file of past rounds; the groups
+            avoid repeating past teammates and are then recorded as a new round
+
+    Returns:
+        BatchResult: Summary of the run
+
+    Raises:
+        ValueError: If the roster cannot be grouped
+    """
+    start = time.monotonic()
+    roster = Roster()
+    imported = import_roster(roster, source, fmt, chunk_size)
+    if roster.pending_count:
+        raise ValueError(
+            f"{roster.pending_count} students have no skill level; "
+            "add a skill level column to the roster"
+        )
+    history = RoundHistory.load(history_path) if history_path else None
+    groups = form_groups(roster, group_size, method, seed, refine, workers, balance_on, constraints, history)
+
+    if output == "-":
+        exported = export_groups(groups, sys.stdout, export_format)
+    else:
+        exported = export_to_file(groups, output, export_format)
+    if history is not None:
+        history.record_round(groups)
+        history.save(history_path)
+    return BatchResult(
+        students=len(roster),
+        groups=len(groups),
+        imported=imported,
+        exported=exported,
+        elapsed=time.monotonic() - start
+    )
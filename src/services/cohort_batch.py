@@ -0,0 +1,286 @@
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import islice
+from typing import Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+import os
+import time
+import zlib
+from models.group import Group
+from models.roster import Roster
+from models.student import Student
+from services.export import EXPORT_CSV, EXPORT_EXTENSIONS, export_to_file
+from services.group_service import GroupService
+from services.roster_import import import_roster
+from services.snapshot import Snapshot, encode_snapshot
+from utils.constants import SkillLevel, DEFAULT_GROUP_SIZE, DEFAULT_COHORT_CHUNK_SIZE
+
+ROSTER_EXTENSIONS = (".csv", ".tsv", ".tab", ".txt")
+
+# A roster crosses to a worker as a file path, or as its names and one byte
+# per skill level; never as pickled Student objects
+_Job = Tuple[str, Union[str, Tuple[Tuple[str, ...], bytes]]]
+_LEVELS = {level.value: level for level in SkillLevel}
+
+
+class _Outcome(NamedTuple):
+    """What a worker sends back for one cohort."""
+    cohort_id: str
+    students: int
+    elapsed: float
+    error: Optional[str] = None
+    output: Optional[str] = None
+    # Group names, then each group's members as roster positions (uint32)
+    group_names: Tuple[str, ...] = ()
+    group_sizes: bytes = b""
+    members: bytes = b""
+    # Roster and groups of a roster file, which only the worker has read
+    snapshot: Optional[bytes] = None
+
+
+@dataclass(frozen=True)
+class CohortResult:
+    """
+    Outcome of grouping one cohort in a multi-cohort batch.
+
+    Attributes:
+        cohort_id (str): The cohort, named after its roster file when read from a directory
+        students (int): Students grouped
+        elapsed (float): Seconds the worker spent on this cohort
+        error (Optional[str]): Why the cohort could not be grouped; None on success
+        output (Optional[str]): Groups file written, when an output directory was given
+    """
+    cohort_id: str
+    students: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    output: Optional[str] = None
+    _outcome: Optional[_Outcome] = field(default=None, repr=False, compare=False)
+    _roster: Optional[Sequence[Student]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        """Whether the cohort was grouped."""
+        return self.error is None
+
+    @cached_property
+    def groups(self) -> Optional[List[Group]]:
+        """
+        The groups, built on first access; None if the cohort failed or was
+        written to an output directory.
+
+        When rosters were passed in, the members are the caller's own
+        ``Student`` objects.
+        """
+        outcome = self._outcome
+        if outcome is None or outcome.error is not None or outcome.output is not None:
+            return None
+        if outcome.snapshot is not None:
+            with Snapshot.from_bytes(outcome.snapshot) as snapshot:
+                return snapshot.groups()
+        members = array("I", outcome.members)
+        groups, offset = [], 0
+        for name, size in zip(outcome.group_names, array("I", outcome.group_sizes)):
+            groups.append(Group(members=[self._roster[idx] for idx in members[offset:offset + size]], name=name))
+            offset += size
+        return groups
+
+
+def cohort_seed(seed: Optional[int], cohort_id: str) -> Optional[int]:
+    """Per-cohort seed: the same for a cohort whatever order or worker it runs in."""
+    if seed is None:
+        return None
+    return zlib.crc32(cohort_id.encode("utf-8"), seed & 0xFFFFFFFF)
+
+
+def roster_files(directory: Union[str, os.PathLike]) -> List[Tuple[str, str]]:
+    """
+    Roster files of a directory, as (cohort ID, path) pairs sorted by name.
+
+    Args:
+        directory (Union[str, os.PathLike]): Directory holding one roster file per cohort
+
+    Returns:
+        List[Tuple[str, str]]: The file name without extension, and the path
+    """
+    files = []
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        stem, extension = os.path.splitext(entry.name)
+        if entry.is_file() and extension.lower() in ROSTER_EXTENSIONS:
+            files.append((stem, entry.path))
+    return files
+
+
+def _pack_roster(students: Collection[Student]) -> Tuple[Tuple[str, ...], bytes]:
+    """Names and skill levels of a roster, the only fields grouping needs."""
+    return (
+        tuple(student.name for student in students),
+        bytes(student.skill_level.value if student.skill_level else 0 for student in students)
+    )
+
+
+def _group_cohort(
+    job: _Job,
+    group_size: int,
+    seed: Optional[int],
+    output_dir: Optional[str],
+    export_format: str
+) -> _Outcome:
+    """Group one cohort, turning a bad roster into an error outcome."""
+    cohort_id, source = job
+    start = time.monotonic()
+    try:
+        if isinstance(source, str):
+            roster = Roster()
+            import_roster(roster, source)
+            if roster.pending_count:
+                raise ValueError(f"{roster.pending_count} students have no skill level")
+            students: Collection[Student] = roster
+        else:
+            names, levels = source
+            if levels.count(0):
+                raise ValueError(f"{levels.count(0)} students have no skill level")
+            students = [
+                Student(name=name, skill_level=_LEVELS[level], has_responded=True)
+                for name, level in zip(names, levels)
+            ]
+        groups = GroupService.create_stratified_groups(students, group_size, cohort_seed(seed, cohort_id))
+        if output_dir is not None:
+            output = os.path.join(output_dir, f"{cohort_id}.{EXPORT_EXTENSIONS[export_format]}")
+            export_to_file(groups, output, export_format)
+            return _Outcome(cohort_id, len(students), time.monotonic() - start, output=output)
+    except (OSError, ValueError) as e:
+        return _Outcome(cohort_id, 0, time.monotonic() - start, error=str(e))
+
+    if isinstance(source, str):
+        return _Outcome(
+            cohort_id, len(students), time.monotonic() - start, snapshot=encode_snapshot(students, groups)
+        )
+    position = {id(student): idx for idx, student in enumerate(students)}
+    return _Outcome(
+        cohort_id,
+        len(students),
+        time.monotonic() - start,
+        group_names=tuple(group.name for group in groups),
+        group_sizes=array("I", [group.size for group in groups]).tobytes(),
+        members=array("I", [position[id(member)] for group in groups for member in group.members]).tobytes()
+    )
+
+
+def _group_chunk(
+    jobs: List[_Job],
+    group_size: int,
+    seed: Optional[int],
+    output_dir: Optional[str],
+    export_format: str
+) -> List[_Outcome]:
+    """Group several cohorts in one task, so small rosters don't pay a round trip each (runs in a worker)."""
+    return [_group_cohort(job, group_size, seed, output_dir, export_format) for job in jobs]
+
+
+def _result(outcome: _Outcome, students: Optional[Sequence[Student]]) -> CohortResult:
+    """A worker's outcome as a result, keeping the caller's students for rebuilding its groups."""
+    return CohortResult(
+        outcome.cohort_id,
+        students=outcome.students,
+        elapsed=outcome.elapsed,
+        error=outcome.error,
+        output=outcome.output,
+        _outcome=outcome,
+        _roster=students
+    )
+
+
+def group_cohorts(
+    rosters: Union[str, os.PathLike, Iterable[Tuple[str, Sequence[Student]]]],
+    group_size: int = DEFAULT_GROUP_SIZE,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    export_format: str = EXPORT_CSV,
+    chunk_size: int = DEFAULT_COHORT_CHUNK_SIZE
+) -> Iterator[CohortResult]:
+    """
+    Form stratified groups for many independent cohorts across a process pool.
+
+    Each cohort is grouped with ``GroupService.create_stratified_groups``.
+    Roster files are read by the workers themselves; rosters passed in cross
+    over as their names plus one byte per skill level, and come back as
+    group names plus member positions, which are mapped onto the caller's
+    own students. Cohorts are sent in chunks of ``chunk_size`` so pickling
+    and round trips stay small next to the grouping itself, and only a
+    bounded number of chunks is in flight, so an iterable of rosters is
+    consumed as the pool makes progress. A cohort that cannot be grouped
+    yields a result with ``error`` set and the others carry on.
+
+    Args:
+        rosters (Union[str, os.PathLike, Iterable[Tuple[str, Sequence[Student]]]]):
+            A directory with one roster file per cohort (see ``roster_files``),
+            or (cohort ID, students) pairs
+        group_size (int): Target size for each group
+        seed (Optional[int]): Root seed; each cohort gets its own seed derived
+            from it and the cohort ID
+        workers (Optional[int]): Worker processes; 1 runs inline. Defaults to the CPU count
+        output_dir (Optional[str]): Directory the workers write ``<cohort>.<ext>``
+            group files to; without one, the groups come back in the results
+        export_format (str): Format of the group files (see ``services.export``)
+        chunk_size (int): Cohorts per worker task
+
+    Yields:
+        CohortResult: One per cohort, in completion order
+
+    Raises:
+        ValueError: If the chunk size is below 1
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    if isinstance(rosters, (str, os.PathLike)):
+        jobs: Iterator[Tuple[_Job, Optional[Sequence[Student]]]] = (
+            (job, None) for job in roster_files(rosters)
+        )
+    else:
+        jobs = (((cohort_id, _pack_roster(students)), students) for cohort_id, students in rosters)
+    chunks = iter(lambda: list(islice(jobs, chunk_size)), [])
+    options = (group_size, seed, output_dir, export_format)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunks:
+            outcomes = _group_chunk([job for job, _ in chunk], *options)
+            yield from (_result(outcome, students) for outcome, (_, students) in zip(outcomes, chunk))
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    # Each task with its chunk and the pool running it
+    pending: Dict[Future, Tuple[list, ProcessPoolExecutor]] = {}
+    try:
+        while True:
+            # Two chunks per worker keep every process busy while results are read
+            for chunk in islice(chunks, 2 * workers - len(pending)):
+                future = executor.submit(_group_chunk, [job for job, _ in chunk], *options)
+                pending[future] = (chunk, executor)
+            if not pending:
+                executor.shutdown()
+                return
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk, pool = pending.pop(future)
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    for (cohort_id, _), _ in chunk:
+                        yield CohortResult(cohort_id, error=f"Worker failed: {e!r}")
+                    if isinstance(e, BrokenProcessPool) and pool is executor:
+                        # A worker died (killed, out of memory): its pool is unusable, so
+                        # the tasks in flight fail and the remaining cohorts get a new pool
+                        executor.shutdown(wait=False)
+                        executor = ProcessPoolExecutor(max_workers=workers)
+                    continue
+                yield from (_result(outcome, students) for outcome, (_, students) in zip(outcomes, chunk))
+    finally:
+        # Cancelled one by one: shutdown(cancel_futures=True) needs Python 3.9
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,672 @@
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from models.group import Group
+from models.roster import Roster
+from models.student import Student
+from services.constraints import GroupingConstraints
+from services.group_maintenance import GroupMaintainer
+from services.grouping_plan import GroupingPlan
+from services.response_queue import ResponseQueue
+from services.round_history import RoundHistory
+from services.roster_store import SQLiteRosterStore
+from services.snapshot import Snapshot, SnapshotError, encode_snapshot, write_snapshot
+from utils.constants import SkillLevel, DEFAULT_GROUP_SIZE, DEFAULT_COHORT_IDLE_TIMEOUT
+from utils.metrics import METRICS
+
+COHORT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_HASH_ITERATIONS = 100_000
+
+
+def validate_cohort_id(cohort_id: str) -> str:
+    """
+    Check that a cohort ID is safe to use in URLs and file names.
+
+    Args:
+        cohort_id (str): The requested ID
+
+    Returns:
+        str: The same ID
+
+    Raises:
+        ValueError: If the ID has characters other than letters, digits,
+            ``-`` and ``_``, or is longer than 64 characters
+    """
+    if not isinstance(cohort_id, str) or not COHORT_ID_PATTERN.match(cohort_id):
+        raise ValueError(
+            "Cohort IDs use 1-64 letters, digits, '-' or '_'"
+        )
+    return cohort_id
+
+
+def _hash_password(password: str, salt: bytes) -> bytes:
+    """Salted, slow hash of an admin password."""
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, _HASH_ITERATIONS)
+
+
+class Cohort:
+    """
+    One class: its roster, group size, current grouping and admin password.
+
+    Every change to a cohort happens under its own ``lock``, so cohorts never
+    wait on each other. The in-memory roster is authoritative while the
+    cohort is loaded; with a store, every change is also written through so
+    the cohort can be unloaded and loaded again later. Student submissions
+    go through the cohort's ``ResponseQueue`` and are applied in batches.
+    """
+
+    def __init__(
+        self,
+        cohort_id: str,
+        password_salt: bytes,
+        password_hash: bytes,
+        group_size: int = DEFAULT_GROUP_SIZE,
+        roster: Optional[Roster] = None,
+        store: Optional[SQLiteRosterStore] = None,
+        settings_path: Optional[str] = None,
+        constraints: Optional[GroupingConstraints] = None
+    ):
+        """
+        Create a cohort; use ``CohortManager`` rather than calling this directly.
+
+        Args:
+            cohort_id (str): The cohort's ID
+            password_salt (bytes): Salt of the admin password hash
+            password_hash (bytes): Hash of the admin password
+            group_size (int): Target size for each group
+            roster (Optional[Roster]): Students already loaded
+            store (Optional[SQLiteRosterStore]): Persistent roster storage
+            settings_path (Optional[str]): JSON file the settings are saved to
+            constraints (Optional[GroupingConstraints]): Keep-together and
+                keep-apart pairs applied when groups are formed
+        """
+        self.cohort_id = validate_cohort_id(cohort_id)
+        self.lock = threading.RLock()
+        self.roster = roster if roster is not None else Roster()
+        self.group_size = group_size
+        self.constraints = constraints or GroupingConstraints()
+        self.groups: List[Group] = []
+        self.grouping_version = 0
+        self.store = store
+        self.settings_path = settings_path
+        self.last_access = time.monotonic()
+        self._password_salt = password_salt
+        self._password_hash = password_hash
+        self._queue: Optional[ResponseQueue] = None
+        self._plan: Optional[GroupingPlan] = None
+        self._maintainer: Optional[GroupMaintainer] = None
+        self.history = RoundHistory.load(self.history_path) if self.history_path else RoundHistory()
+        self._recorded_version: Optional[int] = None
+
+    @classmethod
+    def new(
+        cls,
+        cohort_id: str,
+        admin_password: str,
+        group_size: int = DEFAULT_GROUP_SIZE,
+        store: Optional[SQLiteRosterStore] = None,
+        settings_path: Optional[str] = None
+    ) -> "Cohort":
+        """Create an empty cohort protected by the given admin password."""
+        if not admin_password:
+            raise ValueError("An admin password is required")
+        salt = secrets.token_bytes(16)
+        cohort = cls(
+            cohort_id,
+            salt,
+            _hash_password(admin_password, salt),
+            group_size,
+            store=store,
+            settings_path=settings_path
+        )
+        cohort.save_settings()
+        return cohort
+
+    @classmethod
+    def load(cls, cohort_id: str, settings_path: str, store: SQLiteRosterStore) -> "Cohort":
+        """Load a saved cohort from its settings file and roster store."""
+        with open(settings_path, encoding="utf-8") as f:
+            settings = json.load(f)
+        cohort = cls(
+            cohort_id,
+            bytes.fromhex(settings["password_salt"]),
+            bytes.fromhex(settings["password_hash"]),
+            settings.get("group_size", DEFAULT_GROUP_SIZE),
+            roster=store.load_roster(),
+            store=store,
+            settings_path=settings_path,
+            constraints=GroupingConstraints.from_dict(settings.get("constraints"))
+        )
+        if cohort.snapshot_path and os.path.exists(cohort.snapshot_path):
+            try:
+                with Snapshot.open(cohort.snapshot_path) as snapshot:
+                    # The store is authoritative for the roster; only the grouping is restored
+                    cohort.groups = [group for group in snapshot.groups(cohort.roster) if group.members]
+            except SnapshotError:
+                pass  # A damaged snapshot only loses the grouping, as before snapshots existed
+        return cohort
+
+    def _sibling_path(self, suffix: str) -> Optional[str]:
+        """A file next to the settings file, named after it."""
+        if self.settings_path is None:
+            return None
+        return f"{os.path.splitext(self.settings_path)[0]}{suffix}"
+
+    @property
+    def history_path(self) -> Optional[str]:
+        """JSON file past rounds are saved to, next to the settings file."""
+        return self._sibling_path(".history.json")
+
+    @property
+    def snapshot_path(self) -> Optional[str]:
+        """Snapshot file the roster and grouping are saved to, next to the settings file."""
+        return self._sibling_path(".snapshot")
+
+    def save_settings(self) -> None:
+        """Write the password hash, group size and constraints to the settings file, if any."""
+        if self.settings_path is None:
+            return
+        settings = {
+            "password_salt": self._password_salt.hex(),
+            "password_hash": self._password_hash.hex(),
+            "group_size": self.group_size,
+            "constraints": self.constraints.to_dict(),
+        }
+        # Write-then-rename, so a crash never leaves half a settings file
+        partial = f"{self.settings_path}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(settings, f)
+        os.replace(partial, self.settings_path)
+
+    def check_password(self, password: str) -> bool:
+        """Whether the password is this cohort's admin password."""
+        return hmac.compare_digest(_hash_password(password, self._password_salt), self._password_hash)
+
+    def touch(self) -> None:
+        """Mark the cohort as in use, postponing its eviction."""
+        self.last_access = time.monotonic()
+
+    @property
+    def queue(self) -> ResponseQueue:
+        """The cohort's submission queue, started on first use."""
+        with self.lock:
+            if self._queue is None:
+                self._queue = ResponseQueue(self)
+            return self._queue
+
+    def get(self, name: str) -> Optional[Student]:
+        """Look up a student by name."""
+        return self.roster.get(name)
+
+    def extend(self, students: Iterable[Student]) -> int:
+        """
+        Add students, skipping names already on the roster.
+
+        Args:
+            students (Iterable[Student]): The students to add
+
+        Returns:
+            int: Number of students actually added
+        """
+        with self.lock:
+            added, names = [], set()
+            for student in students:
+                if student.name not in names and student.name not in self.roster:
+                    names.add(student.name)
+                    added.append(student)
+            # Stored first, so a failed write leaves the roster as it was
+            if self.store is not None and added:
+                self.store.extend(added)
+            return self.roster.extend(added)
+
+    def add_names(self, names: Iterable[str]) -> int:
+        """Add a new, unanswered student for each name not already on the roster."""
+        return self.extend(Student(name=name) for name in names)
+
+    @METRICS.timed("cohort.submit_responses")
+    def submit_responses(self, responses: Iterable[Tuple[str, SkillLevel]]) -> List[str]:
+        """
+        Record a batch of responses (called by the cohort's queue).
+
+        Args:
+            responses (Iterable[Tuple[str, SkillLevel]]): (name, skill level) pairs
+
+        Returns:
+            List[str]: Names whose response was not recorded
+        """
+        accepted, rejected = {}, []
+        with self.lock:
+            for name, skill_level in responses:
+                student = self.roster.get(name)
+                if student is None or student.has_responded or name in accepted:
+                    rejected.append(name)
+                else:
+                    accepted[name] = (student, skill_level)
+            # Stored first: if the write fails, no student shows as responded,
+            # so the released names can be submitted again
+            if self.store is not None and accepted:
+                self.store.submit_responses((name, level) for name, (_, level) in accepted.items())
+            for student, skill_level in accepted.values():
+                student.submit_response(skill_level)
+        return rejected
+
+    def pending_names(self) -> List[str]:
+        """Names of students who have neither responded nor submitted a queued response."""
+        queue = self._queue
+        with self.lock:
+            return [
+                s.name for s in self.roster
+                if not s.has_responded and not (queue is not None and queue.is_submitted(s.name))
+            ]
+
+    def students(self) -> List[Student]:
+        """A consistent snapshot of the roster, for forming groups without holding the lock."""
+        with self.lock:
+            return list(self.roster)
+
+    def grouping_plan(self, group_size: int, attributes: Sequence[str] = ()) -> GroupingPlan:
+        """
+        The roster's strata, rebuilt only after the roster, group size or attributes changed.
+
+        Args:
+            group_size (int): Target size for each group
+            attributes (Sequence[str]): Student attributes to balance on
+
+        Returns:
+            GroupingPlan: A plan to ``reshuffle`` without holding the lock
+
+        Raises:
+            ValueError: If not every student has responded
+        """
+        with self.lock:
+            if self._plan is None or not self._plan.is_valid_for(self.roster, group_size, attributes):
+                self._plan = GroupingPlan(self.roster, group_size, attributes)
+            return self._plan
+
+    def set_group_size(self, group_size: int) -> None:
+        """Change the target group size and save it."""
+        with self.lock:
+            if group_size != self.group_size:
+                self.group_size = group_size
+                self.save_settings()
+
+    def set_constraints(self, constraints: GroupingConstraints) -> None:
+        """Replace the keep-together and keep-apart pairs and save them."""
+        with self.lock:
+            self.constraints = constraints
+            self.save_settings()
+
+    def save_snapshot(self) -> None:
+        """Write the roster and grouping to the snapshot file, if any."""
+        if self.snapshot_path is None:
+            return
+        with self.lock:
+            write_snapshot(self.snapshot_path, self.roster, self.groups)
+
+    def snapshot_bytes(self) -> bytes:
+        """
+        The roster and grouping in the snapshot format, for downloading.
+
+        Only copies of the students and groups are taken under the lock; the
+        encoding runs without it, so queued responses keep being applied.
+
+        Returns:
+            bytes: The snapshot
+        """
+        with self.lock:
+            students = [
+                Student(s.name, s.email, s.skill_level, s.has_responded, s.attributes)
+                for s in self.roster
+            ]
+            groups = [Group(members=list(g.members), name=g.name) for g in self.groups]
+        return encode_snapshot(students, groups)
+
+    def restore_snapshot(self, snapshot: Snapshot) -> None:
+        """
+        Replace the roster and grouping with those of a snapshot.
+
+        Args:
+            snapshot (Snapshot): The snapshot to restore
+
+        Raises:
+            SnapshotError: If the snapshot is damaged; the cohort is left as it was
+        """
+        # Decode everything before touching the cohort
+        roster = snapshot.to_roster()
+        groups = snapshot.groups(roster)
+        with self._locked_without_queue():
+            self._reset_roster()
+            self.extend(roster)
+            self.set_groups(groups)
+
+    def set_groups(self, groups: List[Group]) -> None:
+        """Replace the current grouping, bump its version for table caches and save it."""
+        with self.lock:
+            self.groups = groups
+            self.grouping_version += 1
+            self._maintainer = None
+            self.save_snapshot()
+
+    def record_round(self) -> int:
+        """
+        Remember the current teammates, so later groupings can avoid repeating them.
+
+        Recording the same grouping again has no effect.
+
+        Returns:
+            int: Number of rounds recorded so far
+        """
+        with self.lock:
+            if self._recorded_version != self.grouping_version:
+                self.history.record_round(self.groups)
+                self._recorded_version = self.grouping_version
+                if self.history_path:
+                    self.history.save(self.history_path)
+            return self.history.rounds
+
+    def clear_history(self) -> None:
+        """Forget all recorded rounds."""
+        with self.lock:
+            self.history = RoundHistory()
+            if self.history_path and os.path.exists(self.history_path):
+                os.remove(self.history_path)
+
+    def _group_maintainer(self) -> GroupMaintainer:
+        """Index of the current grouping, built on first use (the caller holds the lock)."""
+        if self._maintainer is None:
+            self._maintainer = GroupMaintainer(self.groups, self.group_size)
+        return self._maintainer
+
+    def group_of(self, name: str) -> Optional[Group]:
+        """The group a student is in, or None."""
+        with self.lock:
+            return self._group_maintainer().group_of(name)
+
+    def assign_late_arrival(self, name: str) -> Group:
+        """
+        Add a roster student to the best-fitting group without regrouping everyone.
+
+        Args:
+            name (str): The student's name
+
+        Returns:
+            Group: The group the student joined
+
+        Raises:
+            KeyError: If the student is not on the roster
+            ValueError: If there are no groups yet, or the student is already in
+                one or hasn't responded
+        """
+        with self.lock:
+            student = self.roster.get(name)
+            if student is None:
+                raise KeyError(name)
+            if not self.groups:
+                raise ValueError("Create groups before adding late arrivals")
+            group = self._group_maintainer().assign_late_arrival(student)
+            self.grouping_version += 1
+            return group
+
+    def remove_from_groups(self, name: str) -> List[Group]:
+        """
+        Take a student out of the grouping, moving at most one other member to rebalance.
+
+        Args:
+            name (str): The student's name
+
+        Returns:
+            List[Group]: The groups that changed
+
+        Raises:
+            KeyError: If the student is not in any group
+        """
+        with self.lock:
+            touched = self._group_maintainer().remove_member(name)
+            self.grouping_version += 1
+            return touched
+
+    @contextmanager
+    def _locked_without_queue(self) -> Iterator[None]:
+        """
+        Hold the lock with the submission queue closed and detached.
+
+        Closing applies what is still queued, and the flusher applies batches
+        under the lock, so the queue is closed with the lock released (again
+        if a submission started a new one meanwhile). The caller must not
+        hold the lock.
+        """
+        self.lock.acquire()
+        try:
+            while self._queue is not None:
+                queue, self._queue = self._queue, None
+                self.lock.release()
+                try:
+                    queue.close()
+                finally:
+                    self.lock.acquire()
+            yield
+        finally:
+            self.lock.release()
+
+    def _reset_roster(self) -> None:
+        """Empty the roster and its store (the caller holds the lock, with the queue closed)."""
+        self.roster.clear()
+        self._plan = None
+        if self.store is not None:
+            self.store.clear()
+
+    def clear(self) -> None:
+        """Remove every student, the current grouping and past rounds."""
+        # A new queue forgets claimed names, so re-added students can respond again
+        with self._locked_without_queue():
+            self._reset_roster()
+            self.clear_history()
+            self.set_groups([])
+
+    def close(self) -> None:
+        """Apply queued submissions, save the grouping and release the store."""
+        with self.lock:
+            queue, self._queue = self._queue, None
+        if queue is not None:
+            queue.close()
+        if self.groups:
+            # Keeps late arrivals and no-shows handled since the grouping was formed
+            self.save_snapshot()
+        if self.store is not None:
+            self.store.close()
+
+    def __repr__(self) -> str:
+        return f"Cohort({self.cohort_id!r}, students={len(self.roster)})"
+
+
+class CohortManager:
+    """
+    Registry of cohorts, loaded on demand and unloaded when idle.
+
+    The manager's own lock only guards its registry; loading a cohort from
+    disk, and all work on a loaded cohort, happen outside it. With a
+    ``data_dir`` each cohort is kept in ``<id>.db`` (roster), ``<id>.json``
+    (settings), ``<id>.history.json`` (past rounds) and ``<id>.snapshot``
+    (grouping), and idle cohorts are evicted from memory. Without one, cohorts live in memory only and
+    are never evicted.
+    """
+
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        idle_timeout: float = DEFAULT_COHORT_IDLE_TIMEOUT
+    ):
+        """
+        Create the manager.
+
+        Args:
+            data_dir (Optional[str]): Directory cohorts are saved in
+            idle_timeout (float): Seconds without access before a saved
+                cohort is unloaded
+        """
+        self.data_dir = data_dir
+        self.idle_timeout = idle_timeout
+        if data_dir is not None:
+            os.makedirs(data_dir, exist_ok=True)
+        self._cohorts: Dict[str, Cohort] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _paths(self, cohort_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """Roster database and settings file of a cohort."""
+        if self.data_dir is None:
+            return None, None
+        base = os.path.join(self.data_dir, cohort_id)
+        return f"{base}.db", f"{base}.json"
+
+    def _load_lock(self, cohort_id: str) -> threading.Lock:
+        """Per-cohort lock serializing loads and creation of that cohort."""
+        with self._lock:
+            return self._load_locks.setdefault(cohort_id, threading.Lock())
+
+    def get(self, cohort_id: str) -> Optional[Cohort]:
+        """
+        Return a cohort, loading it from disk if it is not in memory.
+
+        Args:
+            cohort_id (str): The cohort's ID
+
+        Returns:
+            Optional[Cohort]: The cohort, or None if it does not exist
+
+        Raises:
+            ValueError: If the ID is not a valid cohort ID
+        """
+        validate_cohort_id(cohort_id)
+        with self._lock:
+            cohort = self._cohorts.get(cohort_id)
+        if cohort is None:
+            with self._load_lock(cohort_id):
+                cohort = self._load(cohort_id)
+            if cohort is None:
+                return None
+        cohort.touch()
+        return cohort
+
+    def _load(self, cohort_id: str) -> Optional[Cohort]:
+        """Registered cohort, else load it from disk; the caller holds its load lock."""
+        with self._lock:
+            cohort = self._cohorts.get(cohort_id)
+        if cohort is not None:
+            return cohort
+        db_path, settings_path = self._paths(cohort_id)
+        if settings_path is None or not os.path.exists(settings_path):
+            return None
+        cohort = Cohort.load(cohort_id, settings_path, SQLiteRosterStore(db_path))
+        with self._lock:
+            self._cohorts[cohort_id] = cohort
+        return cohort
+
+    def create(
+        self,
+        cohort_id: str,
+        admin_password: str,
+        group_size: int = DEFAULT_GROUP_SIZE
+    ) -> Cohort:
+        """
+        Create a new, empty cohort.
+
+        Args:
+            cohort_id (str): The new cohort's ID
+            admin_password (str): Password for the cohort's admin page
+            group_size (int): Target size for each group
+
+        Returns:
+            Cohort: The new cohort
+
+        Raises:
+            ValueError: If the ID is invalid or already taken
+        """
+        validate_cohort_id(cohort_id)
+        with self._load_lock(cohort_id):
+            if self._load(cohort_id) is not None:
+                raise ValueError(f"Cohort {cohort_id} already exists")
+            db_path, settings_path = self._paths(cohort_id)
+            store = SQLiteRosterStore(db_path) if db_path is not None else None
+            cohort = Cohort.new(cohort_id, admin_password, group_size, store, settings_path)
+            with self._lock:
+                self._cohorts[cohort_id] = cohort
+        return cohort
+
+    def get_or_create(self, cohort_id: str, admin_password: str) -> Cohort:
+        """Return a cohort, creating it with the given password if it does not exist."""
+        cohort = self.get(cohort_id)
+        if cohort is not None:
+            return cohort
+        try:
+            return self.create(cohort_id, admin_password)
+        except ValueError:
+            # Created by someone else in the meantime
+            return self.get(cohort_id)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        Unload saved cohorts that have not been accessed for ``idle_timeout``.
+
+        A cohort that is busy (its lock is held) is kept until the next sweep.
+
+        Args:
+            now (Optional[float]): ``time.monotonic()`` value to compare against
+
+        Returns:
+            List[str]: IDs of the evicted cohorts
+        """
+        if self.data_dir is None:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            idle = [
+                cohort for cohort in self._cohorts.values()
+                if now - cohort.last_access >= self.idle_timeout
+            ]
+        evicted = []
+        for cohort in idle:
+            if not cohort.lock.acquire(blocking=False):
+                continue
+            try:
+                with self._lock:
+                    if cohort.last_access > now - self.idle_timeout:
+                        continue
+                    del self._cohorts[cohort.cohort_id]
+            finally:
+                cohort.lock.release()
+            cohort.close()
+            evicted.append(cohort.cohort_id)
+        return evicted
+
+    def maybe_evict_idle(self) -> List[str]:
+        """Run ``evict_idle`` at most once every tenth of the idle timeout."""
+        if time.monotonic() - self._last_sweep < self.idle_timeout / 10:
+            return []
+        return self.evict_idle()
+
+    def loaded_ids(self) -> List[str]:
+        """IDs of the cohorts currently in memory."""
+        with self._lock:
+            return list(self._cohorts)
+
+    def close(self) -> None:
+        """Unload every cohort."""
+        with self._lock:
+            cohorts = list(self._cohorts.values())
+            self._cohorts.clear()
+        for cohort in cohorts:
+            cohort.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cohorts)
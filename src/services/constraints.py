@@ -0,0 +1,350 @@
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Set, TextIO, Tuple, Union
+import csv
+import heapq
+import os
+import random
+from models.group import Group
+from models.student import Student
+from utils.constants import SkillLevel, DEFAULT_GROUP_SIZE
+
+TOGETHER = "together"
+APART = "apart"
+RULES = (TOGETHER, APART)
+
+Pair = Tuple[str, str]
+
+
+class ConstraintError(ValueError):
+    """Keep-together / keep-apart constraints that cannot be satisfied."""
+
+
+@dataclass
+class GroupingConstraints:
+    """
+    Pairs of students that must, or must not, share a group.
+
+    Attributes:
+        together (List[Pair]): Name pairs that must be in the same group
+            (co-presenters, say); chains of pairs form one cluster
+        apart (List[Pair]): Name pairs that must be in different groups
+            (a manager and their report, say)
+    """
+    together: List[Pair] = field(default_factory=list)
+    apart: List[Pair] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.together or self.apart)
+
+    def add(self, rule: str, first: str, second: str) -> None:
+        """
+        Add one pair.
+
+        Args:
+            rule (str): ``"together"`` or ``"apart"``
+            first (str): Name of one student
+            second (str): Name of the other student
+
+        Raises:
+            ValueError: If the rule is unknown or both names are the same
+        """
+        if rule not in RULES:
+            raise ValueError(f"Unknown constraint rule: {rule}")
+        if first == second:
+            raise ValueError(f"A constraint needs two different students, got {first} twice")
+        (self.together if rule == TOGETHER else self.apart).append((first, second))
+
+    def to_dict(self) -> Dict[str, List[List[str]]]:
+        """The pairs as JSON-ready lists, for cohort settings."""
+        return {
+            TOGETHER: [list(pair) for pair in self.together],
+            APART: [list(pair) for pair in self.apart],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "GroupingConstraints":
+        """Constraints saved with ``to_dict`` (None gives no constraints)."""
+        data = data or {}
+        return cls(
+            together=[(first, second) for first, second in data.get(TOGETHER, [])],
+            apart=[(first, second) for first, second in data.get(APART, [])]
+        )
+
+
+def parse_pairs(text: str) -> List[Pair]:
+    """
+    Read name pairs typed one per line, as ``Alice, Bob``.
+
+    Args:
+        text (str): The pairs; blank lines are ignored
+
+    Returns:
+        List[Pair]: The pairs in order
+
+    Raises:
+        ValueError: If a line does not hold exactly two different names
+    """
+    pairs = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        names = [name.strip() for name in line.split(",")]
+        if len(names) != 2 or not all(names) or names[0] == names[1]:
+            raise ValueError(f"Line {line_number}: expected two different names separated by a comma")
+        pairs.append((names[0], names[1]))
+    return pairs
+
+
+def read_constraints(source: Union[str, os.PathLike, TextIO]) -> GroupingConstraints:
+    """
+    Read constraints from a CSV file with rows ``rule,first name,second name``.
+
+    The rule is ``together`` or ``apart``; a header row starting with
+    ``rule`` is skipped.
+
+    Args:
+        source (Union[str, os.PathLike, TextIO]): File path or open text file
+
+    Returns:
+        GroupingConstraints: The constraints
+
+    Raises:
+        ValueError: If a row is malformed
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            return read_constraints(f)
+
+    constraints = GroupingConstraints()
+    for line_number, row in enumerate(csv.reader(source), start=1):
+        cells = [cell.strip() for cell in row]
+        if not any(cells) or (line_number == 1 and cells[0].lower() == "rule"):
+            continue
+        if len(cells) != 3:
+            raise ValueError(f"Line {line_number}: expected rule, first name, second name")
+        try:
+            constraints.add(cells[0].lower(), cells[1], cells[2])
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}") from None
+    return constraints
+
+
+class _DisjointSet:
+    """Union-find over ``0..n-1`` with union by size and path halving."""
+
+    __slots__ = ("parent", "size")
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> None:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+
+
+def create_constrained_groups(
+    students: Collection[Student],
+    group_size: int = DEFAULT_GROUP_SIZE,
+    constraints: Optional[GroupingConstraints] = None,
+    seed: Optional[Union[int, random.Random]] = None
+) -> List[Group]:
+    """
+    Form stratified groups that honor keep-together and keep-apart pairs.
+
+    Keep-together pairs are merged into units with union-find, and
+    keep-apart pairs become conflicts between units. Constrained units are
+    placed first, largest and most conflicted first, each into the
+    emptiest group that has room and holds none of its conflicts; groups
+    are kept in a heap by size, so a unit only looks past the groups it
+    conflicts with. Every other student is then dealt level by level,
+    highest first, to the group with the fewest students of that level.
+    Group sizes differ by at most one, as with the other methods. The whole
+    run is O((N + C) log G) for N students, C constraints and G groups.
+
+    Args:
+        students (Collection[Student]): Students to group; all must have responded
+        group_size (int): Target size for each group
+        constraints (Optional[GroupingConstraints]): Pairs to honor
+        seed (Optional[Union[int, random.Random]]): Seed or generator for
+            reproducible groups
+
+    Returns:
+        List[Group]: List of formed groups
+
+    Raises:
+        ConstraintError: If a constraint names an unknown student, or the
+            constraints cannot all be met with this group size
+        ValueError: If a student has not responded or the group size is below 1
+    """
+    if group_size < 1:
+        raise ValueError("Group size must be at least 1")
+    students = list(students)
+    if not all(student.has_responded and student.skill_level for student in students):
+        raise ValueError("All students must respond before groups can be formed")
+    constraints = constraints or GroupingConstraints()
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+
+    n = len(students)
+    num_groups = max(1, (n + group_size - 1) // group_size)
+    # Sizes differ by at most one: `capacity` in `full_slots` groups, one fewer in the rest
+    capacity = (n + num_groups - 1) // num_groups
+    full_slots = n - num_groups * (capacity - 1)
+
+    position = {student.name: idx for idx, student in enumerate(students)}
+
+    def lookup(name: str) -> int:
+        idx = position.get(name)
+        if idx is None:
+            raise ConstraintError(f"{name} is named in a constraint but is not on the roster")
+        return idx
+
+    units = _DisjointSet(n)
+    for first, second in constraints.together:
+        units.union(lookup(first), lookup(second))
+    conflicts: Dict[int, Set[int]] = {}
+    for first, second in constraints.apart:
+        first_unit, second_unit = units.find(lookup(first)), units.find(lookup(second))
+        if first_unit == second_unit:
+            raise ConstraintError(f"{first} and {second} must be kept both together and apart")
+        conflicts.setdefault(first_unit, set()).add(second_unit)
+        conflicts.setdefault(second_unit, set()).add(first_unit)
+
+    free: List[int] = []
+    members: Dict[int, List[int]] = {}
+    for idx in range(n):
+        unit = units.find(idx)
+        if units.size[unit] == 1 and unit not in conflicts:
+            free.append(idx)
+        else:
+            members.setdefault(unit, []).append(idx)
+    for unit_members in members.values():
+        if len(unit_members) > capacity:
+            names = ", ".join(students[idx].name for idx in unit_members)
+            raise ConstraintError(
+                f"{len(unit_members)} students must be kept together, but groups of "
+                f"{group_size} hold at most {capacity}: {names}"
+            )
+
+    assigned: List[List[int]] = [[] for _ in range(num_groups)]
+    level_counts = [dict.fromkeys(SkillLevel, 0) for _ in range(num_groups)]
+    at_capacity = 0
+    # Random tie-breaks, so equally good groups are picked in a seeded order
+    tie_breaks = list(range(num_groups))
+    rng.shuffle(tie_breaks)
+
+    def fits(group_idx: int, count: int) -> bool:
+        size = len(assigned[group_idx]) + count
+        return size < capacity or (size == capacity and at_capacity < full_slots)
+
+    def place(group_idx: int, indices: List[int]) -> None:
+        nonlocal at_capacity
+        assigned[group_idx].extend(indices)
+        for idx in indices:
+            level_counts[group_idx][students[idx].skill_level] += 1
+        if len(assigned[group_idx]) == capacity:
+            at_capacity += 1
+
+    unit_group: Dict[int, int] = {}
+
+    def take(heap: list, unit: int, indices: List[int], by_size: bool) -> int:
+        """Place a unit in the best group of ``heap`` that has room and none of its conflicts."""
+        forbidden = {unit_group[other] for other in conflicts.get(unit, ()) if other in unit_group}
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            if entry[-1] in forbidden:
+                skipped.append(entry)
+            elif fits(entry[-1], len(indices)):
+                chosen = entry[-1]
+                break
+            elif by_size:
+                # The emptiest allowed group is too full, so every other one is too
+                skipped.append(entry)
+                break
+            # Otherwise the group is full for good and leaves the heap
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        if chosen is None:
+            names = ", ".join(students[idx].name for idx in indices)
+            raise ConstraintError(
+                f"Cannot place {names}: every group with room holds someone they must be kept apart from"
+            )
+        place(chosen, indices)
+        if unit in conflicts:
+            unit_group[unit] = chosen
+        return chosen
+
+    # Keep-together clusters first, while every group has room: largest first,
+    # then by their highest level, to the emptiest group with fewest of that level
+    clusters = [unit for unit, indices in members.items() if len(indices) > 1]
+    rng.shuffle(clusters)
+    cluster_level = {
+        unit: max((students[idx].skill_level for idx in members[unit]), key=lambda level: level.value)
+        for unit in clusters
+    }
+    clusters.sort(
+        key=lambda unit: (len(members[unit]), cluster_level[unit].value, len(conflicts.get(unit, ()))),
+        reverse=True
+    )
+    heap: list = []
+    heap_for = None
+    for unit in clusters:
+        level = cluster_level[unit]
+        if heap_for != (len(members[unit]), level):
+            heap_for = (len(members[unit]), level)
+            heap = [
+                (len(assigned[group_idx]), level_counts[group_idx][level], tie_breaks[group_idx], group_idx)
+                for group_idx in range(num_groups)
+            ]
+            heapq.heapify(heap)
+        group_idx = take(heap, unit, members[unit], by_size=True)
+        heapq.heappush(
+            heap,
+            (len(assigned[group_idx]), level_counts[group_idx][level], tie_breaks[group_idx], group_idx)
+        )
+
+    # Then everyone else, level by level, highest first, to the group with the
+    # fewest of that level; students with keep-apart pairs go first in each level
+    by_level: Dict[SkillLevel, List[int]] = {level: [] for level in SkillLevel}
+    conflicted = [unit for unit, indices in members.items() if len(indices) == 1]
+    rng.shuffle(conflicted)
+    conflicted.sort(key=lambda unit: len(conflicts[unit]), reverse=True)
+    rng.shuffle(free)
+    for idx in conflicted + free:
+        by_level[students[idx].skill_level].append(idx)
+    for level in sorted(SkillLevel, key=lambda level: level.value, reverse=True):
+        pending = by_level[level]
+        if not pending:
+            continue
+        heap = [
+            (level_counts[group_idx][level], len(assigned[group_idx]), tie_breaks[group_idx], group_idx)
+            for group_idx in range(num_groups)
+            if fits(group_idx, 1)
+        ]
+        heapq.heapify(heap)
+        for idx in pending:
+            group_idx = take(heap, idx, [idx], by_size=False)
+            heapq.heappush(
+                heap,
+                (level_counts[group_idx][level], len(assigned[group_idx]), tie_breaks[group_idx], group_idx)
+            )
+
+    groups = [Group(rng=rng) for _ in range(num_groups)]
+    for group, indices in zip(groups, assigned):
+        for idx in indices:
+            group.add_member(students[idx])
+    return groups
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+import csv
+import io
+import json
+from models.group import Group
+from models.student import Student
+
+EXPORT_CSV = "csv"
+EXPORT_JSONL = "jsonl"
+EXPORT_ZOOM = "zoom"
+EXPORT_FORMATS = (EXPORT_CSV, EXPORT_JSONL, EXPORT_ZOOM)
+
+EXPORT_EXTENSIONS = {EXPORT_CSV: "csv", EXPORT_JSONL: "jsonl", EXPORT_ZOOM: "csv"}
+EXPORT_MIME_TYPES = {EXPORT_CSV: "text/csv", EXPORT_JSONL: "application/x-ndjson", EXPORT_ZOOM: "text/csv"}
+
+CSV_HEADER = ["Room", "Team", "Name", "Email", "Skill Level"]
+# Column names of Zoom's breakout room pre-assignment template
+ZOOM_HEADER = ["Pre-assign Room Name", "Email Address"]
+
+# Buffer size for files written by ``export_to_file``
+EXPORT_BUFFER_SIZE = 1 << 16
+
+
+@dataclass
+class ExportStats:
+    """
+    Totals of one export.
+
+    Attributes:
+        groups (int): Groups written
+        members (int): Members written
+        skipped (int): Members left out (Zoom rows need an email address)
+    """
+    groups: int = 0
+    members: int = 0
+    skipped: int = 0
+
+
+def room_name(room: int) -> str:
+    """Name of a breakout room as shown in the app and in Zoom exports."""
+    return f"Breakout Room {room}"
+
+
+def iter_rooms(groups: Iterable[Group]) -> Iterator[Tuple[int, Group]]:
+    """Number groups as breakout rooms from 1, consuming them one at a time."""
+    return enumerate(groups, start=1)
+
+
+def iter_member_rows(groups: Iterable[Group]) -> Iterator[Tuple[int, Group, Student]]:
+    """
+    Yield (room, group, member) for every member, without materializing the grouping.
+
+    Args:
+        groups (Iterable[Group]): Groups in room order; may be a lazy iterator,
+            such as ``GroupAssignment.iter_groups``
+
+    Yields:
+        Tuple[int, Group, Student]: One entry per member
+    """
+    for room, group in iter_rooms(groups):
+        for member in group.members:
+            yield room, group, member
+
+
+def _skill_value(student: Student) -> Optional[int]:
+    return student.skill_level.value if student.skill_level else None
+
+
+def _write_csv(groups: Iterable[Group], out: TextIO, stats: ExportStats) -> None:
+    writer = csv.writer(out)
+    writer.writerow(CSV_HEADER)
+    for room, group in iter_rooms(groups):
+        writer.writerows(
+            (room, group.name, member.name, member.email or "", _skill_value(member) or "")
+            for member in group.members
+        )
+        stats.groups += 1
+        stats.members += len(group.members)
+
+
+def _write_jsonl(groups: Iterable[Group], out: TextIO, stats: ExportStats) -> None:
+    for room, group in iter_rooms(groups):
+        record = {
+            "room": room,
+            "team": group.name,
+            "average_skill_level": round(group.average_skill_level, 2),
+            "members": [
+                {"name": m.name, "email": m.email, "skill_level": _skill_value(m)}
+                for m in group.members
+            ],
+        }
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write("\n")
+        stats.groups += 1
+        stats.members += len(group.members)
+
+
+def _write_zoom(groups: Iterable[Group], out: TextIO, stats: ExportStats) -> None:
+    writer = csv.writer(out)
+    writer.writerow(ZOOM_HEADER)
+    for room, group in iter_rooms(groups):
+        name = room_name(room)
+        emails = [member.email for member in group.members if member.email]
+        writer.writerows((name, email) for email in emails)
+        stats.groups += 1
+        stats.members += len(emails)
+        stats.skipped += len(group.members) - len(emails)
+
+
+_WRITERS = {EXPORT_CSV: _write_csv, EXPORT_JSONL: _write_jsonl, EXPORT_ZOOM: _write_zoom}
+
+
+def export_groups(groups: Iterable[Group], out: TextIO, fmt: str = EXPORT_CSV) -> ExportStats:
+    """
+    Stream groups to a text file as they are produced.
+
+    Rows are written group by group, so memory use does not grow with the
+    size of the grouping when ``groups`` is a lazy iterator.
+
+    Formats:
+        ``csv``: Room, Team, Name, Email, Skill Level; one row per member
+        ``jsonl``: one JSON object per group, with its members
+        ``zoom``: Zoom's breakout room pre-assignment CSV (room name,
+        participant email); members without an email are skipped
+
+    Args:
+        groups (Iterable[Group]): Groups in breakout room order
+        out (TextIO): Destination; CSV formats expect ``newline=""``
+        fmt (str): One of ``EXPORT_FORMATS``
+
+    Returns:
+        ExportStats: Totals of the export
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    writer = _WRITERS.get(fmt)
+    if writer is None:
+        raise ValueError(f"Unknown export format: {fmt}")
+    stats = ExportStats()
+    writer(groups, out, stats)
+    return stats
+
+
+def export_to_file(groups: Iterable[Group], path: str, fmt: str = EXPORT_CSV) -> ExportStats:
+    """Stream groups to a file through a large write buffer (see ``export_groups``)."""
+    with open(path, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER_SIZE) as out:
+        return export_groups(groups, out, fmt)
+
+
+def export_bytes(groups: Iterable[Group], fmt: str = EXPORT_CSV) -> bytes:
+    """The whole export as UTF-8 bytes, for a download button."""
+    out = io.StringIO(newline="")
+    export_groups(groups, out, fmt)
+    return out.getvalue().encode("utf-8")
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+import weakref
+from typing import Any, Callable, Hashable, Iterable, List, Sequence, Tuple
+import pandas as pd
+from models.group import Group
+from models.roster import Roster
+from models.student import Student
+from services.group_table import GroupsTable, skill_label
+from utils.constants import FRAME_CACHE_SIZE
+
+ROSTER_COLUMNS = ["Name", "Status", "Skill Level"]
+
+
+def roster_rows(students: Iterable[Student]) -> List[Tuple[str, str, str]]:
+    """Display rows (name, status, skill level) for students."""
+    return [
+        (s.name, "✅" if s.has_responded else "⏳", skill_label(s.skill_level))
+        for s in students
+    ]
+
+
+def roster_frame(students: Iterable[Student]) -> pd.DataFrame:
+    """
+    Build the admin roster table, indexed by student name.
+
+    Args:
+        students (Iterable[Student]): Students to show, in display order
+
+    Returns:
+        pd.DataFrame: Name, Status and Skill Level columns
+    """
+    frame = pd.DataFrame.from_records(roster_rows(students), columns=ROSTER_COLUMNS)
+    frame.index = pd.Index(frame["Name"], name=None)
+    return frame
+
+
+class FrameCache:
+    """
+    Bounded LRU cache of the admin page's tables, keyed on data versions.
+
+    A table is rebuilt only when the version of its source changes. For a
+    ``Roster``, a handful of changed students are patched into the cached
+    table instead of rebuilding it. At most ``max_entries`` tables are kept,
+    so long-lived sessions don't accumulate stale ones.
+    """
+
+    def __init__(self, max_entries: int = FRAME_CACHE_SIZE):
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least one entry")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.patches = 0
+        self.rebuilds = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Return the cached (version, value) pair for a key and mark it recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Hashable, version: int, value: Any) -> Any:
+        """Cache a value, evicting the least recently used entries beyond the bound."""
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def get(self, key: Hashable, version: int, build: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key`` if built at ``version``, else build it.
+
+        Args:
+            key (Hashable): Cache key
+            version (int): Current version of the source data
+            build (Callable[[], Any]): Builds the value from scratch
+
+        Returns:
+            Any: The cached or newly built value
+        """
+        entry = self._lookup(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.rebuilds += 1
+        return self._store(key, version, build())
+
+    def roster_frame(self, roster: Roster) -> pd.DataFrame:
+        """
+        The roster table, patched or rebuilt only when the roster changed.
+
+        Args:
+            roster (Roster): The roster to show
+
+        Returns:
+            pd.DataFrame: The roster table (see ``roster_frame``)
+        """
+        key = ("roster", id(roster))
+        entry = self._lookup(key)
+        # The weak reference guards against a new roster reusing a dead one's id
+        if entry is not None and entry[1][0]() is roster:
+            cached_version, (ref, frame) = entry
+            if cached_version == roster.version:
+                self.hits += 1
+                return frame
+            changed = roster.changes_since(cached_version)
+            if changed is not None:
+                self.patches += 1
+                frame = _patch_roster_frame(frame, roster, changed)
+                return self._store(key, roster.version, (ref, frame))[1]
+        self.rebuilds += 1
+        frame = roster_frame(roster)
+        return self._store(key, roster.version, (weakref.ref(roster), frame))[1]
+
+    def groups_table(self, cohort_id: str, groups: Sequence[Group], grouping_version: int) -> GroupsTable:
+        """
+        The combined groups table for one cohort's grouping.
+
+        Args:
+            cohort_id (str): Cohort the grouping belongs to; versions of different cohorts can match
+            groups (Sequence[Group]): The grouping to show
+            grouping_version (int): Bumped whenever a new grouping is formed
+
+        Returns:
+            GroupsTable: The cached or newly built table
+        """
+        return self.get(("groups", cohort_id), grouping_version, lambda: GroupsTable.from_groups(groups))
+
+
+def _patch_roster_frame(frame: pd.DataFrame, roster: Roster, changed: List[str]) -> pd.DataFrame:
+    """Update changed rows in place and append newly added students."""
+    students = [s for s in map(roster.get, changed) if s is not None]
+    existing = [s for s in students if s.name in frame.index]
+    if existing:
+        rows = roster_rows(existing)
+        frame.loc[[s.name for s in existing], ROSTER_COLUMNS[1:]] = [row[1:] for row in rows]
+
+    added = [s for s in students if s.name not in frame.index]
+    if added:
+        frame = pd.concat([frame, roster_frame(added)])
+    return frame
@@ -0,0 +1,175 @@
+from typing import Dict, List, Optional, Tuple
+import heapq
+import random
+from models.group import Group
+from models.student import Student
+
+
+class GroupMaintainer:
+    """
+    Keeps a formed grouping balanced as students arrive late or drop out.
+
+    Rooms people have already joined are left alone: an operation only
+    changes the groups it returns. Groups are indexed in three heaps keyed
+    on size and skill sum (smallest and weakest, smallest and strongest,
+    largest), so finding where a student fits, or which group can spare a
+    member, is O(log G) for G groups. Entries are invalidated lazily by a
+    per-group version and the heaps are compacted once stale entries
+    outnumber live ones.
+    """
+
+    def __init__(
+        self,
+        groups: List[Group],
+        group_size: Optional[int] = None,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Index an existing grouping; the groups are changed in place.
+
+        Args:
+            groups (List[Group]): The grouping to maintain
+            group_size (Optional[int]): Once every group has this many members,
+                a late arrival opens a new group; without it groups just grow
+            rng (Optional[random.Random]): Generator for the names of new groups
+        """
+        self.groups = groups
+        self.group_size = group_size
+        self._rng = rng
+        self._group_of: Dict[str, int] = {
+            member.name: idx for idx, group in enumerate(groups) for member in group.members
+        }
+        self._versions = [0] * len(groups)
+        self._rated = 0
+        self._skill_total = 0
+        for group in groups:
+            self._skill_total += group.skill_sum
+            self._rated += sum(group.level_counts.values())
+        self._rebuild()
+
+    def _entries(self, idx: int) -> Tuple[tuple, tuple, tuple]:
+        """Heap entries of one group at its current version."""
+        group, version = self.groups[idx], self._versions[idx]
+        return (
+            (group.size, group.skill_sum, version, idx),
+            (group.size, -group.skill_sum, version, idx),
+            (-group.size, group.skill_sum, version, idx),
+        )
+
+    def _rebuild(self) -> None:
+        """Rebuild the heaps from the live groups only."""
+        entries = [self._entries(idx) for idx in range(len(self.groups))]
+        self._weakest = [weakest for weakest, _, _ in entries]
+        self._strongest = [strongest for _, strongest, _ in entries]
+        self._largest = [largest for _, _, largest in entries]
+        for heap in (self._weakest, self._strongest, self._largest):
+            heapq.heapify(heap)
+
+    def _touch(self, idx: int) -> None:
+        """Re-index a group after its members changed."""
+        self._versions[idx] += 1
+        weakest, strongest, largest = self._entries(idx)
+        heapq.heappush(self._weakest, weakest)
+        heapq.heappush(self._strongest, strongest)
+        heapq.heappush(self._largest, largest)
+        if len(self._weakest) > 2 * len(self.groups) + 16:
+            self._rebuild()
+
+    def _top(self, heap: List[tuple]) -> Optional[int]:
+        """Index of the best live group of a heap, dropping stale entries."""
+        while heap and heap[0][2] != self._versions[heap[0][3]]:
+            heapq.heappop(heap)
+        return heap[0][3] if heap else None
+
+    def group_of(self, name: str) -> Optional[Group]:
+        """The group a student is in, or None."""
+        idx = self._group_of.get(name)
+        return self.groups[idx] if idx is not None else None
+
+    def assign_late_arrival(self, student: Student) -> Group:
+        """
+        Put a student who arrived after grouping into the best-fitting group.
+
+        The student joins one of the smallest groups, so sizes stay within
+        one of each other. Among those, a student above the average skill
+        level joins the weakest group and anyone else the strongest. If
+        every group already has ``group_size`` members, a new group is
+        opened instead.
+
+        Args:
+            student (Student): The late student
+
+        Returns:
+            Group: The group the student joined (the only one changed)
+
+        Raises:
+            ValueError: If the student is already in a group or hasn't responded
+        """
+        if student.name in self._group_of:
+            raise ValueError(f"{student.name} is already in a group")
+        # Groups count a member's level as it was on joining, so a level
+        # submitted later would be taken off on removal without ever being added
+        if not student.has_responded or not student.skill_level:
+            raise ValueError(f"{student.name} has not submitted a skill level yet")
+
+        strong = self._rated == 0 or student.skill_level.value * self._rated >= self._skill_total
+        idx = self._top(self._weakest if strong else self._strongest)
+        if idx is None or (self.group_size is not None and self.groups[idx].size >= self.group_size):
+            idx = len(self.groups)
+            self.groups.append(Group(rng=self._rng))
+            self._versions.append(0)
+
+        self._add(idx, student)
+        return self.groups[idx]
+
+    def remove_member(self, name: str) -> List[Group]:
+        """
+        Take a student who dropped out out of their group.
+
+        If that leaves the group two members short of the largest one, a
+        member of the same (or the nearest) skill level moves over from the
+        largest group, so sizes stay within one of each other.
+
+        Args:
+            name (str): The student's name
+
+        Returns:
+            List[Group]: The groups changed: the student's, and the donor if any
+
+        Raises:
+            KeyError: If the student is not in any group
+        """
+        idx = self._group_of[name]
+        group = self.groups[idx]
+        student = next(member for member in group.members if member.name == name)
+        self._remove(idx, student)
+        touched = [group]
+
+        donor_idx = self._top(self._largest)
+        if donor_idx is not None and self.groups[donor_idx].size - group.size >= 2:
+            donor = self.groups[donor_idx]
+            level = student.skill_level.value if student.skill_level else 0
+            moving = min(
+                donor.members,
+                key=lambda member: abs((member.skill_level.value if member.skill_level else 0) - level)
+            )
+            self._remove(donor_idx, moving)
+            self._add(idx, moving)
+            touched.append(donor)
+        return touched
+
+    def _add(self, idx: int, student: Student) -> None:
+        self.groups[idx].add_member(student)
+        self._group_of[student.name] = idx
+        if student.skill_level:
+            self._rated += 1
+            self._skill_total += student.skill_level.value
+        self._touch(idx)
+
+    def _remove(self, idx: int, student: Student) -> None:
+        self.groups[idx].remove_member(student)
+        del self._group_of[student.name]
+        if student.skill_level:
+            self._rated -= 1
+            self._skill_total -= student.skill_level.value
+        self._touch(idx)
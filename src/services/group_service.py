@@ -1,80 +1,283 @@
-from typing import List, Dict
+from typing import Collection, List, Optional, Sequence
 import random
 from models.student import Student
 from models.group import Group
-from utils.constants import SkillLevel, DEFAULT_GROUP_SIZE
+from models.roster import Roster
+from services.constraints import GroupingConstraints, create_constrained_groups
+from services.grouping_plan import GroupingPlan
+from services.round_history import RoundHistory, create_round_groups
+from utils.metrics import METRICS
+from utils.constants import (
+    DEFAULT_GROUP_SIZE,
+    DEFAULT_BALANCE_TRIALS,
+    DEFAULT_REFINEMENT_PASSES
+)
 
 class GroupService:
     """Service class for handling group formation logic."""
 
     @staticmethod
-    def create_stratified_groups(students: List[Student], group_size: int = DEFAULT_GROUP_SIZE) -> List[Group]:
+    @METRICS.timed("group_service.create_stratified_groups")
+    def create_stratified_groups(
+        students: Collection[Student],
+        group_size: int = DEFAULT_GROUP_SIZE,
+        seed: Optional[int] = None,
+        attributes: Sequence[str] = ()
+    ) -> List[Group]:
         """
         Create balanced groups using stratified round-robin distribution.
+
+        To shuffle the same roster several times, build a ``GroupingPlan``
+        once and call its ``reshuffle`` instead.
         
         Args:
-            students (List[Student]): List of students to group
+            students (Collection[Student]): Students to group (a list or a ``Roster``)
             group_size (int): Target size for each group
+            seed (Optional[int]): Seed for reproducible shuffles and team names
+            attributes (Sequence[str]): Student attributes to balance on as
+                well as skill level, such as ``("timezone", "track")``
             
         Returns:
             List[Group]: List of formed groups
         """
-        if not all(student.has_responded for student in students):
+        return GroupingPlan(students, group_size, attributes).reshuffle(seed)
+
+    @staticmethod
+    @METRICS.timed("group_service.create_stratified_groups_vectorized")
+    def create_stratified_groups_vectorized(
+        students: Collection[Student],
+        group_size: int = DEFAULT_GROUP_SIZE,
+        seed: Optional[int] = None
+    ) -> List[Group]:
+        """
+        Create balanced groups with the NumPy array engine.
+
+        Produces the same balance as ``create_stratified_groups`` but sorts,
+        shuffles and deals the whole roster with array operations, which
+        scales to hundreds of thousands of students.
+
+        Args:
+            students (Collection[Student]): Students to group (a list or a ``Roster``)
+            group_size (int): Target size for each group
+            seed (Optional[int]): Seed for reproducible shuffles
+
+        Returns:
+            List[Group]: List of formed groups
+        """
+        # numpy is only needed here, so keep it off the default import path
+        from services.array_engine import skill_level_array, stratified_assignment
+
+        if not GroupService.validate_responses(students):
             raise ValueError("All students must respond before groups can be formed")
 
-        # Calculate number of groups needed
-        num_students = len(students)
-        num_groups = max(1, (num_students + group_size - 1) // group_size)
-        groups = [Group() for _ in range(num_groups)]
+        students = list(students)
+        assignment = stratified_assignment(skill_level_array(students), group_size, seed)
+        return assignment.to_groups(students, random.Random(seed))
 
-        # Sort students by skill level and shuffle within each level
-        students_by_level: Dict[SkillLevel, List[Student]] = {
-            level: [] for level in SkillLevel
-        }
-        
-        for student in students:
-            if student.skill_level:
-                students_by_level[student.skill_level].append(student)
+    @staticmethod
+    @METRICS.timed("group_service.create_balanced_groups")
+    def create_balanced_groups(
+        students: Collection[Student],
+        group_size: int = DEFAULT_GROUP_SIZE,
+        trials: int = DEFAULT_BALANCE_TRIALS,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        target_score: Optional[float] = None,
+        time_budget: Optional[float] = None
+    ) -> List[Group]:
+        """
+        Create the most balanced of several stratified groupings.
 
-        # Shuffle each skill level group
-        for level_group in students_by_level.values():
-            random.shuffle(level_group)
+        Candidates are generated in parallel worker processes with
+        independent seeds and ranked by the variance of group averages plus
+        the spread in group sizes. See ``services.trials.best_of_trials``.
 
-        # Distribute students in round-robin fashion, starting with highest skill level
-        current_group_idx = 0
-        
-        # Start with highest skill level and work down
-        for level in reversed(list(SkillLevel)):
-            level_students = students_by_level[level]
-            for student in level_students:
-                groups[current_group_idx].add_member(student)
-                current_group_idx = (current_group_idx + 1) % num_groups
+        Args:
+            students (Collection[Student]): Students to group (a list or a ``Roster``)
+            group_size (int): Target size for each group
+            trials (int): Maximum number of candidate groupings
+            seed (Optional[int]): Root seed for reproducible searches
+            workers (Optional[int]): Worker processes (1 runs inline)
+            target_score (Optional[float]): Stop early once a candidate scores this low
+            time_budget (Optional[float]): Wall-clock seconds to spend searching
+
+        Returns:
+            List[Group]: List of formed groups
+        """
+        # numpy is only needed here, so keep it off the default import path
+        from services.array_engine import skill_level_array
+        from services.trials import best_of_trials
+
+        if not GroupService.validate_responses(students):
+            raise ValueError("All students must respond before groups can be formed")
+
+        students = list(students)
+        result = best_of_trials(
+            skill_level_array(students),
+            group_size,
+            trials=trials,
+            seed=seed,
+            workers=workers,
+            target_score=target_score,
+            time_budget=time_budget
+        )
+        return result.assignment.to_groups(students, random.Random(seed))
+
+    @staticmethod
+    @METRICS.timed("group_service.create_constrained_groups")
+    def create_constrained_groups(
+        students: Collection[Student],
+        group_size: int = DEFAULT_GROUP_SIZE,
+        constraints: Optional[GroupingConstraints] = None,
+        seed: Optional[int] = None
+    ) -> List[Group]:
+        """
+        Create stratified groups that keep some pairs together and others apart.
+
+        See ``services.constraints.create_constrained_groups``.
+
+        Args:
+            students (Collection[Student]): Students to group (a list or a ``Roster``)
+            group_size (int): Target size for each group
+            constraints (Optional[GroupingConstraints]): Keep-together and keep-apart pairs
+            seed (Optional[int]): Seed for reproducible groups
+
+        Returns:
+            List[Group]: List of formed groups
+
+        Raises:
+            ConstraintError: If the constraints cannot all be met (a ``ValueError``)
+        """
+        return create_constrained_groups(students, group_size, constraints, seed)
+
+    @staticmethod
+    @METRICS.timed("group_service.create_round_groups")
+    def create_round_groups(
+        students: Collection[Student],
+        group_size: int = DEFAULT_GROUP_SIZE,
+        history: Optional[RoundHistory] = None,
+        seed: Optional[int] = None
+    ) -> List[Group]:
+        """
+        Create stratified groups that avoid pairing past teammates again.
+
+        See ``services.round_history.create_round_groups``.
+
+        Args:
+            students (Collection[Student]): Students to group (a list or a ``Roster``)
+            group_size (int): Target size for each group
+            history (Optional[RoundHistory]): Teammates of past rounds
+            seed (Optional[int]): Seed for reproducible groups
+
+        Returns:
+            List[Group]: List of formed groups
+        """
+        return create_round_groups(students, group_size, history, seed)
+
+    @staticmethod
+    @METRICS.timed("group_service.refine_groups")
+    def refine_groups(
+        groups: List[Group],
+        max_passes: int = DEFAULT_REFINEMENT_PASSES,
+        time_budget: Optional[float] = None
+    ) -> List[Group]:
+        """
+        Optional refinement stage: swap members to even out group averages.
+
+        Group names and sizes are kept; only members whose swap reduces the
+        imbalance of skill averages move. See
+        ``services.refinement.refine_assignment``.
 
-        return groups
+        Args:
+            groups (List[Group]): Groups from any of the grouping methods
+            max_passes (int): Maximum number of improvement passes
+            time_budget (Optional[float]): Wall-clock seconds to spend
+
+        Returns:
+            List[Group]: The refined groups, in the same order
+        """
+        # numpy is only needed here, so keep it off the default import path
+        import numpy as np
+        from services.array_engine import skill_level_array
+        from services.refinement import refine_assignment
+
+        members = [member for group in groups for member in group.members]
+        if not members:
+            return groups
+        group_indices = np.repeat(
+            np.arange(len(groups), dtype=np.int32),
+            [len(group.members) for group in groups]
+        )
+        result = refine_assignment(
+            skill_level_array(members),
+            group_indices,
+            len(groups),
+            max_passes=max_passes,
+            time_budget=time_budget
+        )
+
+        refined = [Group(name=group.name) for group in groups]
+        for member, group_idx in zip(members, result.group_indices.tolist()):
+            refined[group_idx].add_member(member)
+        return refined
 
     @staticmethod
-    def validate_responses(roster: List[Student]) -> bool:
+    @METRICS.timed("group_service.validate_responses")
+    def validate_responses(roster: Collection[Student]) -> bool:
         """
         Check if all students in the roster have responded.
+
+        A ``Roster`` answers from its cached counters in O(1).
         
         Args:
-            roster (List[Student]): List of students to check
+            roster (Collection[Student]): Students to check (a list or a ``Roster``)
             
         Returns:
             bool: True if all students have responded
         """
+        if isinstance(roster, Roster):
+            return roster.all_responded
         return all(student.has_responded for student in roster)
 
     @staticmethod
-    def get_response_status(roster: List[Student]) -> tuple[int, int]:
+    @METRICS.timed("group_service.attribute_names")
+    def attribute_names(students: Collection[Student]) -> List[str]:
+        """
+        Names of the attributes any student carries, for choosing what to balance on.
+
+        Imported students share their attribute dicts, so each distinct dict
+        is only read once.
+
+        Args:
+            students (Collection[Student]): Students to inspect
+
+        Returns:
+            List[str]: Sorted attribute names
+        """
+        names = set()
+        seen = set()
+        for student in students:
+            attributes = student.attributes
+            if attributes and id(attributes) not in seen:
+                seen.add(id(attributes))
+                names.update(attributes)
+        return sorted(names)
+
+    @staticmethod
+    @METRICS.timed("group_service.get_response_status")
+    def get_response_status(roster: Collection[Student]) -> tuple[int, int]:
         """
         Get the current response status.
+
+        A ``Roster`` answers from its cached counters in O(1).
         
         Args:
-            roster (List[Student]): List of students to check
+            roster (Collection[Student]): Students to check (a list or a ``Roster``)
             
         Returns:
             tuple[int, int]: (number of responses, total roster size)
         """
+        if isinstance(roster, Roster):
+            return roster.responded_count, len(roster)
         responses = sum(1 for student in roster if student.has_responded)
         return responses, len(roster) 
\ No newline at end of file
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from models.group import Group
+from utils.constants import SkillLevel
+
+# Display text for each level, formatted once instead of per row
+SKILL_LABELS = {
+    level: f"{level.emoji} ({level.value}) - {level.description}"
+    for level in SkillLevel
+}
+
+
+def skill_label(level: Optional[SkillLevel]) -> str:
+    """Display text for a skill level, or an empty string if unset."""
+    return SKILL_LABELS[level] if level else ""
+
+
+@dataclass(frozen=True)
+class GroupsTable:
+    """
+    All groups of one grouping flattened into a single table.
+
+    Built once per grouping; rendering then only slices out the rooms that
+    are visible, so the work per rerun does not grow with the number of
+    groups.
+
+    Attributes:
+        members (pd.DataFrame): One row per member (Room, Name, Skill Level), ordered by room
+        rooms (pd.DataFrame): One row per room (Room, Team, Emoji, Avg, Size)
+        room_offsets (np.ndarray): Row range ``[offsets[i], offsets[i + 1])`` of room ``i + 1``
+    """
+    members: pd.DataFrame
+    rooms: pd.DataFrame
+    room_offsets: np.ndarray
+
+    @classmethod
+    def from_groups(cls, groups: Sequence[Group]) -> "GroupsTable":
+        """
+        Flatten groups into a table; breakout rooms are numbered from 1.
+
+        Args:
+            groups (Sequence[Group]): The groups to display
+
+        Returns:
+            GroupsTable: The combined table
+        """
+        sizes = [len(group.members) for group in groups]
+        members = pd.DataFrame({
+            "Room": np.repeat(np.arange(1, len(groups) + 1), sizes),
+            "Name": [member.name for group in groups for member in group.members],
+            "Skill Level": [
+                skill_label(member.skill_level) for group in groups for member in group.members
+            ],
+        })
+        rooms = pd.DataFrame({
+            "Room": np.arange(1, len(groups) + 1),
+            "Team": [group.name for group in groups],
+            "Emoji": [group.skill_emoji for group in groups],
+            "Avg": [round(group.average_skill_level, 1) for group in groups],
+            "Size": sizes,
+        })
+        offsets = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        return cls(members=members, rooms=rooms, room_offsets=offsets)
+
+    @property
+    def room_count(self) -> int:
+        """Number of breakout rooms."""
+        return len(self.rooms)
+
+    def matching_rooms(self, query: str = "") -> np.ndarray:
+        """
+        Room numbers whose team name or any member name contains the query.
+
+        Args:
+            query (str): Case-insensitive search text; empty matches every room
+
+        Returns:
+            np.ndarray: Matching room numbers in ascending order
+        """
+        query = query.strip()
+        if not query:
+            return self.rooms["Room"].to_numpy()
+        by_team = self.rooms.loc[
+            self.rooms["Team"].str.contains(query, case=False, regex=False), "Room"
+        ]
+        by_member = self.members.loc[
+            self.members["Name"].str.contains(query, case=False, regex=False), "Room"
+        ]
+        return np.union1d(by_team.to_numpy(), by_member.to_numpy())
+
+    def member_rows(self, rooms: Sequence[int]) -> pd.DataFrame:
+        """
+        Member rows of the given rooms only, touching no other rows.
+
+        Args:
+            rooms (Sequence[int]): Room numbers to include
+
+        Returns:
+            pd.DataFrame: The members of those rooms, in the given room order
+        """
+        if len(rooms) == 0:
+            return self.members.iloc[0:0]
+        rows = np.concatenate([
+            np.arange(self.room_offsets[room - 1], self.room_offsets[room]) for room in rooms
+        ])
+        return self.members.iloc[rows]
+
+    def room(self, room: int) -> pd.Series:
+        """Summary row (team, emoji, average, size) of one room."""
+        return self.rooms.iloc[room - 1]
+
+
+def page_count(item_count: int, page_size: int) -> int:
+    """Number of pages needed to show the items (at least 1)."""
+    return max(1, -(-item_count // page_size))
+
+
+def page_slice(items: np.ndarray, page: int, page_size: int) -> np.ndarray:
+    """
+    Items shown on a 1-based page.
+
+    Args:
+        items (np.ndarray): All items, in display order
+        page (int): Page number, clamped to the valid range
+        page_size (int): Items per page
+
+    Returns:
+        np.ndarray: The items on that page
+    """
+    page = min(max(1, page), page_count(len(items), page_size))
+    start = (page - 1) * page_size
+    return items[start:start + page_size]
+
+
+def page_of(items: np.ndarray, item, page_size: int) -> Optional[int]:
+    """1-based page containing an item, or None if it is not listed."""
+    positions = np.flatnonzero(items == item)
+    if len(positions) == 0:
+        return None
+    return int(positions[0]) // page_size + 1
+
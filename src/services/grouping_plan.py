@@ -0,0 +1,217 @@
+from array import array
+from typing import Collection, Dict, List, Optional, Sequence, Tuple, Union
+import random
+from models.student import Student, attribute_key
+from models.group import Group
+from models.roster import Roster
+from utils.constants import DEFAULT_GROUP_SIZE
+from utils.metrics import METRICS
+
+
+StratumKey = Tuple  # (SkillLevel, value of each balanced attribute...)
+
+# Strata compared per seat when dealing with attributes; keeps the build O(N)
+_CANDIDATE_WINDOW = 64
+
+
+def _attribute_names(attributes: Sequence[str]) -> Tuple[str, ...]:
+    """Attribute names as students are keyed on them (see ``attribute_key``)."""
+    return tuple(map(attribute_key, attributes))
+
+
+class GroupingPlan:
+    """
+    Validated strata of a roster, ready to be dealt into groups repeatedly.
+
+    Building the plan checks every response once and buckets the students
+    by a composite key: skill level plus the values of any ``attributes``
+    to balance on (timezone, track, role...). The index holds only the
+    combinations that occur, so its size is bounded by the number of
+    students, never by the product of all attribute values. Each
+    ``reshuffle`` then only permutes inside the buckets and deals them
+    round-robin in one continuous pass, which is O(N) with no validation.
+
+    Skill level is balanced exactly: per-level counts of any two groups
+    differ by at most one. With attributes, the plan also records which
+    bucket every seat is dealt from (see ``_deal_pattern``), chosen so that
+    each group gets as few repeats of an attribute value as the roster
+    allows. A plan built from a ``Roster`` stays valid until the roster's
+    version changes.
+    """
+
+    @METRICS.timed("grouping_plan.build")
+    def __init__(
+        self,
+        students: Collection[Student],
+        group_size: int = DEFAULT_GROUP_SIZE,
+        attributes: Sequence[str] = ()
+    ):
+        """
+        Validate the students and bucket them by their composite key.
+
+        Args:
+            students (Collection[Student]): Students to group (a list or a ``Roster``)
+            group_size (int): Target size for each group
+            attributes (Sequence[str]): Student attributes to balance on, in
+                priority order, after skill level (case-insensitive)
+
+        Raises:
+            ValueError: If a student has not responded, the group size is below 1,
+                or no student has one of the attributes
+        """
+        if group_size < 1:
+            raise ValueError("Group size must be at least 1")
+        self.group_size = group_size
+        self.attributes = _attribute_names(attributes)
+        self.num_groups = max(1, (len(students) + group_size - 1) // group_size)
+        self._roster = students if isinstance(students, Roster) else None
+        self._roster_version = students.version if isinstance(students, Roster) else None
+
+        index: Dict[StratumKey, List[Student]] = {}
+        # Imported students share attribute dicts, so most lookups hit this cache
+        values_by_dict: Dict[int, Tuple[str, ...]] = {}
+        present = set()
+        no_values = ("",) * len(self.attributes)
+        for student in students:
+            if not student.has_responded or not student.skill_level:
+                raise ValueError("All students must respond before groups can be formed")
+            values = no_values
+            if self.attributes and student.attributes:
+                values = values_by_dict.get(id(student.attributes))
+                if values is None:
+                    values = tuple(student.attribute(name) for name in self.attributes)
+                    values_by_dict[id(student.attributes)] = values
+                    present.update(student.attributes)
+            key = (student.skill_level, *values)
+            stratum = index.get(key)
+            if stratum is None:
+                stratum = index[key] = []
+            stratum.append(student)
+        missing = [name for name in self.attributes if name not in present]
+        if missing:
+            raise ValueError(f"No student has the attribute: {', '.join(missing)}")
+
+        # Buckets in the order students are dealt in, highest skill level first
+        self.strata: Dict[StratumKey, List[Student]] = {
+            key: index[key]
+            for key in sorted(index, key=lambda key: (-key[0].value, key[1:]))
+        }
+        self._pattern = self._deal_pattern() if self.attributes else None
+
+    def _deal_pattern(self) -> array:
+        """
+        Pick the bucket each seat is dealt from, balancing attribute values.
+
+        Seats are filled in the same order as the plain round-robin, one skill
+        level after another, so skill balance is unchanged. For each seat the
+        level's bucket whose attribute values the seat's group holds fewest
+        of is taken, scanning at most ``_CANDIDATE_WINDOW`` buckets from just
+        after the previous pick and stopping at the first without repeats.
+
+        Returns:
+            array: Bucket index (into ``strata``) of every seat, in dealing order
+        """
+        keys = list(self.strata)
+        remaining = [len(stratum) for stratum in self.strata.values()]
+        # Each (attribute position, value) pair as a small int, so equal values
+        # of different attributes don't match and repeats are counted in C
+        feature_ids: Dict[Tuple[int, str], int] = {}
+        features = [
+            tuple(feature_ids.setdefault(feature, len(feature_ids)) for feature in enumerate(key[1:]))
+            for key in keys
+        ]
+        num_groups = self.num_groups
+        pattern = array("I")
+
+        start = 0
+        while start < len(keys):
+            end = start
+            while end < len(keys) and keys[end][0] is keys[start][0]:
+                end += 1
+            active = list(range(start, end))
+            cursor = 0
+            for seat in range(len(pattern), len(pattern) + sum(remaining[start:end])):
+                held = [
+                    feature
+                    for member in pattern[seat % num_groups:seat:num_groups]
+                    for feature in features[member]
+                ]
+                best = cursor % len(active)
+                if held:
+                    best_score = None
+                    for offset in range(min(len(active), _CANDIDATE_WINDOW)):
+                        position = (cursor + offset) % len(active)
+                        score = sum(map(held.count, features[active[position]]))
+                        if best_score is None or score < best_score:
+                            best, best_score = position, score
+                            if score == 0:
+                                break
+                index = active[best]
+                pattern.append(index)
+                remaining[index] -= 1
+                if remaining[index]:
+                    cursor = best + 1
+                else:
+                    active[best] = active[-1]
+                    active.pop()
+                    cursor = best
+            start = end
+        return pattern
+
+    @property
+    def student_count(self) -> int:
+        """Number of students in the plan."""
+        return sum(len(stratum) for stratum in self.strata.values())
+
+    def is_valid_for(
+        self,
+        roster: Union[Roster, Collection[Student]],
+        group_size: int,
+        attributes: Sequence[str] = ()
+    ) -> bool:
+        """
+        Whether the plan still describes this roster, group size and attributes.
+
+        Only plans built from a ``Roster`` can be checked, by its version;
+        for any other collection this is always False.
+        """
+        return (
+            roster is self._roster
+            and roster.version == self._roster_version
+            and group_size == self.group_size
+            and _attribute_names(attributes) == self.attributes
+        )
+
+    @METRICS.timed("grouping_plan.reshuffle")
+    def reshuffle(self, seed: Optional[Union[int, random.Random]] = None) -> List[Group]:
+        """
+        Deal a fresh random grouping from the precomputed strata.
+
+        Args:
+            seed (Optional[Union[int, random.Random]]): Seed or generator for
+                the shuffles and team names; the same seed gives the same groups
+
+        Returns:
+            List[Group]: List of formed groups
+        """
+        rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        groups = [Group(rng=rng) for _ in range(self.num_groups)]
+
+        if self._pattern is not None:
+            dealers = []
+            for stratum in self.strata.values():
+                shuffled = stratum.copy()
+                rng.shuffle(shuffled)
+                dealers.append(iter(shuffled).__next__)
+            for seat, index in enumerate(self._pattern):
+                groups[seat % self.num_groups].add_member(dealers[index]())
+            return groups
+
+        current_group_idx = 0
+        for stratum in self.strata.values():
+            shuffled = stratum.copy()
+            rng.shuffle(shuffled)
+            for student in shuffled:
+                groups[current_group_idx].add_member(student)
+                current_group_idx = (current_group_idx + 1) % self.num_groups
+        return groups
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import Optional
+import time
+import numpy as np
+from services.array_engine import BalanceScore, balance_score
+from utils.constants import SkillLevel, DEFAULT_REFINEMENT_PASSES
+
+_LEVELS = [level.value for level in SkillLevel]
+# Every (level leaving the stronger group, level leaving the weaker group) pair worth trying
+_SWAP_PAIRS = [(high, low) for high in _LEVELS for low in _LEVELS if high > low]
+_EPSILON = 1e-12
+
+
+@dataclass(frozen=True)
+class RefinementResult:
+    """
+    Outcome of a swap-based refinement run.
+
+    Attributes:
+        group_indices (np.ndarray): Refined group index of every student
+        swaps (int): Number of member swaps applied
+        passes (int): Number of improvement passes run
+        initial_score (BalanceScore): Score before refinement
+        final_score (BalanceScore): Score after refinement
+        elapsed (float): Wall-clock seconds spent
+        converged (bool): Whether the last pass found no improving swap
+    """
+    group_indices: np.ndarray
+    swaps: int
+    passes: int
+    initial_score: BalanceScore
+    final_score: BalanceScore
+    elapsed: float
+    converged: bool
+
+
+def refine_assignment(
+    levels: np.ndarray,
+    group_indices: np.ndarray,
+    num_groups: int,
+    max_passes: int = DEFAULT_REFINEMENT_PASSES,
+    time_budget: Optional[float] = None
+) -> RefinementResult:
+    """
+    Reduce the imbalance of group skill averages by swapping members.
+
+    Each group's member count, skill sum and per-level histogram are kept
+    as running arrays, so the effect of swapping a level-``x`` member of one
+    group for a level-``y`` member of another is scored in constant time.
+    Every pass pairs the strongest group with the weakest, the second
+    strongest with the second weakest and so on, and applies the best
+    improving swap of each pair. Swaps only exchange members, so group sizes
+    never change, and the search is deterministic.
+
+    Members of the same level are interchangeable for the objective, so
+    passes work on the histograms only; concrete students are moved once at
+    the end.
+
+    Args:
+        levels (np.ndarray): Integer ``SkillLevel`` values, one per student
+        group_indices (np.ndarray): Starting group index of every student
+        num_groups (int): Number of groups
+        max_passes (int): Maximum number of improvement passes
+        time_budget (Optional[float]): Wall-clock seconds to spend
+
+    Returns:
+        RefinementResult: The refined assignment and convergence statistics
+    """
+    start = time.monotonic()
+    levels = np.asarray(levels)
+    group_indices = np.asarray(group_indices, dtype=np.int32)
+    initial_score = balance_score(levels, group_indices, num_groups)
+
+    counts = np.bincount(group_indices, minlength=num_groups).astype(np.float64)
+    sizes = np.maximum(counts, 1)
+    histogram = np.zeros((num_groups, max(_LEVELS) + 1), dtype=np.int64)
+    np.add.at(histogram, (group_indices, levels), 1)
+    initial_histogram = histogram.copy()
+    sums = histogram @ np.arange(histogram.shape[1], dtype=np.float64)
+    target = sums.sum() / max(1, len(levels))
+
+    pairs_per_pass = num_groups // 2
+    swaps = passes = 0
+    converged = pairs_per_pass == 0
+    while not converged and passes < max_passes:
+        if time_budget is not None and time.monotonic() - start >= time_budget:
+            break
+        passes += 1
+
+        order = np.argsort(sums / sizes, kind="stable")
+        weak, strong = order[:pairs_per_pass], order[::-1][:pairs_per_pass]
+        strong_dev = sums[strong] / sizes[strong] - target
+        weak_dev = sums[weak] / sizes[weak] - target
+        current = strong_dev ** 2 + weak_dev ** 2
+
+        # Change in squared deviation for each candidate swap, per pair
+        deltas = np.full((len(_SWAP_PAIRS), pairs_per_pass), np.inf)
+        for idx, (high, low) in enumerate(_SWAP_PAIRS):
+            moved = high - low
+            after = (strong_dev - moved / sizes[strong]) ** 2 + (weak_dev + moved / sizes[weak]) ** 2
+            possible = (histogram[strong, high] > 0) & (histogram[weak, low] > 0)
+            deltas[idx] = np.where(possible, after - current, np.inf)
+
+        best = np.argmin(deltas, axis=0)
+        improving = deltas[best, np.arange(pairs_per_pass)] < -_EPSILON
+        if not improving.any():
+            converged = True
+            break
+
+        strong, weak, best = strong[improving], weak[improving], best[improving]
+        high = np.array([_SWAP_PAIRS[idx][0] for idx in best])
+        low = np.array([_SWAP_PAIRS[idx][1] for idx in best])
+        # Pairs are disjoint, so plain fancy-indexed updates are safe
+        histogram[strong, high] -= 1
+        histogram[strong, low] += 1
+        histogram[weak, low] -= 1
+        histogram[weak, high] += 1
+        sums[strong] -= high - low
+        sums[weak] += high - low
+        swaps += int(improving.sum())
+
+    refined = _apply_histogram(levels, group_indices, initial_histogram, histogram)
+    return RefinementResult(
+        group_indices=refined,
+        swaps=swaps,
+        passes=passes,
+        initial_score=initial_score,
+        final_score=balance_score(levels, refined, num_groups),
+        elapsed=time.monotonic() - start,
+        converged=converged
+    )
+
+
+def _apply_histogram(
+    levels: np.ndarray,
+    group_indices: np.ndarray,
+    before: np.ndarray,
+    after: np.ndarray
+) -> np.ndarray:
+    """Move concrete students so each group's level histogram goes from ``before`` to ``after``."""
+    refined = group_indices.copy()
+    change = after - before
+    for level in _LEVELS:
+        leaving = np.maximum(-change[:, level], 0)
+        if not leaving.any():
+            continue
+        members = np.flatnonzero(levels == level)
+        members = members[np.argsort(group_indices[members], kind="stable")]
+        member_groups = group_indices[members]
+        # Rank of each member within its group's block of this level
+        block_start = np.searchsorted(member_groups, member_groups, side="left")
+        rank = np.arange(len(members)) - block_start
+        movers = members[rank < leaving[member_groups]]
+        arriving = np.maximum(change[:, level], 0)
+        refined[movers] = np.repeat(np.arange(len(arriving), dtype=np.int32), arriving)
+    return refined
@@ -0,0 +1,191 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Set, Tuple, Union
+import threading
+import time
+from models.roster import Roster
+from services.roster_store import SQLiteRosterStore
+from utils.constants import SkillLevel, DEFAULT_QUEUE_BATCH_SIZE, DEFAULT_QUEUE_FLUSH_INTERVAL
+
+
+@dataclass(frozen=True)
+class SubmissionReceipt:
+    """
+    Immediate acknowledgement of a queued submission.
+
+    Attributes:
+        name (str): The student's name
+        skill_level (SkillLevel): The submitted skill level
+        queued_at (float): ``time.monotonic()`` when the submission was accepted
+    """
+    name: str
+    skill_level: SkillLevel
+    queued_at: float
+
+
+class ResponseQueue:
+    """
+    Thread-safe ingestion queue that applies student submissions in batches.
+
+    ``submit`` enforces the one-response-per-student rule and acknowledges
+    immediately; a background thread coalesces everything queued within
+    ``flush_interval`` (up to ``batch_size`` submissions) and applies it in
+    one go: through the target's ``submit_responses`` when it has one (a
+    single transaction for a ``SQLiteRosterStore``), or as a run of
+    ``Student.submit_response`` calls for an in-memory ``Roster``. Once a
+    queue is attached to a roster, all submissions should go through it.
+    Submissions the target rejects, or that fail to apply, are listed in
+    ``failed`` and released, so those students can submit again.
+    """
+
+    def __init__(
+        self,
+        target: Union[Roster, SQLiteRosterStore],
+        batch_size: int = DEFAULT_QUEUE_BATCH_SIZE,
+        flush_interval: float = DEFAULT_QUEUE_FLUSH_INTERVAL
+    ):
+        """
+        Create the queue and start its flusher thread.
+
+        Args:
+            target (Union[Roster, SQLiteRosterStore]): Where submissions are
+                applied; any object with ``get(name)`` and optionally
+                ``submit_responses(batch)`` works
+            batch_size (int): Maximum submissions applied per batch
+            flush_interval (float): Seconds to wait for a batch to fill up
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.target = target
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.applied = 0
+        self.batches = 0
+        self.failed: List[str] = []
+        self._pending: Deque[Tuple[str, SkillLevel]] = deque()
+        self._claimed: Set[str] = set()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="response-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, skill_level: SkillLevel) -> SubmissionReceipt:
+        """
+        Accept a student's response for batched application.
+
+        Args:
+            name (str): The student's name
+            skill_level (SkillLevel): The chosen skill level
+
+        Returns:
+            SubmissionReceipt: Acknowledgement of the accepted submission
+
+        Raises:
+            KeyError: If the student is not on the roster
+            ValueError: If the student has already submitted a response, or
+                the queue is closed
+        """
+        with self._cond:
+            if self._closed:
+                raise ValueError("Response queue is closed")
+            if name in self._claimed:
+                raise ValueError(f"Student {name} has already submitted a response")
+
+        # Look the student up outside the lock; a store lookup is a query
+        student = self.target.get(name)
+        if student is None:
+            raise KeyError(name)
+
+        with self._cond:
+            if name in self._claimed or student.has_responded:
+                self._claimed.add(name)
+                raise ValueError(f"Student {name} has already submitted a response")
+            self._claimed.add(name)
+            self._pending.append((name, skill_level))
+            self._cond.notify()
+        return SubmissionReceipt(name=name, skill_level=skill_level, queued_at=time.monotonic())
+
+    def is_submitted(self, name: str) -> bool:
+        """Whether a response for this student is queued or applied (failed ones are released)."""
+        with self._cond:
+            return name in self._claimed
+
+    @property
+    def pending_count(self) -> int:
+        """Submissions accepted but not yet applied."""
+        with self._cond:
+            return len(self._pending) + self._in_flight
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every accepted submission has been applied.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait
+
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Apply what is still queued, then stop the flusher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _take_batch(self) -> List[Tuple[str, SkillLevel]]:
+        """Block until a batch is ready; return an empty list once closed and drained."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return []
+            # Coalesce: give a burst time to fill the batch before applying
+            self._cond.wait_for(
+                lambda: len(self._pending) >= self.batch_size or self._closed,
+                timeout=self.flush_interval
+            )
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._in_flight = count
+            return batch
+
+    def _apply(self, batch: List[Tuple[str, SkillLevel]]) -> List[str]:
+        """Apply one batch to the target, returning the names that were rejected."""
+        if hasattr(self.target, "submit_responses"):
+            return self.target.submit_responses(batch)
+        rejected = []
+        for name, skill_level in batch:
+            student = self.target.get(name)
+            try:
+                if student is None:
+                    raise KeyError(name)
+                student.submit_response(skill_level)
+            except (KeyError, ValueError):
+                rejected.append(name)
+        return rejected
+
+    def _run(self) -> None:
+        """Flusher thread: apply batches until closed and drained."""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                rejected = self._apply(batch)
+            except Exception:
+                rejected = [name for name, _ in batch]
+            with self._cond:
+                self.applied += len(batch) - len(rejected)
+                self.batches += 1
+                self.failed.extend(rejected)
+                # Not recorded, so the students must be able to submit again
+                self._claimed.difference_update(rejected)
+                self._in_flight = 0
+                self._cond.notify_all()
@@ -0,0 +1,283 @@
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
+import csv
+import io
+import os
+import sys
+from itertools import islice
+from models.student import Student, frozen_attributes
+from models.roster import Roster
+from utils.constants import SkillLevel, DEFAULT_IMPORT_CHUNK_SIZE
+
+FORMAT_CSV = "csv"
+FORMAT_TSV = "tsv"
+FORMAT_TEXT = "text"
+
+_DELIMITERS = {FORMAT_CSV: ",", FORMAT_TSV: "\t"}
+_NAME_COLUMNS = ("name", "student", "student name")
+_EMAIL_COLUMNS = ("email", "email address", "e-mail")
+_SKILL_COLUMNS = ("skill_level", "skill level", "skill", "level")
+# Distinct attribute combinations whose dicts are shared between students
+_SHARED_ATTRIBUTES_LIMIT = 65_536
+
+RosterSource = Union[str, os.PathLike, TextIO, BinaryIO]
+
+
+@dataclass
+class ImportProgress:
+    """
+    Running totals of a roster import.
+
+    Attributes:
+        rows_read (int): Data rows parsed so far
+        added (int): Students added to the roster
+        duplicates (int): Rows skipped because the name was already on the roster
+        bytes_read (Optional[int]): Bytes consumed from the source, if known
+        total_bytes (Optional[int]): Size of the source, if known
+    """
+    rows_read: int = 0
+    added: int = 0
+    duplicates: int = 0
+    bytes_read: Optional[int] = None
+    total_bytes: Optional[int] = None
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Share of the source consumed, between 0 and 1, if the size is known."""
+        if not self.total_bytes or self.bytes_read is None:
+            return None
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+
+def detect_format(filename: str) -> str:
+    """
+    Pick the roster file format from its extension.
+
+    Args:
+        filename (str): File name or path
+
+    Returns:
+        str: ``"csv"``, ``"tsv"`` or ``"text"`` (one name per line)
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        return FORMAT_CSV
+    if extension in (".tsv", ".tab"):
+        return FORMAT_TSV
+    return FORMAT_TEXT
+
+
+def parse_skill_level(value: str) -> Optional[SkillLevel]:
+    """
+    Parse a pre-filled skill level given as a number (1-4) or a level name.
+
+    Args:
+        value (str): Raw cell value
+
+    Returns:
+        Optional[SkillLevel]: The level, or None for an empty cell
+
+    Raises:
+        ValueError: If the value is not a known skill level
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return SkillLevel(int(value))
+    try:
+        return SkillLevel[value.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown skill level: {value!r}") from None
+
+
+def _column_index(header: List[str], candidates: Iterable[str]) -> Optional[int]:
+    """Find the first header column matching one of the candidate names."""
+    for idx, column in enumerate(header):
+        if column in candidates:
+            return idx
+    return None
+
+
+def _iter_text_students(lines: Iterable[str]) -> Iterator[Student]:
+    """Yield a student for each non-blank line."""
+    for line in lines:
+        name = line.strip()
+        if name:
+            yield Student(name=name)
+
+
+def _iter_delimited_students(lines: Iterable[str], delimiter: str) -> Iterator[Student]:
+    """
+    Yield a student for each row of a CSV/TSV file, with or without a header.
+
+    With a header, every column other than name, email and skill level is
+    read as a categorical attribute. Students with the same attribute
+    values share one read-only (interned) attributes mapping, so attributes
+    cost memory per distinct combination rather than per student.
+    """
+    rows = csv.reader(lines, delimiter=delimiter)
+    first = next(rows, None)
+    if first is None:
+        return
+
+    header = [column.strip().lower() for column in first]
+    name_idx = _column_index(header, _NAME_COLUMNS)
+    attribute_columns: List[Tuple[int, str]] = []
+    if name_idx is None:
+        # No header: columns are name, email, skill level
+        name_idx, email_idx, skill_idx = 0, 1, 2
+        start_line, rows = 1, _chain_row(first, rows)
+    else:
+        email_idx = _column_index(header, _EMAIL_COLUMNS)
+        skill_idx = _column_index(header, _SKILL_COLUMNS)
+        start_line = 2
+        known = {name_idx, email_idx, skill_idx}
+        attribute_columns = [
+            (idx, sys.intern(header[idx]))
+            for idx in range(len(header))
+            if idx not in known and header[idx]
+        ]
+    shared_attributes: Dict[Tuple[str, ...], Mapping[str, str]] = {}
+
+    for line_number, row in enumerate(rows, start_line):
+        if name_idx >= len(row) or not row[name_idx].strip():
+            continue
+        email = row[email_idx].strip() if email_idx is not None and email_idx < len(row) else ""
+        try:
+            skill_level = (
+                parse_skill_level(row[skill_idx])
+                if skill_idx is not None and skill_idx < len(row) else None
+            )
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}") from None
+
+        attributes = None
+        if attribute_columns:
+            values = tuple(row[idx].strip() if idx < len(row) else "" for idx, _ in attribute_columns)
+            attributes = shared_attributes.get(values)
+            if attributes is None:
+                attributes = frozen_attributes({
+                    name: sys.intern(value)
+                    for (_, name), value in zip(attribute_columns, values) if value
+                })
+                # Columns with near-unique values (IDs, say) aren't worth sharing
+                if len(shared_attributes) < _SHARED_ATTRIBUTES_LIMIT:
+                    shared_attributes[values] = attributes
+        yield Student(
+            name=row[name_idx].strip(),
+            email=email or None,
+            skill_level=skill_level,
+            has_responded=skill_level is not None,
+            attributes=attributes or None
+        )
+
+
+def _chain_row(first: List[str], rows: Iterator[List[str]]) -> Iterator[List[str]]:
+    """Put an already-consumed row back in front of a row iterator."""
+    yield first
+    yield from rows
+
+
+def iter_student_chunks(
+    lines: Iterable[str],
+    fmt: str = FORMAT_TEXT,
+    chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE
+) -> Iterator[List[Student]]:
+    """
+    Parse roster lines lazily into fixed-size chunks of students.
+
+    Only one chunk is held in memory at a time, whatever the input size.
+
+    Args:
+        lines (Iterable[str]): Lines of the roster file
+        fmt (str): ``"csv"``, ``"tsv"`` or ``"text"``
+        chunk_size (int): Maximum number of students per chunk
+
+    Yields:
+        List[Student]: The next chunk of parsed students
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    if fmt == FORMAT_TEXT:
+        students = _iter_text_students(lines)
+    elif fmt in _DELIMITERS:
+        students = _iter_delimited_students(lines, _DELIMITERS[fmt])
+    else:
+        raise ValueError(f"Unknown roster format: {fmt!r}")
+
+    while True:
+        chunk = list(islice(students, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_roster(
+    roster: Roster,
+    source: RosterSource,
+    fmt: Optional[str] = None,
+    chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[ImportProgress], None]] = None
+) -> ImportProgress:
+    """
+    Stream a roster file into a roster, deduplicating against its name index.
+
+    Args:
+        roster (Roster): Roster to add the students to (or any object with a
+            ``Roster``-style ``extend``, such as ``SQLiteRosterStore``)
+        source (RosterSource): A path, or an open text or binary file (such as
+            a Streamlit upload)
+        fmt (Optional[str]): File format; detected from the file name if omitted
+        chunk_size (int): Number of rows parsed per chunk
+        progress (Optional[Callable[[ImportProgress], None]]): Called after each chunk
+
+    Returns:
+        ImportProgress: Final totals of the import
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as binary:
+            return import_roster(roster, binary, fmt or detect_format(os.fspath(source)), chunk_size, progress)
+
+    if fmt is None:
+        fmt = detect_format(getattr(source, "name", "") or "")
+
+    binary = None
+    if isinstance(source, io.TextIOBase):
+        text = source
+        binary = getattr(source, "buffer", None)
+    else:
+        binary = source
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+    status = ImportProgress(total_bytes=_source_size(binary))
+    try:
+        for chunk in iter_student_chunks(text, fmt, chunk_size):
+            added = roster.extend(chunk)
+            status.rows_read += len(chunk)
+            status.added += added
+            status.duplicates += len(chunk) - added
+            if binary is not None and binary.seekable():
+                status.bytes_read = binary.tell()
+            if progress is not None:
+                progress(status)
+    finally:
+        if text is not source:
+            # Don't let the wrapper close the caller's file
+            text.detach()
+    return status
+
+
+def _source_size(binary: Optional[BinaryIO]) -> Optional[int]:
+    """Size of a binary source in bytes, if it can be determined."""
+    if binary is None:
+        return None
+    size = getattr(binary, "size", None)
+    if isinstance(size, int):
+        return size
+    if not binary.seekable():
+        return None
+    position = binary.tell()
+    size = binary.seek(0, io.SEEK_END)
+    binary.seek(position)
+    return size
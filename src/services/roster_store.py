@@ -0,0 +1,337 @@
+from typing import Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from functools import lru_cache
+import json
+import sqlite3
+import threading
+import weakref
+from itertools import islice
+from models.student import Student, frozen_attributes
+from models.roster import Roster
+from utils.constants import SkillLevel, DEFAULT_STORE_BATCH_SIZE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT,
+    skill_level INTEGER,
+    has_responded INTEGER NOT NULL DEFAULT 0,
+    attributes TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_students_name ON students (name);
+CREATE INDEX IF NOT EXISTS idx_students_responded ON students (has_responded);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+# Statements are kept as module constants so sqlite3's per-connection
+# statement cache reuses the prepared form on every call.
+_INSERT_STUDENT = (
+    "INSERT OR IGNORE INTO students (name, email, skill_level, has_responded, attributes) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SUBMIT_RESPONSE = (
+    "UPDATE students SET skill_level = ?, has_responded = 1 "
+    "WHERE name = ? AND has_responded = 0"
+)
+_SELECT_EXISTS = "SELECT 1 FROM students WHERE name = ?"
+_SELECT_STUDENT = (
+    "SELECT name, email, skill_level, has_responded, attributes FROM students WHERE name = ?"
+)
+_SELECT_ALL = "SELECT name, email, skill_level, has_responded, attributes FROM students ORDER BY id"
+_SELECT_COLUMNS = "PRAGMA table_info(students)"
+# Databases created before students had attributes
+_ADD_ATTRIBUTES_COLUMN = "ALTER TABLE students ADD COLUMN attributes TEXT"
+_COUNT_ALL = "SELECT COUNT(*) FROM students"
+_COUNT_RESPONDED = "SELECT COUNT(*) FROM students WHERE has_responded = 1"
+_DELETE_STUDENT = "DELETE FROM students WHERE name = ?"
+_DELETE_ALL = "DELETE FROM students"
+_SELECT_VERSION = "SELECT value FROM meta WHERE key = 'version'"
+_BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'version'"
+
+
+@lru_cache(maxsize=4_096)
+def _decode_attributes(encoded: str) -> Mapping[str, str]:
+    """
+    Attributes column as a read-only mapping, shared between students with the same values.
+
+    Names are keyed by ``attribute_key`` here, once per distinct value, for
+    rows saved by earlier releases with the file's own column case.
+    """
+    return frozen_attributes(json.loads(encoded))
+
+
+def _row_to_student(row: Tuple) -> Student:
+    """Build a Student from a ``students`` table row."""
+    name, email, skill_level, has_responded, attributes = row
+    return Student(
+        name=name,
+        email=email,
+        skill_level=SkillLevel(skill_level) if skill_level else None,
+        has_responded=bool(has_responded),
+        attributes=_decode_attributes(attributes) if attributes else None
+    )
+
+
+class SQLiteRosterStore:
+    """
+    Roster shared across sessions and server restarts, persisted in SQLite.
+
+    The database runs in WAL mode so readers never block the writer and
+    student submissions from many sessions can proceed concurrently. Each
+    thread reuses its own connection, closed when the thread ends (Streamlit
+    runs every script rerun on a new thread); SQLite's file locking, not a
+    Python lock, orders the short write transactions. Every write bumps a version
+    counter so callers can cheaply tell whether their cached ``Roster`` is
+    stale.
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0, batch_size: int = DEFAULT_STORE_BATCH_SIZE):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            path (str): Database file path
+            timeout (float): Seconds to wait for a competing writer
+            batch_size (int): Rows written per transaction in bulk adds
+        """
+        self.path = path
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        if "attributes" not in {column[1] for column in conn.execute(_SELECT_COLUMNS)}:
+            conn.execute(_ADD_ATTRIBUTES_COLUMN)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it on first use.
+
+        Raises:
+            ValueError: If the store has been closed
+        """
+        if self._closed:
+            raise ValueError("Roster store is closed")
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=64
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                if self._closed:
+                    conn.close()
+                    raise ValueError("Roster store is closed")
+                self._connections.add(conn)
+            holder = self._local.holder = _ThreadConnection(conn, self._connections, self._connections_lock)
+        return holder.conn
+
+    def add(self, student: Student) -> bool:
+        """
+        Add a student unless the name is already stored.
+
+        Args:
+            student (Student): The student to add
+
+        Returns:
+            bool: True if the student was added
+        """
+        return self.extend([student]) == 1
+
+    def extend(self, students: Iterable[Student]) -> int:
+        """
+        Add many students with batched inserts, skipping stored names.
+
+        Args:
+            students (Iterable[Student]): The students to add
+
+        Returns:
+            int: Number of students actually added
+        """
+        conn = self._connection()
+        rows = (
+            (
+                s.name,
+                s.email,
+                s.skill_level.value if s.skill_level else None,
+                int(s.has_responded),
+                json.dumps(dict(s.attributes)) if s.attributes else None
+            )
+            for s in students
+        )
+        added = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return added
+            with _WriteTransaction(conn):
+                before = conn.total_changes
+                conn.executemany(_INSERT_STUDENT, batch)
+                added += conn.total_changes - before
+
+    def add_names(self, names: Iterable[str]) -> int:
+        """
+        Add a new, unanswered student for each name not already stored.
+
+        Args:
+            names (Iterable[str]): Student names
+
+        Returns:
+            int: Number of students actually added
+        """
+        return self.extend(Student(name=name) for name in names)
+
+    def submit_response(self, name: str, skill_level: SkillLevel) -> None:
+        """
+        Record a student's skill level, at most once per student.
+
+        Args:
+            name (str): The student's name
+            skill_level (SkillLevel): The chosen skill level
+
+        Raises:
+            KeyError: If the student is not on the roster
+            ValueError: If the student has already submitted a response
+        """
+        rejected = self.submit_responses([(name, skill_level)])
+        if rejected:
+            if self._connection().execute(_SELECT_EXISTS, (name,)).fetchone() is None:
+                raise KeyError(name)
+            raise ValueError(f"Student {name} has already submitted a response")
+
+    def submit_responses(self, responses: Iterable[Tuple[str, SkillLevel]]) -> List[str]:
+        """
+        Record many responses in one transaction.
+
+        Args:
+            responses (Iterable[Tuple[str, SkillLevel]]): (name, skill level) pairs
+
+        Returns:
+            List[str]: Names whose response was not recorded, because they had
+            already responded or are not on the roster
+        """
+        conn = self._connection()
+        rejected = []
+        with _WriteTransaction(conn):
+            for name, skill_level in responses:
+                if conn.execute(_SUBMIT_RESPONSE, (skill_level.value, name)).rowcount == 0:
+                    rejected.append(name)
+        return rejected
+
+    def get(self, name: str) -> Optional[Student]:
+        """
+        Look up a student by name.
+
+        Args:
+            name (str): The student's name
+
+        Returns:
+            Optional[Student]: A detached copy of the stored student, or None
+        """
+        row = self._connection().execute(_SELECT_STUDENT, (name,)).fetchone()
+        return _row_to_student(row) if row else None
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a student by name.
+
+        Raises:
+            KeyError: If no student with that name is stored
+        """
+        conn = self._connection()
+        with _WriteTransaction(conn):
+            if conn.execute(_DELETE_STUDENT, (name,)).rowcount == 0:
+                raise KeyError(name)
+
+    def clear(self) -> None:
+        """Remove every student."""
+        conn = self._connection()
+        with _WriteTransaction(conn):
+            conn.execute(_DELETE_ALL)
+
+    def iter_students(self) -> Iterator[Student]:
+        """Stream all stored students in insertion order."""
+        yield from map(_row_to_student, self._connection().execute(_SELECT_ALL))
+
+    def load_roster(self) -> Roster:
+        """Load the stored students into a new in-memory ``Roster``."""
+        return Roster(self.iter_students())
+
+    def response_status(self) -> Tuple[int, int]:
+        """
+        Get the current response status.
+
+        Returns:
+            Tuple[int, int]: (number of responses, total roster size)
+        """
+        conn = self._connection()
+        responses = conn.execute(_COUNT_RESPONDED).fetchone()[0]
+        total = conn.execute(_COUNT_ALL).fetchone()[0]
+        return responses, total
+
+    def version(self) -> int:
+        """Counter incremented by every committed write."""
+        return self._connection().execute(_SELECT_VERSION).fetchone()[0]
+
+    def close(self) -> None:
+        """Close every open connection; using the store afterwards raises ``ValueError``."""
+        with self._connections_lock:
+            self._closed = True
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def __len__(self) -> int:
+        return self._connection().execute(_COUNT_ALL).fetchone()[0]
+
+
+class _ThreadConnection:
+    """
+    A thread's connection, kept in thread-local storage.
+
+    Thread-local values are dropped as soon as their thread ends, so the
+    finalizer closes the connection then instead of leaking its file
+    handles until the store is closed.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, connections: Set[sqlite3.Connection], lock: threading.Lock):
+        self.conn = conn
+        # The finalizer must not reference the store, or threads would keep it alive
+        weakref.finalize(self, _close_connection, conn, connections, lock)
+
+
+def _close_connection(conn: sqlite3.Connection, connections: Set[sqlite3.Connection], lock: threading.Lock) -> None:
+    """Close a connection and stop tracking it."""
+    with lock:
+        connections.discard(conn)
+    conn.close()
+
+
+class _WriteTransaction:
+    """Context manager for a ``BEGIN IMMEDIATE`` transaction that bumps the store version."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.conn.execute(_BUMP_VERSION)
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
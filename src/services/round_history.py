@@ -0,0 +1,224 @@
+from typing import Any, Collection, Dict, Iterable, List, Optional, Union
+import heapq
+import json
+import os
+import random
+from models.group import Group
+from models.student import Student
+from utils.constants import SkillLevel, DEFAULT_GROUP_SIZE
+
+
+class RoundHistory:
+    """
+    Who has been grouped with whom over past rounds.
+
+    Pair counts are kept as a sparse, symmetric adjacency map (name to
+    partner names to rounds together), so memory grows with the pairs that
+    actually met, about N * (group size - 1) per round, never N squared.
+    """
+
+    def __init__(self):
+        """Create an empty history."""
+        self.rounds = 0
+        self._partners: Dict[str, Dict[str, int]] = {}
+
+    def record_round(self, groups: Iterable[Group]) -> None:
+        """
+        Remember every pair of teammates in a grouping as one more round.
+
+        Args:
+            groups (Iterable[Group]): The grouping that was used
+        """
+        for group in groups:
+            names = [member.name for member in group.members]
+            for name in names:
+                partners = self._partners.setdefault(name, {})
+                for partner in names:
+                    if partner != name:
+                        partners[partner] = partners.get(partner, 0) + 1
+        self.rounds += 1
+
+    def partners(self, name: str) -> Dict[str, int]:
+        """Past teammates of a student, with the number of rounds shared."""
+        return self._partners.get(name, {})
+
+    def pair_count(self, first: str, second: str) -> int:
+        """Number of past rounds two students were grouped together."""
+        return self._partners.get(first, {}).get(second, 0)
+
+    def repeat_pairs(self, groups: Iterable[Group]) -> int:
+        """
+        Count the pairs of teammates in a grouping who have met before.
+
+        Args:
+            groups (Iterable[Group]): A grouping to score
+
+        Returns:
+            int: Number of repeated pairs (each pair counted once)
+        """
+        repeats = 0
+        for group in groups:
+            names = [member.name for member in group.members]
+            for idx, name in enumerate(names):
+                partners = self._partners.get(name)
+                if partners:
+                    repeats += sum(1 for partner in names[idx + 1:] if partner in partners)
+        return repeats
+
+    def forget(self, name: str) -> None:
+        """Drop a student from the history, for example when they leave the roster."""
+        for partner in self._partners.pop(name, {}):
+            self._partners[partner].pop(name, None)
+
+    def __len__(self) -> int:
+        """Number of distinct pairs that have met."""
+        return sum(len(partners) for partners in self._partners.values()) // 2
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The history as JSON-ready data, each pair listed once."""
+        return {
+            "rounds": self.rounds,
+            "pairs": sorted(
+                [name, partner, count]
+                for name, partners in self._partners.items()
+                for partner, count in partners.items()
+                if name < partner
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "RoundHistory":
+        """A history saved with ``to_dict`` (None gives an empty history)."""
+        history = cls()
+        data = data or {}
+        history.rounds = data.get("rounds", 0)
+        for name, partner, count in data.get("pairs", []):
+            history._partners.setdefault(name, {})[partner] = count
+            history._partners.setdefault(partner, {})[name] = count
+        return history
+
+    def save(self, path: str) -> None:
+        """Write the history to a JSON file, replacing it atomically."""
+        partial = f"{path}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RoundHistory":
+        """Read a history saved with ``save``; a missing file gives an empty history."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def create_round_groups(
+    students: Collection[Student],
+    group_size: int = DEFAULT_GROUP_SIZE,
+    history: Optional[RoundHistory] = None,
+    seed: Optional[Union[int, random.Random]] = None
+) -> List[Group]:
+    """
+    Form stratified groups that avoid pairing past teammates again.
+
+    Students are dealt level by level, highest first, always to a group
+    with the fewest students of their level (so skill levels and sizes stay
+    balanced exactly as in ``create_stratified_groups``). Among those
+    groups, the one holding the fewest of the student's past teammates is
+    chosen. A student's repeat score per group is built from their own
+    partner list and the groups already assigned, so each placement costs
+    O((P + 1) log G) for P past partners and G groups, independent of the
+    roster size.
+
+    Args:
+        students (Collection[Student]): Students to group; all must have responded
+        group_size (int): Target size for each group
+        history (Optional[RoundHistory]): Past rounds; without one this is a
+            plain stratified grouping
+        seed (Optional[Union[int, random.Random]]): Seed or generator for
+            reproducible groups
+
+    Returns:
+        List[Group]: List of formed groups
+
+    Raises:
+        ValueError: If a student has not responded or the group size is below 1
+    """
+    if group_size < 1:
+        raise ValueError("Group size must be at least 1")
+    students = list(students)
+    if not all(student.has_responded and student.skill_level for student in students):
+        raise ValueError("All students must respond before groups can be formed")
+    history = history or RoundHistory()
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+
+    n = len(students)
+    num_groups = max(1, (n + group_size - 1) // group_size)
+    # Sizes differ by at most one: `capacity` in `full_slots` groups, one fewer in the rest
+    capacity = (n + num_groups - 1) // num_groups
+    full_slots = n - num_groups * (capacity - 1)
+    at_capacity = 0
+
+    groups = [Group(rng=rng) for _ in range(num_groups)]
+    group_of: Dict[str, int] = {}
+    tie_breaks = list(range(num_groups))
+    rng.shuffle(tie_breaks)
+
+    def fits(group_idx: int) -> bool:
+        size = groups[group_idx].size + 1
+        return size < capacity or (size == capacity and at_capacity < full_slots)
+
+    by_level: Dict[SkillLevel, List[Student]] = {level: [] for level in SkillLevel}
+    for student in students:
+        by_level[student.skill_level].append(student)
+
+    for level in sorted(SkillLevel, key=lambda level: level.value, reverse=True):
+        pending = by_level[level]
+        if not pending:
+            continue
+        rng.shuffle(pending)
+        counts = [group.level_counts[level] for group in groups]
+        heap = [
+            (counts[group_idx], groups[group_idx].size, tie_breaks[group_idx], group_idx)
+            for group_idx in range(num_groups)
+            if fits(group_idx)
+        ]
+        heapq.heapify(heap)
+
+        for student in pending:
+            # Past teammates already placed this round, per group
+            repeats: Dict[int, int] = {}
+            for partner, times in history.partners(student.name).items():
+                partner_group = group_of.get(partner)
+                if partner_group is not None:
+                    repeats[partner_group] = repeats.get(partner_group, 0) + times
+
+            # Candidates: groups with the fewest of this level; stop at the first without repeats
+            skipped = []
+            chosen = None
+            while heap:
+                entry = heapq.heappop(heap)
+                if not fits(entry[3]):
+                    continue  # Full for good
+                if skipped and entry[0] > skipped[0][0]:
+                    heapq.heappush(heap, entry)
+                    break
+                if entry[3] not in repeats:
+                    chosen = entry
+                    break
+                skipped.append(entry)
+            if chosen is None:
+                chosen = min(skipped, key=lambda entry: repeats[entry[3]])
+            skipped = [entry for entry in skipped if entry is not chosen]
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+
+            group_idx = chosen[3]
+            groups[group_idx].add_member(student)
+            group_of[student.name] = group_idx
+            counts[group_idx] += 1
+            if groups[group_idx].size == capacity:
+                at_capacity += 1
+            heapq.heappush(heap, (counts[group_idx], groups[group_idx].size, tie_breaks[group_idx], group_idx))
+    return groups
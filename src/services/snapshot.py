@@ -0,0 +1,425 @@
+from array import array
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+import json
+import mmap
+import os
+import struct
+import sys
+from models.group import Group
+from models.roster import Roster
+from models.student import Student, frozen_attributes
+from utils.constants import SkillLevel
+
+# Layout, all integers little-endian, every section padded to 4 bytes:
+#
+#   header        magic, version, reserved, students, groups, members, strings, string bytes
+#   levels        uint8[students]      skill level value, 0 if none
+#   flags         uint8[students]      bit 0: has responded
+#   names         uint32[students]     string id of the name
+#   emails        uint32[students]     string id of the email, or NO_STRING
+#   attributes    uint32[students]     string id of the attributes as JSON, or NO_STRING
+#   group names   uint32[groups]       string id of each group's name
+#   group starts  uint32[groups + 1]   offset of each group's first member in members
+#   members       uint32[members]      student index of each group member
+#   string ends   uint32[strings]      end offset of each string in the string bytes
+#   string bytes  UTF-8 text of every distinct string, back to back
+#
+# Readers are registered per format version, so snapshots written by older
+# releases keep loading after the layout changes.
+
+MAGIC = b"SSNP"
+SNAPSHOT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHHIIIIQ")
+_RESPONDED = 1
+_LEVEL_VALUES = [0] + [level.value for level in SkillLevel]
+
+
+class SnapshotError(ValueError):
+    """A file that is not a snapshot, is truncated, or comes from a newer release."""
+
+
+def _pad(size: int) -> int:
+    """Size rounded up to a multiple of 4 bytes."""
+    return (size + 3) & ~3
+
+
+def _little_endian(values: array) -> bytes:
+    """Raw bytes of an array in little-endian order."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _StringTable:
+    """Distinct strings in first-use order, each stored once."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.ends = array("I")
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        string_id = self.ids.get(text)
+        if string_id is None:
+            encoded = text.encode("utf-8")
+            self.size += len(encoded)
+            string_id = self.ids[text] = len(self.ends)
+            self.ends.append(self.size)
+            self.chunks.append(encoded)
+        return string_id
+
+
+def encode_snapshot(students: Iterable[Student], groups: Sequence[Group] = ()) -> bytes:
+    """
+    Pack a roster and its grouping into the snapshot format.
+
+    Args:
+        students (Iterable[Student]): The roster, in order
+        groups (Sequence[Group]): The grouping; every member must be one of
+            the students
+
+    Returns:
+        bytes: The snapshot
+
+    Raises:
+        ValueError: If a group member is not one of the students
+    """
+    strings = _StringTable()
+    levels, flags = array("B"), array("B")
+    names, emails, attributes = array("I"), array("I"), array("I")
+    index: Dict[str, int] = {}
+    # Imported students share attribute dicts, so each distinct dict is serialized once
+    attribute_ids: Dict[int, int] = {}
+    for student in students:
+        index[student.name] = len(names)
+        levels.append(student.skill_level.value if student.skill_level else 0)
+        flags.append(_RESPONDED if student.has_responded else 0)
+        names.append(strings.add(student.name))
+        emails.append(strings.add(student.email))
+        if not student.attributes:
+            attributes.append(NO_STRING)
+            continue
+        attributes_id = attribute_ids.get(id(student.attributes))
+        if attributes_id is None:
+            attributes_id = attribute_ids[id(student.attributes)] = strings.add(
+                json.dumps(dict(student.attributes), sort_keys=True)
+            )
+        attributes.append(attributes_id)
+
+    group_names, group_starts, members = array("I"), array("I", [0]), array("I")
+    for group in groups:
+        group_names.append(strings.add(group.name))
+        for member in group.members:
+            idx = index.get(member.name)
+            if idx is None:
+                raise ValueError(f"{member.name} is in {group.name} but not on the roster")
+            members.append(idx)
+        group_starts.append(len(members))
+
+    header = _HEADER.pack(
+        MAGIC, SNAPSHOT_VERSION, 0, len(names), len(group_names), len(members), len(strings.ends), strings.size
+    )
+    parts = [header]
+    for section in (levels, flags, names, emails, attributes, group_names, group_starts, members, strings.ends):
+        data = _little_endian(section)
+        parts.append(data)
+        parts.append(b"\0" * (_pad(len(data)) - len(data)))
+    parts.extend(strings.chunks)
+    return b"".join(parts)
+
+
+def write_snapshot(
+    target: Union[str, os.PathLike, BinaryIO],
+    students: Iterable[Student],
+    groups: Sequence[Group] = ()
+) -> int:
+    """
+    Write a roster and its grouping to a snapshot file.
+
+    A path is replaced atomically, so readers never see a half-written file.
+
+    Args:
+        target (Union[str, os.PathLike, BinaryIO]): File path or open binary file
+        students (Iterable[Student]): The roster, in order
+        groups (Sequence[Group]): The grouping
+
+    Returns:
+        int: Bytes written
+    """
+    data = encode_snapshot(students, groups)
+    if not isinstance(target, (str, os.PathLike)):
+        target.write(data)
+        return len(data)
+    partial = f"{os.fspath(target)}.tmp"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, target)
+    return len(data)
+
+
+def _check(condition: bool, problem: str) -> None:
+    """Raise ``SnapshotError`` for damaged data unless the condition holds."""
+    if not condition:
+        raise SnapshotError(f"Snapshot is damaged: {problem}")
+
+
+def _damage_v1(sections: Dict[str, memoryview], header: Tuple) -> Optional[str]:
+    """
+    Check every id and offset with vectorized scans, so a damaged file fails
+    on open rather than on first access.
+
+    Returns the problem instead of raising it, so no array still holds the
+    section buffers when the snapshot is closed.
+    """
+    # numpy is only needed here, so keep it off the default import path
+    import numpy as np
+
+    _, _, _, students, _, members, strings, string_bytes = header
+    if not np.isin(np.asarray(sections["levels"]), _LEVEL_VALUES).all():
+        return "unknown skill level"
+    ends = np.asarray(sections["string_ends"], dtype=np.int64)
+    if len(ends) and (ends[-1] > string_bytes or (np.diff(ends) < 0).any()):
+        return "bad string offsets"
+    for name, optional in (("names", False), ("emails", True), ("attributes", True), ("group_names", False)):
+        ids = np.asarray(sections[name])
+        if optional:
+            ids = ids[ids != NO_STRING]
+        if len(ids) and ids.max() >= strings:
+            return f"bad string id in {name.replace('_', ' ')}"
+    starts = np.asarray(sections["group_starts"], dtype=np.int64)
+    if starts[0] != 0 or starts[-1] != members or (np.diff(starts) < 0).any():
+        return "bad group offsets"
+    indices = np.asarray(sections["members"])
+    if len(indices) and indices.max() >= students:
+        return "group member out of range"
+    return None
+
+
+def _read_v1(view: memoryview, header: Tuple) -> Dict[str, memoryview]:
+    """Section views of a version 1 snapshot."""
+    _, _, _, students, groups, members, strings, string_bytes = header
+    layout = (
+        ("levels", "B", students),
+        ("flags", "B", students),
+        ("names", "I", students),
+        ("emails", "I", students),
+        ("attributes", "I", students),
+        ("group_names", "I", groups),
+        ("group_starts", "I", groups + 1),
+        ("members", "I", members),
+        ("string_ends", "I", strings),
+    )
+    sizes = [count * struct.calcsize(typecode) for _, typecode, count in layout]
+    if _HEADER.size + sum(_pad(size) for size in sizes) + string_bytes > len(view):
+        raise SnapshotError("Snapshot is truncated")
+
+    sections = {}
+    offset = _HEADER.size
+    for (name, typecode, _), size in zip(layout, sizes):
+        section = view[offset:offset + size]
+        if sys.byteorder != "little" and typecode != "B":
+            values = array(typecode, section.tobytes())
+            values.byteswap()
+            section = memoryview(values)
+        sections[name] = section.cast(typecode)
+        offset += _pad(size)
+    sections["strings"] = view[offset:offset + string_bytes]
+    problem = _damage_v1(sections, header)
+    if problem is not None:
+        for section in sections.values():
+            section.release()
+        raise SnapshotError(f"Snapshot is damaged: {problem}")
+    return sections
+
+
+_READERS: Dict[int, Callable[[memoryview, Tuple], Dict[str, memoryview]]] = {
+    1: _read_v1,
+}
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot, decoded lazily.
+
+    Opening parses the fixed-size header, maps the sections and checks
+    their ids and offsets with vectorized scans; a student's name, email
+    and attributes are decoded from the string table only when that row is
+    read. Files are memory-mapped, so only the pages actually read are
+    loaded. Close the snapshot (or use it as a context manager) when done.
+    """
+
+    def __init__(self, buffer, mapped: Optional[mmap.mmap] = None):
+        """
+        Read a snapshot; use ``open`` or ``from_bytes`` rather than calling this directly.
+
+        Args:
+            buffer: Bytes-like object holding the snapshot
+            mapped (Optional[mmap.mmap]): The file mapping behind ``buffer``, closed with the snapshot
+
+        Raises:
+            SnapshotError: If the data is not a snapshot this release can read,
+                or is damaged
+        """
+        self._mapped = mapped
+        self._view = memoryview(buffer)
+        self._sections: Dict[str, memoryview] = {}
+        try:
+            self._sections = self._read_sections()
+        except SnapshotError:
+            self.close()
+            raise
+        self.version = self._version
+        self._levels = self._sections["levels"]
+        self._flags = self._sections["flags"]
+        self._names = self._sections["names"]
+        self._string_ends = self._sections["string_ends"]
+        self._strings = self._sections["strings"]
+        # Students with the same attributes share one read-only mapping, as in the roster store
+        self._attributes: Dict[int, Mapping[str, str]] = {}
+
+    def _read_sections(self) -> Dict[str, memoryview]:
+        """Check the header and map the sections with the reader of its version."""
+        if len(self._view) < _HEADER.size:
+            raise SnapshotError("Not a snapshot: the file is too short")
+        header = _HEADER.unpack_from(self._view)
+        if header[0] != MAGIC:
+            raise SnapshotError("Not a snapshot: bad magic bytes")
+        self._version = header[1]
+        reader = _READERS.get(self._version)
+        if reader is None:
+            raise SnapshotError(
+                f"Snapshot format {self._version} is newer than this release supports ({SNAPSHOT_VERSION})"
+            )
+        return reader(self._view, header)
+
+    @classmethod
+    def open(cls, path: Union[str, os.PathLike]) -> "Snapshot":
+        """
+        Memory-map a snapshot file.
+
+        Raises:
+            SnapshotError: If the file is not a snapshot this release can read
+            OSError: If the file cannot be read
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise SnapshotError("Not a snapshot: the file is empty")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, mapped)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Snapshot":
+        """Read a snapshot held in memory, such as an upload."""
+        return cls(data)
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == NO_STRING:
+            return None
+        start = self._string_ends[string_id - 1] if string_id else 0
+        try:
+            return str(self._strings[start:self._string_ends[string_id]], "utf-8")
+        except UnicodeDecodeError as e:
+            raise SnapshotError(f"Snapshot is damaged: string {string_id} is not UTF-8") from e
+
+    def __len__(self) -> int:
+        """Number of students."""
+        return len(self._levels)
+
+    @property
+    def group_count(self) -> int:
+        """Number of groups."""
+        return len(self._sections["group_names"])
+
+    def name(self, idx: int) -> str:
+        """Name of the student at a roster position."""
+        return self._string(self._names[idx])
+
+    def student(self, idx: int) -> Student:
+        """
+        Decode one student.
+
+        Args:
+            idx (int): Roster position
+
+        Returns:
+            Student: A new student with the saved fields
+
+        Raises:
+            SnapshotError: If the row's text is damaged
+        """
+        level = self._levels[idx]
+        attributes_id = self._sections["attributes"][idx]
+        attributes = None
+        if attributes_id != NO_STRING:
+            attributes = self._attributes.get(attributes_id)
+            if attributes is None:
+                try:
+                    attributes = json.loads(self._string(attributes_id))
+                except ValueError as e:
+                    raise SnapshotError(f"Snapshot is damaged: bad attributes of student {idx}") from e
+                _check(isinstance(attributes, dict), f"bad attributes of student {idx}")
+                attributes = self._attributes[attributes_id] = frozen_attributes(attributes)
+        return Student(
+            name=self._string(self._names[idx]),
+            email=self._string(self._sections["emails"][idx]),
+            skill_level=SkillLevel(level) if level else None,
+            has_responded=bool(self._flags[idx] & _RESPONDED),
+            attributes=attributes
+        )
+
+    def __iter__(self) -> Iterator[Student]:
+        """Decode the students in roster order."""
+        return (self.student(idx) for idx in range(len(self)))
+
+    def to_roster(self) -> Roster:
+        """Decode every student into a new ``Roster``."""
+        return Roster(self)
+
+    def group_members(self, group_idx: int) -> List[int]:
+        """Roster positions of one group's members."""
+        starts = self._sections["group_starts"]
+        return self._sections["members"][starts[group_idx]:starts[group_idx + 1]].tolist()
+
+    def groups(self, roster: Optional[Roster] = None) -> List[Group]:
+        """
+        Rebuild the saved grouping.
+
+        Args:
+            roster (Optional[Roster]): Roster to take members from by name, so the
+                groups share its students; members no longer on it are left out.
+                Without one, the members are decoded from the snapshot.
+
+        Returns:
+            List[Group]: The groups, with their saved names
+        """
+        groups = []
+        for group_idx, name_id in enumerate(self._sections["group_names"]):
+            group = Group(name=self._string(name_id))
+            for idx in self.group_members(group_idx):
+                student = roster.get(self.name(idx)) if roster is not None else self.student(idx)
+                if student is not None:
+                    group.add_member(student)
+            groups.append(group)
+        return groups
+
+    def close(self) -> None:
+        """Release the section views and unmap the file."""
+        for section in self._sections.values():
+            section.release()
+        self._sections = {}
+        self._view.release()
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,157 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Optional
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+from services.array_engine import (
+    BalanceScore,
+    GroupAssignment,
+    SeedLike,
+    balance_score,
+    stratified_assignment
+)
+from utils.constants import DEFAULT_GROUP_SIZE, DEFAULT_BALANCE_TRIALS
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    """
+    Best grouping found by a multi-trial search.
+
+    Attributes:
+        assignment (GroupAssignment): The winning assignment
+        score (BalanceScore): Its balance score
+        trials_run (int): Number of candidates that were scored
+        elapsed (float): Wall-clock seconds spent searching
+        target_reached (bool): Whether the search stopped early at the target score
+    """
+    assignment: GroupAssignment
+    score: BalanceScore
+    trials_run: int
+    elapsed: float
+    target_reached: bool
+
+
+def _score_trial(levels: np.ndarray, group_size: int, seed: np.random.SeedSequence) -> BalanceScore:
+    """Build one candidate and return only its score (runs in a worker process)."""
+    assignment = stratified_assignment(levels, group_size, seed, shuffle_rounds=True)
+    return balance_score(levels, assignment.group_indices, assignment.num_groups)
+
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _shared_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool of ``workers`` processes, started once and reused by later searches.
+
+    Workers are spawned rather than forked: the app forks from a process with
+    live threads (Streamlit's, the response queue's), and a forked child can
+    inherit locks those threads held.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next search starts a fresh one."""
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False)
+
+
+def best_of_trials(
+    levels: np.ndarray,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    trials: int = DEFAULT_BALANCE_TRIALS,
+    seed: SeedLike = None,
+    workers: Optional[int] = None,
+    target_score: Optional[float] = None,
+    time_budget: Optional[float] = None
+) -> TrialResult:
+    """
+    Generate candidate groupings in parallel and keep the most balanced one.
+
+    Each trial gets an independent child seed. Workers send back only a
+    score, so large assignments never cross process boundaries; the winner
+    is rebuilt from its seed at the end. Worker processes are shared between
+    searches (see ``_shared_pool``), so only the first search pays for
+    starting them.
+
+    Args:
+        levels (np.ndarray): Integer ``SkillLevel`` values, one per student
+        group_size (int): Target size for each group
+        trials (int): Maximum number of candidates
+        seed (SeedLike): Root seed; the same seed gives the same result when
+            every trial runs
+        workers (Optional[int]): Worker processes; 1 runs the trials inline.
+            Defaults to the CPU count, capped at ``trials``
+        target_score (Optional[float]): Stop as soon as a candidate's
+            ``BalanceScore.total`` is at or below this
+        time_budget (Optional[float]): Wall-clock seconds after which no more
+            results are awaited (at least one trial always completes)
+
+    Returns:
+        TrialResult: The best candidate and search statistics
+    """
+    if trials < 1:
+        raise ValueError("At least one trial is required")
+    levels = np.asarray(levels, dtype=np.uint8)
+    seeds = np.random.SeedSequence(seed).spawn(trials)
+    workers = min(trials, workers or os.cpu_count() or 1)
+    start = time.monotonic()
+    deadline = start + time_budget if time_budget is not None else None
+
+    scores: Dict[int, BalanceScore] = {}
+
+    def done() -> bool:
+        if target_score is not None and scores and min(s.total for s in scores.values()) <= target_score:
+            return True
+        return bool(scores) and deadline is not None and time.monotonic() >= deadline
+
+    if workers == 1:
+        for idx, child in enumerate(seeds):
+            scores[idx] = _score_trial(levels, group_size, child)
+            if done():
+                break
+    else:
+        executor = _shared_pool(workers)
+        futures: Dict[Future, int] = {}
+        try:
+            for idx, child in enumerate(seeds):
+                futures[executor.submit(_score_trial, levels, group_size, child)] = idx
+            pending = set(futures)
+            while pending and not done():
+                timeout = None if deadline is None or not scores else max(0.0, deadline - time.monotonic())
+                finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    scores[futures[future]] = future.result()
+        except BrokenProcessPool:
+            _discard_pool(workers, executor)
+            raise
+        finally:
+            # Don't run candidates nobody needs any more; the pool stays up for the next search
+            for future in futures:
+                future.cancel()
+
+    best_idx, best_score = min(scores.items(), key=lambda item: (item[1].total, item[0]))
+    assignment = stratified_assignment(levels, group_size, seeds[best_idx], shuffle_rounds=True)
+    return TrialResult(
+        assignment=assignment,
+        score=best_score,
+        trials_run=len(scores),
+        elapsed=time.monotonic() - start,
+        target_reached=target_score is not None and best_score.total <= target_score
+    )
@@ -42,4 +42,36 @@ ANIMALS = [
 # Default configuration
 DEFAULT_GROUP_SIZE = 5
 DEFAULT_ADMIN_PAGE = "admin"
-DEFAULT_STUDENT_PAGE = "student" 
\ No newline at end of file
+DEFAULT_STUDENT_PAGE = "student"
+ROOMS_PER_PAGE = 12
+
+# Recent durations kept per timed phase for latency percentiles
+METRICS_SAMPLE_SIZE = 2_048
+
+# Cohorts
+DEFAULT_COHORT_ID = "default"
+DEFAULT_COHORT_IDLE_TIMEOUT = 30 * 60  # seconds before an idle cohort is unloaded
+
+# Recent roster changes remembered for patching cached tables
+ROSTER_CHANGE_LOG_SIZE = 1_024
+# Cached tables kept per session
+FRAME_CACHE_SIZE = 8
+
+# Number of candidate groupings tried by GroupService.create_balanced_groups
+DEFAULT_BALANCE_TRIALS = 8
+
+# Roster import configuration
+DEFAULT_IMPORT_CHUNK_SIZE = 10_000
+
+# Cohorts per worker task when grouping many cohorts at once
+DEFAULT_COHORT_CHUNK_SIZE = 16
+
+# Shared roster store configuration
+DEFAULT_STORE_BATCH_SIZE = 5_000
+
+# Response ingestion queue configuration
+DEFAULT_QUEUE_BATCH_SIZE = 500
+DEFAULT_QUEUE_FLUSH_INTERVAL = 0.05  # seconds
+
+# Maximum improvement passes of the swap-based refinement
+DEFAULT_REFINEMENT_PASSES = 1_000
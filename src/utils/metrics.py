@@ -0,0 +1,183 @@
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, TypeVar
+import threading
+import time
+from utils.constants import METRICS_SAMPLE_SIZE
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _NullTimer:
+    """Shared do-nothing timer handed out while metrics are disabled."""
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Times one ``with`` block and records it under a phase name."""
+
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._metrics.record(self._name, time.perf_counter() - self._start)
+
+
+class _Phase:
+    """Running totals and recent samples of one timed phase."""
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-int(fraction * 1000) * len(ordered) // 1000))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Metrics:
+    """
+    Process-wide timers and counters for the hot paths.
+
+    While disabled, ``timer`` returns a shared no-op context manager and
+    ``increment``/``record`` return after a single attribute check, so
+    instrumented code costs next to nothing. Each phase keeps its exact
+    count and total plus the most recent ``sample_size`` durations, from
+    which percentiles are computed when a snapshot is taken.
+    """
+
+    def __init__(self, enabled: bool = False, sample_size: int = METRICS_SAMPLE_SIZE):
+        """
+        Create an empty registry.
+
+        Args:
+            enabled (bool): Whether to record from the start
+            sample_size (int): Recent durations kept per phase for percentiles
+        """
+        self.enabled = enabled
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._phases: Dict[str, _Phase] = {}
+        self._counters: Dict[str, int] = {}
+        self._started = time.monotonic()
+
+    def timer(self, name: str):
+        """
+        Context manager timing a block as phase ``name``.
+
+        Args:
+            name (str): Phase name, such as ``"admin.roster_table"``
+
+        Returns:
+            A context manager; a shared no-op one while disabled
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """Decorator timing every call of a function as phase ``name``."""
+        def decorator(func: F) -> F:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record one duration of a phase."""
+        if not self.enabled:
+            return
+        with self._lock:
+            phase = self._phases.get(name)
+            if phase is None:
+                phase = self._phases[name] = _Phase(self.sample_size)
+            phase.count += 1
+            phase.total += seconds
+            phase.max = max(phase.max, seconds)
+            phase.samples.append(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._phases.clear()
+            self._counters.clear()
+            self._started = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Everything recorded since the last reset, ready to export as JSON.
+
+        Returns:
+            Dict[str, Any]: ``elapsed_seconds``, ``counters`` and, per phase,
+            ``count``, ``per_minute``, ``total_ms``, ``mean_ms``, ``p50_ms``,
+            ``p95_ms``, ``p99_ms`` and ``max_ms``
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            phases = {
+                name: (phase.count, phase.total, phase.max, sorted(phase.samples))
+                for name, phase in self._phases.items()
+            }
+            counters = dict(self._counters)
+
+        minutes = max(elapsed, 1e-9) / 60
+        return {
+            "enabled": self.enabled,
+            "elapsed_seconds": round(elapsed, 3),
+            "counters": counters,
+            "phases": {
+                name: {
+                    "count": count,
+                    "per_minute": round(count / minutes, 2),
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total / count * 1000, 3),
+                    "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+                    "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+                    "max_ms": round(peak * 1000, 3),
+                }
+                for name, (count, total, peak, ordered) in sorted(phases.items())
+            },
+        }
+
+
+# Shared by the models, services and app; enabled by the app or by callers
+METRICS = Metrics()
@@ -0,0 +1,26 @@
+"""
+Pytest configuration.
+
+The application modules import each other as top-level packages
+(``from utils.constants import ...``) because ``streamlit run src/app.py``
+puts ``src`` on the path, while the tests import them through the ``src.``
+prefix. Register every module under both names so there is only one copy of
+each class (e.g. ``SkillLevel``) in the test process.
+"""
+import importlib
+import os
+import pkgutil
+import sys
+
+import src
+
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+for _package_name in ("utils", "models", "services"):
+    _package = importlib.import_module(_package_name)
+    sys.modules[f"src.{_package_name}"] = _package
+    setattr(src, _package_name, _package)
+    for _info in pkgutil.walk_packages(_package.__path__, prefix=f"{_package_name}."):
+        sys.modules[f"src.{_info.name}"] = importlib.import_module(_info.name)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from src.models.student import Student
+from src.services.array_engine import count_groups, skill_level_array, stratified_assignment
+from src.services.group_service import GroupService
+from src.utils.constants import SkillLevel
+
+def create_test_students(count=23):
+    """Helper function to create responded students cycling through all levels."""
+    levels = list(SkillLevel)
+    return [
+        Student(name=f"Student {i}", skill_level=levels[i % len(levels)], has_responded=True)
+        for i in range(count)
+    ]
+
+def test_stratified_assignment_is_reproducible():
+    """Test that the same seed gives the same assignment."""
+    levels = np.random.default_rng(0).integers(1, 5, size=1000)
+    first = stratified_assignment(levels, group_size=4, seed=42)
+    second = stratified_assignment(levels, group_size=4, seed=42)
+    assert np.array_equal(first.order, second.order)
+    assert np.array_equal(first.group_indices, second.group_indices)
+
+def test_stratified_assignment_balance():
+    """Test that group sizes and per-level counts differ by at most one."""
+    levels = np.random.default_rng(1).integers(1, 5, size=10_001)
+    assignment = stratified_assignment(levels, group_size=6, seed=7)
+
+    assert assignment.num_groups == count_groups(len(levels), 6)
+    sizes = assignment.group_sizes
+    assert sizes.sum() == len(levels)
+    assert sizes.max() - sizes.min() <= 1
+
+    for level in range(1, 5):
+        per_group = np.bincount(
+            assignment.group_indices[levels == level],
+            minlength=assignment.num_groups
+        )
+        assert per_group.max() - per_group.min() <= 1
+
+def test_stratified_assignment_requires_responses():
+    """Test that unrated students (level 0) are rejected."""
+    with pytest.raises(ValueError):
+        stratified_assignment(np.array([1, 0, 3]), group_size=2)
+
+def test_vectorized_matches_python_engine_composition():
+    """Test that both engines give every group the same skill composition."""
+    students = create_test_students()
+
+    python_groups = GroupService.create_stratified_groups(students, group_size=4)
+    vector_groups = GroupService.create_stratified_groups_vectorized(students, group_size=4, seed=3)
+
+    def composition(groups):
+        return [sorted(m.skill_level.value for m in g.members) for g in groups]
+
+    assert composition(vector_groups) == composition(python_groups)
+    assert sorted(m.name for g in vector_groups for m in g.members) == sorted(s.name for s in students)
+
+def test_member_indices_highest_level_first():
+    """Test that each group's first member comes from the highest stratum dealt."""
+    students = create_test_students(8)
+    levels = skill_level_array(students)
+    assignment = stratified_assignment(levels, group_size=4, seed=0)
+    for group_idx in range(assignment.num_groups):
+        assert levels[assignment.member_indices(group_idx)[0]] == SkillLevel.EXPERT.value
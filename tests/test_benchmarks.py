@@ -0,0 +1,43 @@
+import json
+from benchmarks.__main__ import main
+from benchmarks.suite import CASES, Measurement, compare, load_results, results_document, run_suite
+
+def test_suite_runs_every_case():
+    """Test that every case runs on a tiny roster and records time and memory."""
+    results = run_suite([10], group_sizes=[2, 5], repeats=1)
+    per_case = {case.name: 2 if case.per_group_size else 1 for case in CASES}
+    assert len(results) == sum(per_case.values())
+    assert all(r.seconds >= 0 and r.peak_bytes >= 0 for r in results)
+    refinement = next(r for r in results if r.case == "refine_groups")
+    assert {"passes", "swaps", "variance_before", "variance_after"} <= set(refinement.details)
+    assert refinement.details["variance_after"] <= refinement.details["variance_before"]
+
+    document = json.loads(json.dumps(results_document(results)))
+    assert load_results(document) == results
+
+def test_compare_flags_regressions():
+    """Test that slowdowns and memory growth beyond tolerance are flagged."""
+    baseline = [
+        Measurement("a", 1000, None, 0.010, 1_000_000),
+        Measurement("b", 1000, 5, 0.010, 1_000_000),
+        Measurement("c", 1000, None, 0.0001, 100),
+    ]
+    current = [
+        Measurement("a", 1000, None, 0.011, 1_050_000),
+        Measurement("b", 1000, 5, 0.020, 1_000_000),
+        Measurement("c", 1000, None, 0.0005, 500),
+        Measurement("new", 1000, None, 1.0, 1),
+    ]
+    comparisons = compare(current, baseline)
+    assert [(c.current.case, c.regressed) for c in comparisons] == [
+        ("a", False), ("b", True), ("c", False)
+    ]
+
+def test_cli_compares_with_baseline(tmp_path, capsys):
+    """Test that the command line saves a baseline and reports no regressions against it."""
+    baseline = str(tmp_path / "baseline.json")
+    args = ["--sizes", "10", "--group-sizes", "5", "--case", "roster_bulk_add",
+            "--repeats", "1", "--baseline", baseline]
+    assert main(args + ["--save-baseline"]) == 0
+    assert main(args + ["--time-tolerance", "1000"]) == 0
+    assert "No regressions" in capsys.readouterr().out
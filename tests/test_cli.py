@@ -0,0 +1,140 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import pytest
+from src.cli import main
+from src.services.batch import group_roster_file
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# Importing the headless entry point must stay well within a serverless cold-start budget
+STARTUP_BUDGET_SECONDS = 0.3
+
+ROSTER = "name,email,skill level\n" + "".join(
+    f"Student {idx},s{idx}@example.org,{idx % 4 + 1}\n" for idx in range(23)
+)
+
+@pytest.fixture
+def roster_file(tmp_path):
+    """A CSV roster with a skill level for every student."""
+    path = tmp_path / "roster.csv"
+    path.write_text(ROSTER, encoding="utf-8")
+    return str(path)
+
+def test_cli_writes_groups(roster_file, tmp_path):
+    """Test a seeded run end to end, from roster file to groups CSV."""
+    output = str(tmp_path / "groups.csv")
+    assert main([roster_file, "-o", output, "-g", "5", "--seed", "7"]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 23
+    assert {row["Room"] for row in rows} == {"1", "2", "3", "4", "5"}
+    assert rows[0]["Email"].endswith("@example.org")
+
+    again = str(tmp_path / "again.csv")
+    main([roster_file, "-o", again, "-g", "5", "--seed", "7"])
+    with open(output, encoding="utf-8") as first, open(again, encoding="utf-8") as second:
+        assert first.read() == second.read()
+
+@pytest.mark.parametrize("method", ["vectorized", "balanced"])
+def test_batch_methods(roster_file, tmp_path, method):
+    """Test that every grouping method can be used headlessly."""
+    result = group_roster_file(
+        roster_file, str(tmp_path / "groups.csv"), group_size=4, method=method, seed=1, workers=1
+    )
+    assert result.students == 23
+    assert result.groups == 6
+
+def test_cli_zoom_export(roster_file, tmp_path, capsys):
+    """Test the Zoom pre-assignment format from the command line."""
+    output = str(tmp_path / "zoom.csv")
+    assert main([roster_file, "-o", output, "-f", "zoom", "-g", "5", "--seed", "1"]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["Pre-assign Room Name", "Email Address"]
+    assert len(rows) == 24
+    assert rows[1][0] == "Breakout Room 1"
+
+def test_cli_rejects_missing_skill_levels(tmp_path, capsys):
+    """Test a clear error for rosters without skill levels."""
+    path = tmp_path / "names.txt"
+    path.write_text("Alice\nBob\n", encoding="utf-8")
+    assert main([str(path)]) == 2
+    assert "no skill level" in capsys.readouterr().err
+
+def test_cli_import_is_lightweight():
+    """Test that the entry point loads no UI, array or process-pool libraries and starts within budget."""
+    script = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {SRC!r})\n"
+        "start = time.perf_counter()\n"
+        "import cli\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = sorted(m for m in ('streamlit', 'pandas', 'numpy', 'dotenv', 'concurrent.futures', "
+        "'multiprocessing') if m in sys.modules)\n"
+        "print(elapsed, ','.join(heavy))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert len(output) == 1, f"heavy modules imported: {output[1:]}"
+    assert float(output[0]) < STARTUP_BUDGET_SECONDS
+
+def test_cli_balance_on_roster_columns(tmp_path, capsys):
+    """Test balancing on extra roster columns in any case, rejecting unknown columns and other methods."""
+    path = tmp_path / "tracks.csv"
+    path.write_text(
+        "name,skill level,Track\n"
+        + "".join(f"Student {idx},{idx % 4 + 1},{'ml' if idx % 2 else 'web'}\n" for idx in range(24)),
+        encoding="utf-8"
+    )
+    output = str(tmp_path / "groups.csv")
+    assert main([str(path), "-o", output, "-g", "4", "--balance-on", "track"]) == 0
+    assert main([str(path), "-o", output, "-g", "4", "--balance-on", "TRACK"]) == 0
+    assert main([str(path), "-o", output, "-m", "vectorized", "--balance-on", "track"]) == 2
+    assert "stratified" in capsys.readouterr().err
+    assert main([str(path), "-o", output, "--balance-on", "nosuch"]) == 2
+    assert "nosuch" in capsys.readouterr().err
+
+def test_cli_constraints_file(roster_file, tmp_path, capsys):
+    """Test keep-together and keep-apart pairs read from a CSV file."""
+    constraints = tmp_path / "constraints.csv"
+    constraints.write_text(
+        "rule,first,second\ntogether,Student 0,Student 1\napart,Student 0,Student 2\n",
+        encoding="utf-8"
+    )
+    output = str(tmp_path / "groups.csv")
+    assert main([roster_file, "-o", output, "-g", "5", "--constraints", str(constraints)]) == 0
+    with open(output, newline="", encoding="utf-8") as f:
+        rooms = {row["Name"]: row["Room"] for row in csv.DictReader(f)}
+    assert rooms["Student 0"] == rooms["Student 1"] != rooms["Student 2"]
+
+    constraints.write_text("together,Student 0,Nobody\n", encoding="utf-8")
+    assert main([roster_file, "-o", output, "--constraints", str(constraints)]) == 2
+    assert "not on the roster" in capsys.readouterr().err
+
+def test_cli_history_file(roster_file, tmp_path):
+    """Test that a history file avoids past teammates and records each run as a round."""
+    history = str(tmp_path / "history.json")
+    output = str(tmp_path / "groups.csv")
+    for seed in range(3):
+        assert main([roster_file, "-o", output, "--seed", str(seed), "--history", history]) == 0
+    with open(history, encoding="utf-8") as f:
+        assert json.load(f)["rounds"] == 3
+    assert main([roster_file, "-o", output, "--refine", "--history", history]) == 2
+
+def test_cli_roster_directory(tmp_path, capsys):
+    """Test that a roster directory is grouped cohort by cohort and failures are reported."""
+    rosters = tmp_path / "rosters"
+    rosters.mkdir()
+    (rosters / "math.csv").write_text(ROSTER, encoding="utf-8")
+    (rosters / "art.csv").write_text(ROSTER, encoding="utf-8")
+    output = tmp_path / "groups"
+    assert main([str(rosters), "-o", str(output), "--workers", "1"]) == 0
+    assert sorted(p.name for p in output.iterdir()) == ["art.csv", "math.csv"]
+
+    (rosters / "drama.csv").write_text("name\nAlice\n", encoding="utf-8")
+    assert main([str(rosters), "-o", str(output), "--workers", "1"]) == 2
+    assert "drama" in capsys.readouterr().err
+    assert main([str(rosters), "--workers", "1"]) == 2
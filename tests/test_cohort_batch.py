@@ -0,0 +1,68 @@
+from src.models.student import Student
+from src.services.cohort_batch import cohort_seed, group_cohorts, roster_files
+from src.services.group_service import GroupService
+from src.utils.constants import SkillLevel
+
+LEVELS = list(SkillLevel)
+
+def make_rosters(count, size=22):
+    """Helper creating (cohort ID, students) pairs with cycling skill levels."""
+    return [
+        (f"class-{c}", [
+            Student(name=f"Student {c}-{i}", skill_level=LEVELS[(i + c) % 4], has_responded=True)
+            for i in range(size)
+        ])
+        for c in range(count)
+    ]
+
+def member_names(groups):
+    """Member names per group, to compare groupings."""
+    return [[m.name for m in g.members] for g in groups]
+
+def test_group_cohorts_inline_matches_group_service():
+    """Test that each cohort is grouped like GroupService does, with the caller's students."""
+    rosters = make_rosters(5)
+    results = {result.cohort_id: result for result in group_cohorts(rosters, 4, seed=7, workers=1, chunk_size=2)}
+    assert sorted(results) == [cohort_id for cohort_id, _ in rosters]
+    for cohort_id, students in rosters:
+        result = results[cohort_id]
+        assert result.ok and result.students == len(students)
+        expected = GroupService.create_stratified_groups(students, 4, cohort_seed(7, cohort_id))
+        assert member_names(result.groups) == member_names(expected)
+        assert [g.name for g in result.groups] == [g.name for g in expected]
+        assert any(m is result.groups[0].members[0] for m in students)
+
+def test_group_cohorts_isolates_errors_across_processes():
+    """Test that a bad roster fails alone while a pool groups the rest."""
+    rosters = make_rosters(6)
+    rosters.insert(3, ("unanswered", [Student(name="Nobody")]))
+    results = list(group_cohorts(rosters, 4, seed=1, workers=2, chunk_size=1))
+    assert len(results) == 7
+    failed = [result for result in results if not result.ok]
+    assert [result.cohort_id for result in failed] == ["unanswered"]
+    assert "no skill level" in failed[0].error
+    assert failed[0].groups is None
+    for result in results:
+        if result.ok:
+            sizes = [g.size for g in result.groups]
+            assert sum(sizes) == 22 and max(sizes) - min(sizes) <= 1
+
+def test_group_cohorts_from_directory(tmp_path):
+    """Test that a directory of roster files is grouped into one output file per cohort."""
+    rosters = tmp_path / "rosters"
+    rosters.mkdir()
+    for c in range(3):
+        (rosters / f"class-{c}.csv").write_text(
+            "name,skill level\n" + "".join(f"S{c}-{i},{i % 4 + 1}\n" for i in range(10)), encoding="utf-8"
+        )
+    (rosters / "notes.md").write_text("not a roster", encoding="utf-8")
+    assert [cohort_id for cohort_id, _ in roster_files(rosters)] == ["class-0", "class-1", "class-2"]
+
+    results = list(group_cohorts(str(rosters), 5, seed=1, workers=1))
+    assert [len(result.groups) for result in results] == [2, 2, 2]
+
+    output = tmp_path / "groups"
+    output.mkdir()
+    results = list(group_cohorts(str(rosters), 5, workers=1, output_dir=str(output)))
+    assert all(result.ok and result.groups is None for result in results)
+    assert sorted(p.name for p in output.iterdir()) == ["class-0.csv", "class-1.csv", "class-2.csv"]
@@ -0,0 +1,300 @@
+import sqlite3
+import threading
+import time
+import pytest
+from src.models.group import Group
+from src.models.student import Student
+from src.services.cohorts import CohortManager
+from src.services.constraints import GroupingConstraints
+from src.services.snapshot import Snapshot, SnapshotError, encode_snapshot
+from src.utils.constants import SkillLevel
+
+@pytest.fixture
+def manager(tmp_path):
+    """A manager saving cohorts to a temporary directory."""
+    manager = CohortManager(str(tmp_path), idle_timeout=60)
+    yield manager
+    manager.close()
+
+def test_cohorts_are_isolated(manager):
+    """Test that cohorts have their own rosters, settings and passwords."""
+    math = manager.create("math", "m-secret", group_size=3)
+    art = manager.create("art", "a-secret")
+    math.add_names(["Alice", "Bob"])
+    art.add_names(["Carol"])
+
+    assert math.roster.names == ["Alice", "Bob"]
+    assert art.roster.names == ["Carol"]
+    assert math.group_size == 3
+    assert math.check_password("m-secret")
+    assert not math.check_password("a-secret")
+    assert manager.get("math") is math
+    assert manager.get("unknown") is None
+
+def test_cohort_ids_are_validated(manager):
+    """Test that IDs unsafe for URLs or file names are rejected."""
+    for bad in ["", "../etc", "a b", "x" * 65]:
+        with pytest.raises(ValueError):
+            manager.get(bad)
+    manager.create("ok_id-1", "pw")
+    with pytest.raises(ValueError):
+        manager.create("ok_id-1", "pw")
+
+def test_cohort_submissions_go_through_queue(manager):
+    """Test batched submissions and the single-response rule per cohort."""
+    cohort = manager.create("math", "pw")
+    cohort.add_names(["Alice", "Bob"])
+    cohort.queue.submit("Alice", SkillLevel.EXPERT)
+    assert cohort.pending_names() == ["Bob"]
+    with pytest.raises(ValueError):
+        cohort.queue.submit("Alice", SkillLevel.NOVICE)
+    with pytest.raises(KeyError):
+        cohort.queue.submit("Nobody", SkillLevel.NOVICE)
+
+    assert cohort.queue.flush(timeout=5)
+    assert cohort.roster.get("Alice").skill_level == SkillLevel.EXPERT
+    assert cohort.roster.responded_count == 1
+
+def test_cohort_is_reloaded_after_eviction(manager):
+    """Test that idle cohorts are unloaded and come back from disk intact."""
+    cohort = manager.create("math", "pw", group_size=4)
+    cohort.add_names(["Alice", "Bob"])
+    cohort.queue.submit("Alice", SkillLevel.ADVANCED)
+    cohort.set_group_size(6)
+    cohort.set_constraints(GroupingConstraints(together=[("Alice", "Bob")]))
+
+    assert manager.evict_idle(now=time.monotonic() + 30) == []
+    assert manager.evict_idle(now=time.monotonic() + 120) == ["math"]
+    assert manager.loaded_ids() == []
+
+    reloaded = manager.get("math")
+    assert reloaded is not cohort
+    assert reloaded.roster.names == ["Alice", "Bob"]
+    assert reloaded.roster.get("Alice").skill_level == SkillLevel.ADVANCED
+    assert reloaded.group_size == 6
+    assert reloaded.constraints.together == [("Alice", "Bob")]
+    assert reloaded.check_password("pw")
+
+def test_busy_cohort_is_not_evicted(manager):
+    """Test that a cohort whose lock is held survives an eviction sweep."""
+    cohort = manager.create("math", "pw")
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with cohort.lock:
+            held.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=hold_lock)
+    worker.start()
+    try:
+        held.wait(5)
+        assert manager.evict_idle(now=time.monotonic() + 120) == []
+        assert manager.loaded_ids() == ["math"]
+    finally:
+        release.set()
+        worker.join()
+
+def test_locked_cohort_does_not_block_others(manager):
+    """Test that work on one cohort proceeds while another is locked."""
+    busy = manager.create("busy", "pw")
+    other = manager.create("other", "pw")
+    with busy.lock:
+        finished = threading.Event()
+
+        def add_students():
+            other.add_names(["Alice"])
+            other.queue.submit("Alice", SkillLevel.NOVICE)
+            other.queue.flush(timeout=5)
+            finished.set()
+
+        threading.Thread(target=add_students).start()
+        assert finished.wait(5)
+    assert other.roster.all_responded
+
+def test_clear_resets_roster_groups_and_queue(manager):
+    """Test that a cleared cohort accepts the same students again."""
+    cohort = manager.create("math", "pw")
+    cohort.add_names(["Alice"])
+    cohort.queue.submit("Alice", SkillLevel.NOVICE)
+    cohort.queue.flush(timeout=5)
+    cohort.set_groups([Group()])
+
+    cohort.clear()
+    assert not cohort.roster
+    assert cohort.groups == []
+    cohort.add_names(["Alice"])
+    cohort.queue.submit("Alice", SkillLevel.EXPERT)
+    assert cohort.queue.flush(timeout=5)
+    assert cohort.roster.get("Alice").skill_level == SkillLevel.EXPERT
+
+def test_clear_with_a_queued_response(manager):
+    """Test that clearing while a response is still queued neither deadlocks nor keeps the claim."""
+    cohort = manager.create("math", "pw")
+    cohort.add_names(["Alice"])
+    cohort.queue.flush_interval = 60  # Hold the response in the queue
+    cohort.queue.submit("Alice", SkillLevel.NOVICE)
+    assert cohort.queue.pending_count == 1
+
+    clearing = threading.Thread(target=cohort.clear, daemon=True)
+    clearing.start()
+    clearing.join(timeout=10)
+    assert not clearing.is_alive()
+    assert not cohort.roster
+    cohort.add_names(["Alice"])
+    assert cohort.pending_names() == ["Alice"]
+
+def test_failed_store_write_leaves_roster_unchanged(manager, monkeypatch):
+    """Test that a response or student the store could not write is not kept in memory either."""
+    cohort = manager.create("math", "pw")
+    cohort.add_names(["Alice"])
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(cohort.store, "submit_responses", locked)
+        patch.setattr(cohort.store, "extend", locked)
+        with pytest.raises(sqlite3.OperationalError):
+            cohort.submit_responses([("Alice", SkillLevel.EXPERT)])
+        with pytest.raises(sqlite3.OperationalError):
+            cohort.add_names(["Bob"])
+    assert not cohort.roster.get("Alice").has_responded
+    assert cohort.roster.names == ["Alice"]
+
+    assert cohort.submit_responses([("Alice", SkillLevel.EXPERT), ("Alice", SkillLevel.NOVICE)]) == ["Alice"]
+    assert cohort.roster.get("Alice").skill_level == SkillLevel.EXPERT
+    assert cohort.store.response_status() == (1, 1)
+
+def test_in_memory_cohorts_are_kept():
+    """Test that cohorts without a data directory are never evicted."""
+    manager = CohortManager(idle_timeout=0)
+    try:
+        manager.create("math", "pw").add_names(["Alice"])
+        assert manager.evict_idle() == []
+        assert manager.get("math").roster.names == ["Alice"]
+    finally:
+        manager.close()
+
+def test_cohort_reuses_grouping_plan(manager):
+    """Test that repeated group formation reuses the plan until the roster changes."""
+    cohort = manager.create("math", "pw")
+    cohort.add_names(["Alice", "Bob"])
+    with pytest.raises(ValueError):
+        cohort.grouping_plan(2)
+    for name in ["Alice", "Bob"]:
+        cohort.queue.submit(name, SkillLevel.NOVICE)
+    cohort.queue.flush(timeout=5)
+
+    plan = cohort.grouping_plan(2)
+    assert cohort.grouping_plan(2) is plan
+    assert cohort.grouping_plan(3) is not plan
+    cohort.add_names(["Carol"])
+    with pytest.raises(ValueError):
+        cohort.grouping_plan(3)
+
+def test_cohort_late_arrivals_and_dropouts(manager):
+    """Test incremental changes to a cohort's grouping."""
+    cohort = manager.create("math", "pw", group_size=2)
+    cohort.add_names(["Alice", "Bob", "Carol", "Dan"])
+    for name, level in zip(cohort.roster.names, SkillLevel):
+        cohort.queue.submit(name, level)
+    cohort.queue.flush()
+    cohort.set_groups(cohort.grouping_plan(2).reshuffle(0))
+
+    with pytest.raises(ValueError):
+        cohort.assign_late_arrival("Alice")
+    cohort.add_names(["Eve"])
+    with pytest.raises(ValueError):
+        cohort.assign_late_arrival("Eve")  # No skill level yet
+    cohort.queue.submit("Eve", SkillLevel.EXPERT)
+    cohort.queue.flush()
+    version = cohort.grouping_version
+    group = cohort.assign_late_arrival("Eve")
+    assert cohort.group_of("Eve") is group
+    assert cohort.grouping_version == version + 1
+
+    cohort.remove_from_groups("Eve")
+    assert cohort.group_of("Eve") is None
+    for group in cohort.groups:
+        assert group.skill_sum == sum(m.skill_level.value for m in group.members)
+    with pytest.raises(KeyError):
+        cohort.remove_from_groups("Eve")
+
+def test_cohort_round_history_is_saved(manager, tmp_path):
+    """Test that recorded rounds survive a reload and are dropped by clear."""
+    cohort = manager.create("math", "pw", group_size=2)
+    cohort.add_names(["Alice", "Bob", "Carol", "Dan"])
+    for name, level in zip(cohort.roster.names, SkillLevel):
+        cohort.queue.submit(name, level)
+    cohort.queue.flush()
+    cohort.set_groups(cohort.grouping_plan(2).reshuffle(0))
+    assert cohort.record_round() == 1
+    assert cohort.record_round() == 1
+
+    manager.close()
+    reloaded = CohortManager(str(tmp_path), idle_timeout=60)
+    history = reloaded.get("math").history
+    assert history.rounds == 1
+    assert len(history) == 2
+    reloaded.get("math").clear()
+    assert reloaded.get("math").history.rounds == 0
+    reloaded.close()
+
+def test_cohort_grouping_survives_reload(manager, tmp_path):
+    """Test that the grouping is restored from the snapshot when a cohort is reloaded."""
+    cohort = manager.create("math", "pw", group_size=2)
+    cohort.add_names(["Alice", "Bob", "Carol", "Dan"])
+    for name, level in zip(cohort.roster.names, SkillLevel):
+        cohort.queue.submit(name, level)
+    cohort.queue.flush()
+    cohort.set_groups(cohort.grouping_plan(2).reshuffle(0))
+    saved = [(g.name, [m.name for m in g.members]) for g in cohort.groups]
+
+    manager.close()
+    reloaded = CohortManager(str(tmp_path), idle_timeout=60)
+    groups = reloaded.get("math").groups
+    assert [(g.name, [m.name for m in g.members]) for g in groups] == saved
+    assert groups[0].members[0] is reloaded.get("math").get(groups[0].members[0].name)
+    reloaded.close()
+
+def test_cohort_restore_snapshot(manager):
+    """Test that restoring a snapshot replaces the roster and grouping."""
+    source = manager.create("math", "pw", group_size=2)
+    source.extend(Student(name=f"S{i}", skill_level=level, has_responded=True) for i, level in enumerate(SkillLevel))
+    source.set_groups(source.grouping_plan(2).reshuffle(0))
+    target = manager.create("art", "pw")
+    target.add_names(["Zed"])
+
+    with Snapshot.from_bytes(encode_snapshot(source.roster, source.groups)) as snapshot:
+        target.restore_snapshot(snapshot)
+    assert target.roster.names == source.roster.names
+    assert [g.name for g in target.groups] == [g.name for g in source.groups]
+    assert target.store.response_status() == (4, 4)
+
+def test_cohort_snapshot_bytes(manager):
+    """Test that the downloadable snapshot holds the roster and grouping as they were."""
+    cohort = manager.create("math", "pw", group_size=2)
+    cohort.extend(Student(name=f"S{i}", skill_level=level, has_responded=True) for i, level in enumerate(SkillLevel))
+    cohort.set_groups(cohort.grouping_plan(2).reshuffle(0))
+    cohort.add_names(["Late"])
+
+    with Snapshot.from_bytes(cohort.snapshot_bytes()) as snapshot:
+        assert snapshot.to_roster().names == cohort.roster.names
+        assert [g.name for g in snapshot.groups()] == [g.name for g in cohort.groups]
+
+def test_cohort_keeps_roster_when_restore_fails(manager):
+    """Test that a damaged snapshot leaves the roster and queue as they were."""
+    cohort = manager.create("math", "pw")
+    cohort.add_names(["Alice", "Bob"])
+    cohort.queue.submit("Alice", SkillLevel.NOVICE)
+    data = encode_snapshot([Student(name="Zed")])
+    bad = data[:-1] + b"\xff"  # The last byte of Zed's name is no longer UTF-8
+
+    with pytest.raises(SnapshotError):
+        with Snapshot.from_bytes(bad) as snapshot:
+            cohort.restore_snapshot(snapshot)
+    assert cohort.roster.names == ["Alice", "Bob"]
+    assert cohort.queue.flush(timeout=5)
+    assert cohort.roster.get("Alice").has_responded
@@ -0,0 +1,96 @@
+import io
+import random
+import pytest
+from src.models.student import Student
+from src.services.constraints import (
+    ConstraintError,
+    GroupingConstraints,
+    create_constrained_groups,
+    parse_pairs,
+    read_constraints
+)
+from src.services.group_service import GroupService
+from src.utils.constants import SkillLevel
+
+def make_students(count, seed=0):
+    """Helper creating responded students with random skill levels."""
+    rng = random.Random(seed)
+    return [
+        Student(name=f"Student {i}", skill_level=rng.choice(list(SkillLevel)), has_responded=True)
+        for i in range(count)
+    ]
+
+def group_of(groups):
+    """Map each member's name to the index of their group."""
+    return {member.name: idx for idx, group in enumerate(groups) for member in group.members}
+
+def test_constraints_are_honored_with_balanced_groups():
+    """Test that every pair is honored while sizes and skill levels stay balanced."""
+    students = make_students(2_000)
+    rng = random.Random(1)
+    constraints = GroupingConstraints()
+    for pair in rng.sample(range(1_000), 400):
+        constraints.add("together", f"Student {2 * pair}", f"Student {2 * pair + 1}")
+    while len(constraints.apart) < 400:
+        first, second = rng.sample(range(2_000), 2)
+        if first // 2 != second // 2:
+            constraints.add("apart", f"Student {first}", f"Student {second}")
+
+    groups = GroupService.create_constrained_groups(students, 5, constraints, seed=3)
+    placed = group_of(groups)
+    assert len(placed) == 2_000
+    assert all(placed[a] == placed[b] for a, b in constraints.together)
+    assert all(placed[a] != placed[b] for a, b in constraints.apart)
+    assert {group.size for group in groups} == {5}
+    for level in SkillLevel:
+        counts = [group.level_counts[level] for group in groups]
+        assert max(counts) - min(counts) <= 2
+
+def test_together_chains_form_one_cluster():
+    """Test that chained keep-together pairs land in a single group."""
+    students = make_students(12)
+    constraints = GroupingConstraints(together=[("Student 0", "Student 5"), ("Student 5", "Student 9")])
+    placed = group_of(create_constrained_groups(students, 4, constraints, seed=0))
+    assert placed["Student 0"] == placed["Student 5"] == placed["Student 9"]
+
+def test_seeded_constrained_groups_are_reproducible():
+    """Test that the same seed gives the same groups."""
+    students = make_students(30)
+    constraints = GroupingConstraints(apart=[("Student 1", "Student 2")])
+    first = create_constrained_groups(students, 3, constraints, seed=9)
+    second = create_constrained_groups(students, 3, constraints, seed=9)
+    assert [[m.name for m in g.members] for g in first] == [[m.name for m in g.members] for g in second]
+
+@pytest.mark.parametrize("constraints, message", [
+    (GroupingConstraints(together=[("Student 0", "Nobody")]), "not on the roster"),
+    (GroupingConstraints(together=[("Student 0", "Student 1")], apart=[("Student 1", "Student 0")]),
+     "both together and apart"),
+    (GroupingConstraints(together=[("Student 0", "Student 1"), ("Student 1", "Student 2")]),
+     "must be kept together"),
+])
+def test_infeasible_constraints_raise(constraints, message):
+    """Test the errors for unknown names, contradictions and oversized clusters."""
+    with pytest.raises(ConstraintError, match=message):
+        create_constrained_groups(make_students(4), 2, constraints)
+
+def test_too_many_apart_pairs_raise():
+    """Test that more mutually apart students than groups cannot be placed."""
+    names = [f"Student {i}" for i in range(3)]
+    constraints = GroupingConstraints(apart=[(a, b) for a in names for b in names if a < b])
+    with pytest.raises(ConstraintError, match="Cannot place"):
+        create_constrained_groups(make_students(4), 2, constraints)
+    # ConstraintError is a ValueError, so existing error handling catches it
+    assert issubclass(ConstraintError, ValueError)
+
+def test_parse_and_read_constraints():
+    """Test reading pairs from typed lines and from a CSV file."""
+    assert parse_pairs("Alice, Bob\n\n Carol ,Dan \n") == [("Alice", "Bob"), ("Carol", "Dan")]
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_pairs("Alice, Bob, Carol")
+
+    constraints = read_constraints(io.StringIO("rule,first,second\ntogether,Alice,Bob\nApart,Alice,Carol\n"))
+    assert constraints.together == [("Alice", "Bob")]
+    assert constraints.apart == [("Alice", "Carol")]
+    assert GroupingConstraints.from_dict(constraints.to_dict()) == constraints
+    with pytest.raises(ValueError, match="Line 2"):
+        read_constraints(io.StringIO("together,Alice,Bob\nsometimes,Alice,Bob\n"))
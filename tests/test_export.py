@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import tracemalloc
+import pytest
+from src.models.group import Group
+from src.models.student import Student
+from src.services.export import (
+    CSV_HEADER,
+    ZOOM_HEADER,
+    export_bytes,
+    export_groups,
+    export_to_file,
+    iter_member_rows
+)
+from src.utils.constants import SkillLevel
+
+def make_groups():
+    """Two small groups, one member without an email address."""
+    return [
+        Group([
+            Student(name="Alice", email="alice@example.org", skill_level=SkillLevel.EXPERT, has_responded=True),
+            Student(name="Bob", skill_level=SkillLevel.NOVICE, has_responded=True),
+        ]),
+        Group([
+            Student(name="Carol", email="carol@example.org", skill_level=SkillLevel.ADVANCED, has_responded=True),
+        ]),
+    ]
+
+def test_csv_export():
+    """Test one row per member with room numbers from 1."""
+    groups = make_groups()
+    out = io.StringIO(newline="")
+    stats = export_groups(groups, out, "csv")
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == CSV_HEADER
+    assert rows[1] == ["1", groups[0].name, "Alice", "alice@example.org", "4"]
+    assert rows[2] == ["1", groups[0].name, "Bob", "", "1"]
+    assert rows[3][0] == "2"
+    assert (stats.groups, stats.members, stats.skipped) == (2, 3, 0)
+
+def test_jsonl_export():
+    """Test one JSON object per group, with its members."""
+    lines = export_bytes(make_groups(), "jsonl").decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["room"] for r in records] == [1, 2]
+    assert records[0]["members"][1] == {"name": "Bob", "email": None, "skill_level": 1}
+    assert records[0]["average_skill_level"] == 2.5
+
+def test_zoom_export(tmp_path):
+    """Test Zoom's pre-assignment layout; members without email are skipped."""
+    path = str(tmp_path / "zoom.csv")
+    stats = export_to_file(make_groups(), path, "zoom")
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ZOOM_HEADER,
+        ["Breakout Room 1", "alice@example.org"],
+        ["Breakout Room 2", "carol@example.org"],
+    ]
+    assert (stats.members, stats.skipped) == (2, 1)
+
+def test_unknown_format():
+    """Test that an unknown format is rejected."""
+    with pytest.raises(ValueError):
+        export_groups(make_groups(), io.StringIO(), "xml")
+
+def test_export_streams_lazy_groupings(tmp_path):
+    """Test that exporting a lazily produced grouping does not hold it in memory."""
+    def lazy_groups(count):
+        for idx in range(count):
+            yield Group([
+                Student(name=f"S{idx}-{m}", email=f"s{idx}-{m}@example.org",
+                        skill_level=SkillLevel.NOVICE, has_responded=True)
+                for m in range(5)
+            ])
+
+    def peak_bytes(count):
+        tracemalloc.start()
+        try:
+            export_to_file(lazy_groups(count), str(tmp_path / "groups.csv"), "csv")
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak_bytes(100), peak_bytes(5_000)
+    assert large < small * 2
+
+def test_iter_member_rows():
+    """Test the flat (room, group, member) generator."""
+    rows = list(iter_member_rows(iter(make_groups())))
+    assert [(room, member.name) for room, _, member in rows] == [(1, "Alice"), (1, "Bob"), (2, "Carol")]
@@ -0,0 +1,57 @@
+from src.models.group import Group
+from src.models.roster import Roster
+from src.models.student import Student
+from src.services.frame_cache import FrameCache, roster_frame
+from src.utils.constants import SkillLevel
+
+def test_roster_version_and_changes():
+    """Test that the roster logs changed names and flags unreplayable changes."""
+    roster = Roster([Student(name="Alice"), Student(name="Bob")])
+    version = roster.version
+    assert roster.changes_since(version) == []
+
+    roster.get("Bob").submit_response(SkillLevel.NOVICE)
+    roster.add(Student(name="Carol"))
+    assert roster.changes_since(version) == ["Bob", "Carol"]
+
+    version = roster.version
+    roster.remove("Alice")
+    assert roster.version > version
+    assert roster.changes_since(version) is None
+
+def test_frame_cache_reuses_and_patches_roster_frame():
+    """Test that unchanged rosters hit the cache and small changes are patched."""
+    roster = Roster(Student(name=f"Student {i}") for i in range(100))
+    cache = FrameCache()
+
+    first = cache.roster_frame(roster)
+    assert cache.roster_frame(roster) is first
+    assert (cache.rebuilds, cache.hits) == (1, 1)
+
+    roster.get("Student 5").submit_response(SkillLevel.EXPERT)
+    roster.add(Student(name="Late Student"))
+    patched = cache.roster_frame(roster)
+    assert cache.patches == 1
+    assert patched.reset_index(drop=True).equals(roster_frame(roster).reset_index(drop=True))
+    assert patched.loc["Student 5", "Status"] == "✅"
+
+    roster.remove("Student 0")
+    rebuilt = cache.roster_frame(roster)
+    assert cache.rebuilds == 2
+    assert len(rebuilt) == 100
+
+def test_frame_cache_groups_table_and_eviction():
+    """Test grouping-version keys and the bounded size of the cache."""
+    cache = FrameCache(max_entries=2)
+    groups = [Group(members=[Student(name="A", skill_level=SkillLevel.NOVICE, has_responded=True)])]
+    table = cache.groups_table("math", groups, grouping_version=1)
+    assert cache.groups_table("math", groups, grouping_version=1) is table
+    assert cache.groups_table("math", groups, grouping_version=2) is not table
+    # Another cohort at the same grouping version gets its own table
+    other = [Group(members=[Student(name="B", skill_level=SkillLevel.EXPERT, has_responded=True)])]
+    assert cache.groups_table("art", other, grouping_version=2) is not cache.groups_table("math", groups, 2)
+
+    rosters = [Roster([Student(name=f"S{i}")]) for i in range(5)]
+    for roster in rosters:
+        cache.roster_frame(roster)
+    assert len(cache) == 2
@@ -0,0 +1,100 @@
+import pytest
+from src.models.student import Student
+from src.services.group_maintenance import GroupMaintainer
+from src.services.group_service import GroupService
+from src.utils.constants import SkillLevel
+
+LEVELS = list(SkillLevel)
+
+def make_groups(count=40, group_size=4):
+    """Helper forming seeded groups from students with cycling skill levels."""
+    students = [
+        Student(name=f"Student {i}", skill_level=LEVELS[i % 4], has_responded=True)
+        for i in range(count)
+    ]
+    return GroupService.create_stratified_groups(students, group_size, seed=1)
+
+def snapshot(groups):
+    """Member names of every group, to compare before and after an operation."""
+    return [[m.name for m in g.members] for g in groups]
+
+def test_late_arrival_touches_one_group():
+    """Test that a late student joins one smallest group and nothing else moves."""
+    groups = make_groups(38)
+    before = snapshot(groups)
+    maintainer = GroupMaintainer(groups)
+
+    late = Student(name="Late", skill_level=SkillLevel.NOVICE, has_responded=True)
+    joined = maintainer.assign_late_arrival(late)
+    after = snapshot(groups)
+    changed = [idx for idx, (old, new) in enumerate(zip(before, after)) if old != new]
+    assert len(changed) == 1
+    assert groups[changed[0]] is joined
+    assert len(before[changed[0]]) == 3
+    # A novice goes to the strongest of the smallest groups
+    smallest = [g for g in groups if len(g.members) == 3]
+    assert all(joined.skill_sum - 1 >= g.skill_sum for g in smallest)
+    assert maintainer.group_of("Late") is joined
+
+    with pytest.raises(ValueError):
+        maintainer.assign_late_arrival(late)
+
+def test_late_arrivals_keep_sizes_even_and_open_new_groups():
+    """Test that sizes stay within one, and a full grouping gets a new group."""
+    groups = make_groups(40)
+    maintainer = GroupMaintainer(groups, group_size=4)
+    for i in range(6):
+        maintainer.assign_late_arrival(Student(name=f"Late {i}", skill_level=LEVELS[i % 4], has_responded=True))
+    assert [g.size for g in groups[10:]] == [4, 2]
+
+    maintainer = GroupMaintainer(make_groups(40))
+    for i in range(15):
+        maintainer.assign_late_arrival(Student(name=f"Late {i}", skill_level=SkillLevel.EXPERT, has_responded=True))
+    sizes = [g.size for g in maintainer.groups]
+    assert max(sizes) - min(sizes) <= 1
+
+def test_late_arrival_must_have_responded():
+    """Test that a student without a skill level is refused, so group totals stay exact."""
+    groups = make_groups(40)
+    maintainer = GroupMaintainer(groups)
+    with pytest.raises(ValueError):
+        maintainer.assign_late_arrival(Student(name="Late"))
+    assert maintainer.group_of("Late") is None
+    assert sum(g.size for g in groups) == 40
+
+def test_remove_member_rebalances_minimally():
+    """Test that a dropout only moves one member, of the nearest level, when needed."""
+    groups = make_groups(42)
+    maintainer = GroupMaintainer(groups)
+    small = next(g for g in groups if g.size == 4)
+    name = small.members[0].name
+
+    touched = maintainer.remove_member(name)
+    assert touched == [small]
+    assert maintainer.group_of(name) is None
+
+    before = snapshot(groups)
+    level = small.members[0].skill_level
+    touched = maintainer.remove_member(small.members[0].name)
+    assert len(touched) == 2 and touched[0] is small
+    after = snapshot(groups)
+    assert sum(old != new for old, new in zip(before, after)) == 2
+    assert small.size == 3
+    moved = small.members[-1]
+    assert moved.skill_level == level
+    sizes = [g.size for g in groups]
+    assert max(sizes) - min(sizes) <= 1
+
+    with pytest.raises(KeyError):
+        maintainer.remove_member("Nobody")
+
+def test_many_operations_stay_consistent():
+    """Test that heaps stay correct through many arrivals and dropouts."""
+    maintainer = GroupMaintainer(make_groups(400, 5))
+    for i in range(300):
+        maintainer.assign_late_arrival(Student(name=f"Late {i}", skill_level=LEVELS[i % 4], has_responded=True))
+        maintainer.remove_member(f"Student {i}")
+    sizes = [g.size for g in maintainer.groups]
+    assert sum(sizes) == 400
+    assert max(sizes) - min(sizes) <= 1
+    assert len(maintainer._weakest) <= 2 * len(maintainer.groups) + 16
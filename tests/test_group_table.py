@@ -0,0 +1,52 @@
+import numpy as np
+from src.models.group import Group
+from src.models.student import Student
+from src.services.group_table import GroupsTable, page_count, page_of, page_slice, skill_label
+from src.utils.constants import SkillLevel
+
+def create_test_groups():
+    """Helper function to create three small groups."""
+    groups = []
+    for room in range(3):
+        group = Group()
+        for i in range(room + 1):
+            group.add_member(Student(
+                name=f"Room{room + 1} Member{i}",
+                skill_level=SkillLevel.ADVANCED,
+                has_responded=True
+            ))
+        groups.append(group)
+    return groups
+
+def test_groups_table_layout():
+    """Test that all groups are flattened into one members table and one rooms table."""
+    groups = create_test_groups()
+    table = GroupsTable.from_groups(groups)
+
+    assert table.room_count == 3
+    assert list(table.members.columns) == ["Room", "Name", "Skill Level"]
+    assert table.members["Room"].tolist() == [1, 2, 2, 3, 3, 3]
+    assert table.members["Skill Level"].iloc[0] == skill_label(SkillLevel.ADVANCED)
+    assert table.rooms["Team"].tolist() == [g.name for g in groups]
+    assert table.room(2)["Size"] == 2
+
+def test_groups_table_slicing_and_search():
+    """Test slicing visible rooms and searching by member name."""
+    table = GroupsTable.from_groups(create_test_groups())
+    rows = table.member_rows([3, 1])
+    assert rows["Name"].tolist() == [
+        "Room3 Member0", "Room3 Member1", "Room3 Member2", "Room1 Member0"
+    ]
+    assert table.matching_rooms("member2").tolist() == [3]
+    assert table.matching_rooms("").tolist() == [1, 2, 3]
+    assert len(table.member_rows([])) == 0
+
+def test_paging_helpers():
+    """Test page counting, slicing and jump-to lookups."""
+    rooms = np.arange(1, 26)
+    assert page_count(25, 12) == 3
+    assert page_count(0, 12) == 1
+    assert page_slice(rooms, 3, 12).tolist() == [25]
+    assert page_slice(rooms, 99, 12).tolist() == [25]
+    assert page_of(rooms, 13, 12) == 2
+    assert page_of(rooms, 99, 12) is None
@@ -0,0 +1,43 @@
+import json
+import pytest
+from benchmarks.load_test import LevelResult, find_saturation, main, run_load_test
+
+# Outside a server, Streamlit's resource cache creates a cleanup coroutine it never awaits
+pytestmark = [
+    pytest.mark.filterwarnings("ignore:coroutine 'expire_cache' was never awaited:RuntimeWarning"),
+    pytest.mark.filterwarnings("ignore::pytest.PytestUnraisableExceptionWarning"),
+]
+
+def level(sessions, seconds, submit_p95=0.1):
+    """Helper creating a level where every session submitted."""
+    return LevelResult(
+        sessions=sessions, submitted=sessions, stored=sessions, misattributed=0, errors=0,
+        seconds=seconds, submit_p50=submit_p95, submit_p95=submit_p95, submit_p99=submit_p95,
+        rerun_p50=0.01, rerun_p95=0.01, admin_rerun_p50=0.01, memory_per_session=1024
+    )
+
+def test_concurrent_students_each_submit_once_for_themselves():
+    """Test that concurrent student sessions store exactly their own responses."""
+    results = run_load_test([1, 4], timeout=30)
+    assert [r.sessions for r in results] == [1, 4]
+    for result in results:
+        assert result.errors == 0
+        assert result.submitted == result.stored == result.sessions
+        assert result.misattributed == 0
+        assert result.submit_p50 <= result.submit_p95 <= result.submit_p99
+        assert result.memory_per_session > 0
+
+def test_find_saturation():
+    """Test that saturation is where throughput stops growing or p95 latency goes over budget."""
+    growing = [level(1, 1.0), level(2, 1.0), level(4, 1.0)]
+    assert find_saturation(growing) is None
+    assert find_saturation(growing + [level(8, 2.0)]) == 8
+    assert find_saturation([level(1, 1.0), level(2, 0.5, submit_p95=1.5)], latency_budget=1.0) == 2
+
+def test_cli_reports_saturation(tmp_path, capsys):
+    """Test that the command line prints each level and writes JSON results."""
+    output = tmp_path / "load.json"
+    assert main(["--levels", "1,2", "--output", str(output)]) == 0
+    assert "saturat" in capsys.readouterr().out.lower()
+    document = json.loads(output.read_text())
+    assert [r["sessions"] for r in document["results"]] == [1, 2]
@@ -0,0 +1,77 @@
+import json
+from src.models.roster import Roster
+from src.services.group_service import GroupService
+from src.utils.metrics import METRICS, Metrics
+
+def test_disabled_metrics_record_nothing():
+    """Test that a disabled registry hands out a shared no-op timer and keeps no data."""
+    metrics = Metrics()
+    assert metrics.timer("a") is metrics.timer("b")
+    with metrics.timer("a"):
+        pass
+    metrics.increment("count")
+    metrics.record("a", 1.0)
+    snapshot = metrics.snapshot()
+    assert snapshot["phases"] == {} and snapshot["counters"] == {}
+
+def test_percentiles_and_counters():
+    """Test counts, totals and nearest-rank percentiles per phase."""
+    metrics = Metrics(enabled=True)
+    for ms in range(1, 101):
+        metrics.record("phase", ms / 1000)
+    metrics.increment("events", 3)
+    snapshot = metrics.snapshot()
+    phase = snapshot["phases"]["phase"]
+    assert phase["count"] == 100
+    assert phase["p50_ms"] == 50
+    assert phase["p95_ms"] == 95
+    assert phase["p99_ms"] == 99
+    assert phase["max_ms"] == 100
+    assert snapshot["counters"] == {"events": 3}
+    json.dumps(snapshot)
+
+    metrics.reset()
+    assert metrics.snapshot()["phases"] == {}
+
+def test_percentiles_use_recent_samples():
+    """Test that percentiles come from a bounded window while counts stay exact."""
+    metrics = Metrics(enabled=True, sample_size=10)
+    for _ in range(50):
+        metrics.record("phase", 1.0)
+    for _ in range(10):
+        metrics.record("phase", 0.001)
+    phase = metrics.snapshot()["phases"]["phase"]
+    assert phase["count"] == 60
+    assert phase["p99_ms"] == 1
+    assert phase["max_ms"] == 1000
+
+def test_timed_decorator_records_calls_and_errors():
+    """Test that decorated functions are timed even when they raise."""
+    metrics = Metrics(enabled=True)
+
+    @metrics.timed("work")
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 42
+
+    assert work() == 42
+    try:
+        work(fail=True)
+    except ValueError:
+        pass
+    assert metrics.snapshot()["phases"]["work"]["count"] == 2
+
+def test_services_are_instrumented():
+    """Test that grouping and roster mutations show up in the shared registry."""
+    METRICS.reset()
+    METRICS.enabled = True
+    try:
+        roster = Roster()
+        roster.add_names(["Alice", "Bob"])
+        GroupService.get_response_status(roster)
+        phases = METRICS.snapshot()["phases"]
+    finally:
+        METRICS.enabled = False
+        METRICS.reset()
+    assert {"roster.add_names", "roster.extend", "group_service.get_response_status"} <= set(phases)
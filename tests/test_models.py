@@ -1,6 +1,9 @@
+import random
+import sys
 import pytest
 from src.models.student import Student
 from src.models.group import Group
+from src.models.roster import Roster
 from src.utils.constants import SkillLevel
 
 def test_student_creation():
@@ -52,6 +55,15 @@ def test_group_creation():
     assert isinstance(group.name, str)
     assert len(group.name.split()) == 2  # Should be "Adjective Animal"
 
+def test_group_with_a_given_name():
+    """Test that a named group keeps its name without drawing from the random generator."""
+    random.seed(4)
+    expected = random.random()
+    random.seed(4)
+    group = Group(name="Saved Otters")
+    assert group.name == "Saved Otters"
+    assert random.random() == expected
+
 def test_group_member_management():
     """Test adding members to a group."""
     group = Group()
@@ -97,4 +109,99 @@ def test_group_skill_emoji():
     for student in students:
         group.add_member(student)
     
-    assert group.skill_emoji == "🏁"  # Should show expert emoji for high average 
\ No newline at end of file
+    assert group.skill_emoji == "🏁"  # Should show expert emoji for high average 
+
+def test_roster_add_and_dedupe():
+    """Test that the roster rejects duplicate names and keeps insertion order."""
+    roster = Roster()
+    assert roster.add(Student(name="Alice"))
+    assert roster.add(Student(name="Bob"))
+    assert not roster.add(Student(name="Alice"))
+
+    assert len(roster) == 2
+    assert roster.names == ["Alice", "Bob"]
+    assert "Alice" in roster
+    assert roster.get("Bob").name == "Bob"
+    assert roster.get("Carol") is None
+
+def test_roster_bulk_add_names():
+    """Test bulk adding names, including duplicates within the batch."""
+    roster = Roster([Student(name="Alice")])
+    added = roster.add_names(["Bob", "Alice", "Carol", "Bob"])
+    assert added == 2
+    assert roster.names == ["Alice", "Bob", "Carol"]
+
+    roster.add_names(f"Student {i}" for i in range(50_000))
+    assert len(roster) == 50_003
+
+def test_roster_remove_and_clear():
+    """Test removing students from the roster."""
+    roster = Roster([Student(name="Alice"), Student(name="Bob")])
+    removed = roster.remove("Alice")
+    assert removed.name == "Alice"
+    assert "Alice" not in roster
+    with pytest.raises(KeyError):
+        roster.remove("Alice")
+
+    roster.clear()
+    assert not roster
+
+def test_roster_response_counters():
+    """Test that the roster's counters follow adds, responses and removals."""
+    roster = Roster([
+        Student(name="Alice"),
+        Student(name="Bob", skill_level=SkillLevel.EXPERT, has_responded=True),
+    ])
+    assert roster.responded_count == 1
+    assert roster.pending_count == 1
+    assert not roster.all_responded
+
+    roster.get("Alice").submit_response(SkillLevel.NOVICE)
+    assert roster.responded_count == 2
+    assert roster.all_responded
+    assert roster.level_counts[SkillLevel.NOVICE] == 1
+    assert roster.level_counts[SkillLevel.EXPERT] == 1
+
+    bob = roster.remove("Bob")
+    assert roster.responded_count == 1
+    assert roster.level_counts[SkillLevel.EXPERT] == 0
+
+    # A removed student no longer updates the roster
+    roster.add(Student(name="Carol"))
+    roster.remove("Carol").submit_response(SkillLevel.ADVANCED)
+    assert roster.level_counts[SkillLevel.ADVANCED] == 0
+    assert bob.has_responded
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+def test_student_is_slotted():
+    """Test that students carry no per-instance __dict__."""
+    student = Student(name="John Doe")
+    assert not hasattr(student, "__dict__")
+    with pytest.raises(AttributeError):
+        student.nickname = "JD"
+
+def test_group_cached_aggregates():
+    """Test that cached aggregates follow adds and removals."""
+    novice = Student(name="Novice", skill_level=SkillLevel.NOVICE, has_responded=True)
+    expert = Student(name="Expert", skill_level=SkillLevel.EXPERT, has_responded=True)
+    group = Group(members=[novice])
+    assert group.skill_sum == 1
+    assert group.size == 1
+
+    group.add_member(expert)
+    assert group.average_skill_level == 2.5
+    assert group.level_counts[SkillLevel.EXPERT] == 1
+
+    group.remove_member(novice)
+    assert group.average_skill_level == 4.0
+    assert group.level_counts[SkillLevel.NOVICE] == 0
+    assert group.skill_emoji == "🏁"
+    with pytest.raises(ValueError):
+        group.remove_member(novice)
+
+    # An unrated member makes the average unknown until removed
+    unrated = Student(name="Unrated")
+    group.add_member(unrated)
+    assert group.average_skill_level == 0.0
+    group.remove_member(unrated)
+    assert group.average_skill_level == 4.0
@@ -0,0 +1,45 @@
+import numpy as np
+from src.models.group import Group
+from src.models.student import Student
+from src.services.array_engine import stratified_assignment
+from src.services.group_service import GroupService
+from src.services.refinement import refine_assignment
+from src.utils.constants import SkillLevel
+
+def test_refinement_reduces_imbalance_and_keeps_sizes():
+    """Test that swaps lower the variance of averages without resizing groups."""
+    levels = np.random.default_rng(4).integers(1, 5, size=5_000).astype(np.uint8)
+    assignment = stratified_assignment(levels, group_size=5, seed=9)
+    result = refine_assignment(levels, assignment.group_indices, assignment.num_groups)
+
+    assert result.converged
+    assert result.swaps > 0
+    assert result.final_score.average_variance < result.initial_score.average_variance
+    assert np.array_equal(
+        np.bincount(result.group_indices, minlength=assignment.num_groups),
+        assignment.group_sizes
+    )
+
+def test_refinement_is_deterministic_and_respects_budget():
+    """Test determinism and the pass budget."""
+    levels = np.random.default_rng(8).integers(1, 5, size=1_000).astype(np.uint8)
+    assignment = stratified_assignment(levels, group_size=4, seed=1)
+    first = refine_assignment(levels, assignment.group_indices, assignment.num_groups)
+    second = refine_assignment(levels, assignment.group_indices, assignment.num_groups)
+    assert np.array_equal(first.group_indices, second.group_indices)
+
+    limited = refine_assignment(levels, assignment.group_indices, assignment.num_groups, max_passes=0)
+    assert limited.passes == 0
+    assert np.array_equal(limited.group_indices, assignment.group_indices)
+
+def test_refine_groups_swaps_members():
+    """Test the service stage on an obviously unbalanced pair of groups."""
+    strong, weak = Group(), Group()
+    for i in range(2):
+        strong.add_member(Student(name=f"Expert {i}", skill_level=SkillLevel.EXPERT, has_responded=True))
+        weak.add_member(Student(name=f"Novice {i}", skill_level=SkillLevel.NOVICE, has_responded=True))
+
+    refined = GroupService.refine_groups([strong, weak])
+    assert [g.name for g in refined] == [strong.name, weak.name]
+    assert [len(g.members) for g in refined] == [2, 2]
+    assert refined[0].average_skill_level == refined[1].average_skill_level == 2.5
@@ -0,0 +1,113 @@
+import threading
+import time
+import pytest
+from src.models.roster import Roster
+from src.models.student import Student
+from src.services.response_queue import ResponseQueue
+from src.services.roster_store import SQLiteRosterStore
+from src.utils.constants import SkillLevel
+
+def test_queue_applies_to_roster():
+    """Test that queued submissions reach the roster and its counters."""
+    roster = Roster([Student(name="Alice"), Student(name="Bob")])
+    queue = ResponseQueue(roster, flush_interval=0.01)
+    try:
+        receipt = queue.submit("Alice", SkillLevel.EXPERT)
+        assert receipt.name == "Alice"
+        assert queue.is_submitted("Alice")
+
+        assert queue.flush(timeout=5)
+        assert roster.get("Alice").skill_level == SkillLevel.EXPERT
+        assert roster.responded_count == 1
+    finally:
+        queue.close()
+
+def test_queue_enforces_single_submission():
+    """Test the 'already submitted' rule for queued and applied responses."""
+    roster = Roster([
+        Student(name="Alice"),
+        Student(name="Bob", skill_level=SkillLevel.NOVICE, has_responded=True),
+    ])
+    queue = ResponseQueue(roster, flush_interval=0.5)
+    try:
+        queue.submit("Alice", SkillLevel.ADVANCED)
+        # Still queued, but a second submission is refused right away
+        with pytest.raises(ValueError):
+            queue.submit("Alice", SkillLevel.NOVICE)
+        with pytest.raises(ValueError):
+            queue.submit("Bob", SkillLevel.EXPERT)
+        with pytest.raises(KeyError):
+            queue.submit("Nobody", SkillLevel.EXPERT)
+    finally:
+        queue.close()
+    assert roster.get("Alice").skill_level == SkillLevel.ADVANCED
+    assert queue.failed == []
+
+def test_queue_burst_load(tmp_path):
+    """Load test: a burst of concurrent submissions into the SQLite store."""
+    store = SQLiteRosterStore(str(tmp_path / "roster.db"))
+    names = [f"Student {i}" for i in range(20_000)]
+    store.add_names(names)
+    queue = ResponseQueue(store)
+    latencies = []
+    lock = threading.Lock()
+
+    def student_session(chunk):
+        local = []
+        for name in chunk:
+            start = time.perf_counter()
+            queue.submit(name, SkillLevel.ADVANCED)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=student_session, args=(names[i::16],)) for i in range(16)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert queue.flush(timeout=60)
+    elapsed = time.perf_counter() - start
+    queue.close()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    assert store.response_status() == (20_000, 20_000)
+    assert queue.failed == []
+    assert queue.batches < len(names) / 10  # submissions were coalesced
+    assert len(names) / elapsed > 1_000  # sustained submissions per second
+    assert p99 < 0.05  # acknowledgement tail latency in seconds
+    store.close()
+
+def test_failed_batch_releases_students():
+    """Test that students whose batch fails to apply can submit again."""
+    roster = Roster([Student(name="Alice"), Student(name="Bob")])
+
+    class FailingTarget:
+        """Roster whose first batch fails, like a store that is briefly locked."""
+        calls = 0
+
+        def get(self, name):
+            return roster.get(name)
+
+        def submit_responses(self, batch):
+            FailingTarget.calls += 1
+            if FailingTarget.calls == 1:
+                raise RuntimeError("database is locked")
+            for name, skill_level in batch:
+                roster.get(name).submit_response(skill_level)
+            return []
+
+    queue = ResponseQueue(FailingTarget(), flush_interval=0.01)
+    try:
+        queue.submit("Alice", SkillLevel.EXPERT)
+        assert queue.flush(timeout=5)
+        assert queue.failed == ["Alice"]
+        assert not queue.is_submitted("Alice")
+
+        queue.submit("Alice", SkillLevel.EXPERT)
+        assert queue.flush(timeout=5)
+        assert roster.get("Alice").skill_level == SkillLevel.EXPERT
+    finally:
+        queue.close()
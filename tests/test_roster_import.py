@@ -0,0 +1,95 @@
+import io
+import tracemalloc
+import pytest
+from src.models.roster import Roster
+from src.models.student import Student
+from src.services.roster_import import detect_format, import_roster, iter_student_chunks
+from src.utils.constants import SkillLevel
+
+def test_detect_format():
+    """Test format detection from file extensions."""
+    assert detect_format("roster.CSV") == "csv"
+    assert detect_format("/tmp/roster.tsv") == "tsv"
+    assert detect_format("names.txt") == "text"
+    assert detect_format("") == "text"
+
+def test_import_csv_with_header(tmp_path):
+    """Test importing a CSV file with email and skill level columns."""
+    path = tmp_path / "roster.csv"
+    path.write_text(
+        "Name,Email,Skill Level\n"
+        "Alice,alice@example.com,4\n"
+        "Bob,,novice\n"
+        "Carol,carol@example.com,\n"
+        "Alice,duplicate@example.com,1\n",
+        encoding="utf-8"
+    )
+    roster = Roster()
+    status = import_roster(roster, path)
+
+    assert (status.rows_read, status.added, status.duplicates) == (4, 3, 1)
+    assert roster.get("Alice").email == "alice@example.com"
+    assert roster.get("Alice").skill_level == SkillLevel.EXPERT
+    assert roster.get("Bob").skill_level == SkillLevel.NOVICE
+    assert not roster.get("Carol").has_responded
+    assert roster.responded_count == 2
+
+def test_import_headerless_tsv_and_text():
+    """Test headerless TSV and plain text uploads given as binary streams."""
+    roster = Roster([Student(name="Alice")])
+    tsv = io.BytesIO("Bob\tbob@example.com\t2\nDan\n".encode("utf-8"))
+    import_roster(roster, tsv, fmt="tsv")
+    assert roster.get("Bob").skill_level == SkillLevel.INTERMEDIATE
+    assert roster.get("Dan").email is None
+
+    text = io.BytesIO(b"\xef\xbb\xbfEve\r\n\r\nAlice\r\nFrank\r\n")
+    updates = []
+    status = import_roster(roster, text, chunk_size=1, progress=lambda s: updates.append(s.rows_read))
+    assert status.added == 2
+    assert updates == [1, 2, 3]
+    assert status.fraction == 1.0
+    assert roster.names == ["Alice", "Bob", "Dan", "Eve", "Frank"]
+
+def test_import_rejects_bad_skill_level():
+    """Test that an unknown skill level reports its line number."""
+    source = io.StringIO("name,skill\nAlice,3\nBob,9\n")
+    with pytest.raises(ValueError, match="Line 3"):
+        import_roster(Roster(), source, fmt="csv")
+
+def test_chunked_parsing_keeps_memory_flat():
+    """Test that parsing holds only one chunk at a time."""
+    lines = (f"Student {i}\n" for i in range(200_000))
+
+    tracemalloc.start()
+    try:
+        chunks = 0
+        for chunk in iter_student_chunks(lines, chunk_size=1_000):
+            assert len(chunk) == 1_000
+            chunks += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert chunks == 200
+    assert peak < 2 * 1024 * 1024
+
+def test_import_attribute_columns_are_shared():
+    """Test that extra columns become attributes shared between equal rows."""
+    csv_text = (
+        "Name,Skill,Timezone,Track\n"
+        "Alice,1,UTC,ml\n"
+        "Bob,2,UTC,ml\n"
+        "Carol,3,UTC+8,\n"
+    )
+    roster = Roster()
+    import_roster(roster, io.StringIO(csv_text), "csv")
+
+    alice, bob, carol = roster.get("Alice"), roster.get("Bob"), roster.get("Carol")
+    assert alice.attributes == {"timezone": "UTC", "track": "ml"}
+    assert alice.attributes is bob.attributes
+    assert carol.attributes == {"timezone": "UTC+8"}
+    # Shared, so no student may change them under the others
+    with pytest.raises(TypeError):
+        alice.attributes["track"] = "web"
+    assert bob.attribute("track") == "ml"
+    assert carol.attribute("track") == ""
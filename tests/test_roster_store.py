@@ -0,0 +1,126 @@
+import threading
+import pytest
+from src.models.student import Student
+from src.services.roster_store import SQLiteRosterStore
+from src.utils.constants import SkillLevel
+
+@pytest.fixture
+def store(tmp_path):
+    """A store backed by a fresh database file."""
+    store = SQLiteRosterStore(str(tmp_path / "roster.db"), batch_size=100)
+    yield store
+    store.close()
+
+def test_store_uses_wal_mode(store):
+    """Test that the database runs in write-ahead logging mode."""
+    mode = store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_store_batched_add_and_load(store):
+    """Test bulk adds across several batches with deduplication."""
+    assert store.add_names(f"Student {i}" for i in range(250)) == 250
+    assert store.add_names(["Student 0", "Newcomer"]) == 1
+    assert store.add(Student(name="Expert", skill_level=SkillLevel.EXPERT, has_responded=True))
+
+    roster = store.load_roster()
+    assert len(roster) == 252
+    assert roster.names[:2] == ["Student 0", "Student 1"]
+    assert roster.responded_count == 1
+    assert store.response_status() == (1, 252)
+
+def test_store_submit_response_once(store):
+    """Test that each student can submit exactly one response."""
+    store.add_names(["Alice"])
+    version = store.version()
+
+    store.submit_response("Alice", SkillLevel.ADVANCED)
+    assert store.get("Alice").skill_level == SkillLevel.ADVANCED
+    assert store.version() > version
+
+    with pytest.raises(ValueError):
+        store.submit_response("Alice", SkillLevel.NOVICE)
+    with pytest.raises(KeyError):
+        store.submit_response("Nobody", SkillLevel.NOVICE)
+    assert store.get("Alice").skill_level == SkillLevel.ADVANCED
+
+def test_store_concurrent_submissions(store):
+    """Test that concurrent sessions never lose a submission."""
+    names = [f"Student {i}" for i in range(400)]
+    store.add_names(names)
+    errors = []
+
+    def submit(chunk):
+        try:
+            for name in chunk:
+                store.submit_response(name, SkillLevel.INTERMEDIATE)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=submit, args=(names[i::8],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert store.response_status() == (400, 400)
+
+def test_store_remove_and_clear(store):
+    """Test removing students from the store."""
+    store.add_names(["Alice", "Bob"])
+    store.remove("Alice")
+    assert store.get("Alice") is None
+    with pytest.raises(KeyError):
+        store.remove("Alice")
+
+    store.clear()
+    assert len(store) == 0
+
+def test_store_attributes_round_trip_and_migration(tmp_path):
+    """Test that attributes are stored, and older databases gain the column."""
+    import sqlite3
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT, "
+        "skill_level INTEGER, has_responded INTEGER NOT NULL DEFAULT 0);"
+        "INSERT INTO students (name) VALUES ('Old');"
+    )
+    conn.close()
+
+    store = SQLiteRosterStore(path)
+    try:
+        store.add(Student(name="New", attributes={"timezone": "UTC"}))
+        roster = store.load_roster()
+        assert roster.get("Old").attributes is None
+        assert roster.get("New").attributes == {"timezone": "UTC"}
+        with pytest.raises(TypeError):
+            roster.get("New").attributes["timezone"] = "CET"
+        assert store.get("New").attributes == {"timezone": "UTC"}
+    finally:
+        store.close()
+
+def test_store_closes_connections_of_finished_threads(store):
+    """Test that each thread's connection is closed when the thread ends, and closed stores refuse use."""
+    store.add_names(["Alice"])
+    workers = [threading.Thread(target=store.get, args=("Alice",)) for _ in range(20)]
+    for worker in workers:
+        worker.start()
+        worker.join()
+    assert len(store._connections) == 1  # Only the main thread's
+
+    store.close()
+    with pytest.raises(ValueError):
+        len(store)
+    errors = []
+
+    def use_store():
+        try:
+            store.get("Alice")
+        except ValueError as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=use_store)
+    worker.start()
+    worker.join()
+    assert len(errors) == 1
@@ -0,0 +1,83 @@
+import random
+from src.models.group import Group
+from src.models.student import Student
+from src.services.group_service import GroupService
+from src.services.round_history import RoundHistory, create_round_groups
+from src.utils.constants import SkillLevel
+
+LEVELS = list(SkillLevel)
+
+def make_students(count):
+    """Helper creating responded students with cycling skill levels."""
+    return [
+        Student(name=f"Student {i}", skill_level=LEVELS[i % 4], has_responded=True)
+        for i in range(count)
+    ]
+
+def make_group(*students):
+    """Helper building one group from students."""
+    group = Group(rng=random.Random(0))
+    for student in students:
+        group.add_member(student)
+    return group
+
+def test_history_counts_pairs():
+    """Test that recorded rounds count each pair of teammates symmetrically."""
+    alice, bob, carol, dan = make_students(4)
+    history = RoundHistory()
+    history.record_round([make_group(alice, bob), make_group(carol, dan)])
+    history.record_round([make_group(alice, bob, carol), make_group(dan)])
+
+    assert history.rounds == 2
+    assert history.pair_count(alice.name, bob.name) == history.pair_count(bob.name, alice.name) == 2
+    assert history.pair_count(alice.name, dan.name) == 0
+    assert history.partners(carol.name) == {alice.name: 1, bob.name: 1, dan.name: 1}
+    assert len(history) == 4
+    assert history.repeat_pairs([make_group(alice, bob, dan)]) == 1
+
+    history.forget(carol.name)
+    assert history.partners(carol.name) == {}
+    assert carol.name not in history.partners(alice.name)
+
+def test_history_round_trip(tmp_path):
+    """Test saving and loading a history, and that a missing file is an empty history."""
+    path = str(tmp_path / "history.json")
+    assert RoundHistory.load(path).rounds == 0
+
+    history = RoundHistory()
+    history.record_round(GroupService.create_stratified_groups(make_students(20), 4, seed=1))
+    history.save(path)
+    loaded = RoundHistory.load(path)
+    assert loaded.rounds == 1
+    assert loaded.to_dict() == history.to_dict()
+    assert RoundHistory.from_dict(None).to_dict() == {"rounds": 0, "pairs": []}
+
+def test_round_groups_avoid_repeats_and_stay_balanced():
+    """Test that repeat teammates drop well below a plain shuffle without losing balance."""
+    students = make_students(120)
+    avoiding, plain = RoundHistory(), RoundHistory()
+    avoided_repeats = plain_repeats = 0
+    for seed in range(6):
+        groups = create_round_groups(students, 4, avoiding, seed)
+        avoided_repeats += avoiding.repeat_pairs(groups)
+        avoiding.record_round(groups)
+
+        sizes = [g.size for g in groups]
+        assert sum(sizes) == len(students)
+        assert max(sizes) - min(sizes) <= 1
+        for level in SkillLevel:
+            counts = [g.level_counts[level] for g in groups]
+            assert max(counts) - min(counts) <= 1
+
+        shuffled = GroupService.create_stratified_groups(students, 4, seed)
+        plain_repeats += plain.repeat_pairs(shuffled)
+        plain.record_round(shuffled)
+
+    assert avoided_repeats * 5 < plain_repeats
+
+def test_round_groups_without_history_are_reproducible():
+    """Test that the same seed gives the same groups."""
+    students = make_students(30)
+    first = create_round_groups(students, 4, seed=3)
+    second = create_round_groups(students, 4, seed=3)
+    assert [[m.name for m in g.members] for g in first] == [[m.name for m in g.members] for g in second]
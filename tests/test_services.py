@@ -1,6 +1,8 @@
 import pytest
 from src.models.student import Student
+from src.models.roster import Roster
 from src.services.group_service import GroupService
+from src.services.grouping_plan import GroupingPlan
 from src.utils.constants import SkillLevel
 
 def create_test_students():
@@ -95,4 +97,127 @@ def test_create_stratified_groups_skill_order():
     
     # First student in each group should be Expert or Advanced
     first_students_levels = [group.members[0].skill_level for group in groups]
-    assert all(level in (SkillLevel.EXPERT, SkillLevel.ADVANCED) for level in first_students_levels) 
\ No newline at end of file
+    assert all(level in (SkillLevel.EXPERT, SkillLevel.ADVANCED) for level in first_students_levels) 
+
+def test_services_accept_roster():
+    """Test that the service works with a Roster as well as a list."""
+    roster = Roster(create_test_students())
+    assert GroupService.validate_responses(roster) is True
+    assert GroupService.get_response_status(roster) == (8, 8)
+
+    groups = GroupService.create_stratified_groups(roster, group_size=4)
+    assert sum(len(group.members) for group in groups) == 8
+
+def test_seeded_groups_are_reproducible():
+    """Test that the same seed gives the same members and team names."""
+    students = create_test_students() * 3
+    first = GroupService.create_stratified_groups(students, 4, seed=11)
+    second = GroupService.create_stratified_groups(students, 4, seed=11)
+    assert [g.name for g in first] == [g.name for g in second]
+    assert [[m.name for m in g.members] for g in first] == [[m.name for m in g.members] for g in second]
+
+def test_grouping_plan_reshuffle():
+    """Test that a plan deals balanced groups repeatedly from the same strata."""
+    roster = Roster(create_test_students())
+    plan = GroupingPlan(roster, group_size=4)
+    assert plan.num_groups == 2
+    assert plan.student_count == 8
+
+    for seed in range(5):
+        groups = plan.reshuffle(seed)
+        assert [g.size for g in groups] == [4, 4]
+        for group in groups:
+            assert set(group.level_counts.values()) == {1}
+
+def test_grouping_plan_invalidated_by_roster_changes():
+    """Test that a plan is only valid for the roster version it was built at."""
+    roster = Roster(create_test_students())
+    plan = GroupingPlan(roster, group_size=4)
+    assert plan.is_valid_for(roster, 4)
+    assert not plan.is_valid_for(roster, 3)
+    assert not plan.is_valid_for(list(roster), 4)
+
+    roster.add(Student(name="Late", skill_level=SkillLevel.NOVICE, has_responded=True))
+    assert not plan.is_valid_for(roster, 4)
+
+    roster.add(Student(name="Pending"))
+    with pytest.raises(ValueError):
+        GroupingPlan(roster, group_size=4)
+
+def create_attribute_students(count, seed=0):
+    """Helper creating responded students with random timezone and track attributes."""
+    import random
+    rng = random.Random(seed)
+    combos = {}
+    students = []
+    for i in range(count):
+        values = (rng.choice(["UTC-8", "UTC", "UTC+1", "UTC+8"]), rng.choice(["ml", "web", "data"]))
+        attributes = combos.setdefault(values, {"timezone": values[0], "track": values[1]})
+        students.append(Student(
+            name=f"Student {i}",
+            skill_level=rng.choice(list(SkillLevel)),
+            has_responded=True,
+            attributes=attributes
+        ))
+    return students
+
+def test_grouping_plan_balances_attributes():
+    """Test that every attribute value is spread evenly across groups."""
+    students = create_attribute_students(2_000)
+    plan = GroupingPlan(students, group_size=5, attributes=("timezone", "track"))
+    # Only the combinations that occur are indexed
+    assert len(plan.strata) <= len(SkillLevel) * 4 * 3
+    assert plan.student_count == 2_000
+
+    groups = plan.reshuffle(7)
+    assert sorted(m.name for g in groups for m in g.members) == sorted(s.name for s in students)
+    for level in SkillLevel:
+        counts = [g.level_counts.get(level, 0) for g in groups]
+        assert max(counts) - min(counts) <= 1
+    for attribute in ("timezone", "track"):
+        for value in {s.attribute(attribute) for s in students}:
+            counts = [sum(m.attribute(attribute) == value for m in g.members) for g in groups]
+            assert max(counts) - min(counts) <= 2
+
+def test_grouping_plan_attributes_invalidate_plan():
+    """Test that a plan is only valid for the attributes it was built with."""
+    roster = Roster(create_attribute_students(20))
+    plan = GroupService.create_stratified_groups(roster, 4, seed=1, attributes=["track"])
+    assert len(plan) == 5
+    plan = GroupingPlan(roster, 4, ["track"])
+    assert plan.is_valid_for(roster, 4, ("track",))
+    assert not plan.is_valid_for(roster, 4)
+    assert GroupService.attribute_names(roster) == ["timezone", "track"]
+
+def test_grouping_plan_index_grows_with_students_not_combinations():
+    """Test that near-unique attributes index one bucket per student at most."""
+    students = [
+        Student(
+            name=f"Student {i}",
+            skill_level=SkillLevel.NOVICE,
+            has_responded=True,
+            attributes={"badge": str(i), "room": str(i % 7), "track": str(i % 11)}
+        )
+        for i in range(3_000)
+    ]
+    plan = GroupingPlan(students, group_size=6, attributes=("badge", "room", "track"))
+    assert len(plan.strata) == 3_000
+    assert sum(g.size for g in plan.reshuffle(0)) == 3_000
+
+def test_grouping_plan_attribute_names():
+    """Test that attribute names match in any case and unknown ones are rejected."""
+    students = create_attribute_students(20)
+    plan = GroupingPlan(students, group_size=4, attributes=[" Track "])
+    assert plan.attributes == ("track",)
+    with pytest.raises(ValueError, match="nosuch"):
+        GroupingPlan(students, group_size=4, attributes=["track", "nosuch"])
+
+    # Students built in code are keyed the same way as imported ones
+    built = [
+        Student(name=f"S{i}", skill_level=SkillLevel.NOVICE, has_responded=True, attributes={"Timezone": tz})
+        for i, tz in enumerate(["UTC", "CET"] * 4)
+    ]
+    assert GroupService.attribute_names(built) == ["timezone"]
+    assert built[0].attribute("TIMEZONE") == "UTC"
+    plan = GroupingPlan(built, group_size=2, attributes=["Timezone"])
+    assert len(plan.strata) == 2
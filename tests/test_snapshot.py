@@ -0,0 +1,124 @@
+import struct
+import pytest
+from src.models.student import Student
+from src.services.group_service import GroupService
+from src.services.snapshot import SNAPSHOT_VERSION, Snapshot, SnapshotError, encode_snapshot, write_snapshot
+from src.utils.constants import SkillLevel
+
+LEVELS = list(SkillLevel)
+
+def make_students(count):
+    """Helper creating students with a mix of fields set and unset."""
+    timezones = [{"timezone": "UTC"}, {"timezone": "UTC+1"}]
+    return [
+        Student(
+            name=f"Student {i} é",
+            email=f"s{i}@example.org" if i % 3 else None,
+            skill_level=LEVELS[i % 4] if i % 5 else None,
+            has_responded=bool(i % 5),
+            attributes=timezones[i % 2] if i % 4 else None
+        )
+        for i in range(count)
+    ]
+
+def names(groups):
+    """Group names with their member names, to compare groupings."""
+    return [(g.name, [m.name for m in g.members]) for g in groups]
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that students and groups come back exactly from a memory-mapped file."""
+    students = make_students(50)
+    responded = [s for s in students if s.has_responded]
+    groups = GroupService.create_stratified_groups(responded, 4, seed=1)
+    path = tmp_path / "roster.snapshot"
+    size = write_snapshot(path, students, groups)
+    assert path.stat().st_size == size
+
+    with Snapshot.open(path) as snapshot:
+        assert snapshot.version == SNAPSHOT_VERSION
+        assert len(snapshot) == 50
+        assert snapshot.group_count == len(groups)
+        assert snapshot.student(7) == students[7]
+        roster = snapshot.to_roster()
+        assert list(roster) == students
+        restored = snapshot.groups(roster)
+    # Equal attributes are shared read-only, as in the roster store
+    shared = roster.get(students[1].name).attributes
+    assert roster.get(students[3].name).attributes is shared
+    with pytest.raises(TypeError):
+        shared["timezone"] = "UTC+2"
+    assert names(restored) == names(groups)
+    assert restored[0].members[0] is roster.get(restored[0].members[0].name)
+    assert restored[0].skill_sum == groups[0].skill_sum
+
+def test_snapshot_groups_skip_students_not_on_roster():
+    """Test that groups rebuilt against a roster leave out students who left it."""
+    students = make_students(10)
+    responded = [s for s in students if s.has_responded]
+    groups = GroupService.create_stratified_groups(responded, 4, seed=2)
+    with Snapshot.from_bytes(encode_snapshot(students, groups)) as snapshot:
+        roster = snapshot.to_roster()
+        roster.remove(groups[0].members[0].name)
+        restored = snapshot.groups(roster)
+        assert restored[0].size == groups[0].size - 1
+        assert names(snapshot.groups()) == names(groups)
+
+def test_snapshot_rejects_bad_data(tmp_path):
+    """Test that foreign, truncated and newer-format files raise SnapshotError."""
+    data = encode_snapshot(make_students(20))
+    with pytest.raises(SnapshotError):
+        Snapshot.from_bytes(b"not a snapshot at all, just some bytes")
+    with pytest.raises(SnapshotError):
+        Snapshot.from_bytes(data[:-5])
+    newer = data[:4] + struct.pack("<H", SNAPSHOT_VERSION + 1) + data[6:]
+    with pytest.raises(SnapshotError, match="newer"):
+        Snapshot.from_bytes(newer)
+    empty = tmp_path / "empty.snapshot"
+    empty.write_bytes(b"")
+    with pytest.raises(SnapshotError):
+        Snapshot.open(empty)
+
+def test_snapshot_rejects_groups_off_the_roster():
+    """Test that a grouping can only be saved with the roster its members are on."""
+    students = make_students(10)
+    groups = GroupService.create_stratified_groups([s for s in students if s.has_responded], 4, seed=3)
+    with pytest.raises(ValueError):
+        encode_snapshot(students[:2], groups)
+
+def section_offsets(data):
+    """Helper locating the sections of a version 1 snapshot."""
+    _, _, _, students, groups, members, strings, _ = struct.unpack_from("<4sHHIIIIQ", data)
+    sizes = (
+        ("levels", students), ("flags", students), ("names", 4 * students), ("emails", 4 * students),
+        ("attributes", 4 * students), ("group_names", 4 * groups), ("group_starts", 4 * (groups + 1)),
+        ("members", 4 * members), ("string_ends", 4 * strings),
+    )
+    offsets, offset = {}, 32
+    for name, size in sizes:
+        offsets[name] = offset
+        offset += (size + 3) & ~3
+    offsets["strings"] = offset
+    return offsets
+
+def test_snapshot_rejects_damaged_sections():
+    """Test that bad ids, offsets and text in a full-length file raise SnapshotError."""
+    students = make_students(20)
+    groups = GroupService.create_stratified_groups([s for s in students if s.has_responded], 4, seed=2)
+    data = encode_snapshot(students, groups)
+    offsets = section_offsets(data)
+    attributes = data.index(b'{"timezone"')
+    damage = [
+        (offsets["levels"], b"\x09"),
+        (offsets["names"], struct.pack("<I", 0xFFFFFF00)),
+        (offsets["group_starts"], struct.pack("<I", 5)),
+        (offsets["members"], struct.pack("<I", 1_000_000)),
+        (offsets["string_ends"], struct.pack("<I", 0xFFFFFF00)),
+        (offsets["strings"], b"\xff"),
+        (attributes, b"x"),
+    ]
+    for offset, patch in damage:
+        bad = data[:offset] + patch + data[offset + len(patch):]
+        assert len(bad) == len(data)
+        with pytest.raises(SnapshotError):
+            with Snapshot.from_bytes(bad) as snapshot:
+                snapshot.groups(snapshot.to_roster())
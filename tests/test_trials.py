@@ -0,0 +1,68 @@
+import numpy as np
+from src.models.student import Student
+from src.services.array_engine import balance_score, stratified_assignment
+from src.services.group_service import GroupService
+from src.services.trials import _shared_pool, best_of_trials
+from src.utils.constants import SkillLevel
+
+LEVELS = np.random.default_rng(5).integers(1, 5, size=997).astype(np.uint8)
+
+def test_shuffled_rounds_keep_sizes_balanced():
+    """Test that per-round group permutations keep group sizes within one."""
+    assignment = stratified_assignment(LEVELS, group_size=4, seed=1, shuffle_rounds=True)
+    sizes = assignment.group_sizes
+    assert sizes.sum() == len(LEVELS)
+    assert sizes.max() - sizes.min() <= 1
+    assert sorted(np.concatenate([
+        assignment.member_indices(g) for g in range(assignment.num_groups)
+    ]).tolist()) == list(range(len(LEVELS)))
+
+def test_best_of_trials_is_reproducible_inline():
+    """Test that an inline search with a fixed seed is deterministic."""
+    first = best_of_trials(LEVELS, group_size=5, trials=6, seed=11, workers=1)
+    second = best_of_trials(LEVELS, group_size=5, trials=6, seed=11, workers=1)
+    assert first.trials_run == 6
+    assert first.score == second.score
+    assert np.array_equal(first.assignment.group_indices, second.assignment.group_indices)
+
+def test_best_of_trials_beats_plain_round_robin():
+    """Test that the parallel search scores at least as well as plain round-robin."""
+    plain = stratified_assignment(LEVELS, group_size=5, seed=0)
+    plain_score = balance_score(LEVELS, plain.group_indices, plain.num_groups)
+
+    result = best_of_trials(LEVELS, group_size=5, trials=8, seed=3, workers=2)
+    assert result.trials_run == 8
+    assert result.score.total <= plain_score.total
+    assert result.score == balance_score(
+        LEVELS, result.assignment.group_indices, result.assignment.num_groups
+    )
+
+def test_best_of_trials_reuses_spawned_workers():
+    """Test that searches share one spawned pool, and a search stopped early leaves it usable."""
+    best_of_trials(LEVELS, trials=20, seed=0, workers=2, target_score=1e9)
+    pool = _shared_pool(2)
+    assert pool._mp_context.get_start_method() == "spawn"
+    result = best_of_trials(LEVELS, trials=4, seed=0, workers=2)
+    assert result.trials_run == 4
+    assert _shared_pool(2) is pool
+
+def test_best_of_trials_stops_early():
+    """Test early stopping at the target score and the time budget."""
+    result = best_of_trials(LEVELS, trials=50, seed=0, workers=1, target_score=10.0)
+    assert result.trials_run == 1
+    assert result.target_reached
+
+    result = best_of_trials(LEVELS, trials=50, seed=0, workers=1, time_budget=0.0)
+    assert result.trials_run == 1
+    assert not result.target_reached
+
+def test_create_balanced_groups():
+    """Test the service entry point returns complete, balanced groups."""
+    levels = list(SkillLevel)
+    students = [
+        Student(name=f"Student {i}", skill_level=levels[i % 4], has_responded=True)
+        for i in range(30)
+    ]
+    groups = GroupService.create_balanced_groups(students, group_size=4, trials=4, seed=2, workers=1)
+    assert len(groups) == 8
+    assert sum(len(g.members) for g in groups) == 30